@@ -1,29 +1,79 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
+import asyncio
+import importlib
 import os
 import sys
 import json
-import uvicorn
-from datetime import datetime
+import time
 
 # Garantir que o diretório atual esteja no path do Python
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-# Importar a função executar e funções utilitárias
-from crew import executar
-from utils import save_result, normalize_name
+load_dotenv()
+
+# Funções utilitárias. A crew e as ferramentas (crewai, langchain, crawl4ai) são importadas
+# no primeiro uso, para a API responder logo depois de iniciar
+from utils import save_result
+from jobs import JobManager, JobQueueFull
+from store import get_store
+from tools.page_cache import scholar_user_id
+from tools.runtime import adopt_loop, run_async, shutdown, stream_async
+from tools.events import subscribe
+from tools.scheduler import BATCH, request_priority
+from tools.metrics import JOBS
 
 # Configuração
 PORT = int(os.getenv("PORT", "8000"))
+# Com SCHOLAR_PREWARM=1, a API carrega a crew e inicia o pool de navegadores em segundo
+# plano logo após subir, em vez de deixar esse custo para a primeira análise
+PREWARM = os.getenv("SCHOLAR_PREWARM", "0") not in ("0", "false", "False")
+BATCH_CONCURRENCY = int(os.getenv("SCHOLAR_BATCH_CONCURRENCY", "4"))
+# Intervalo (segundos) dos comentários de keep-alive no stream SSE
+SSE_KEEPALIVE = float(os.getenv("SCHOLAR_SSE_KEEPALIVE", "15"))
+
+async def prewarm():
+    """Carrega os módulos da análise e inicia os navegadores do pool."""
+    inicio = time.perf_counter()
+    try:
+        # Em uma thread, para o loop da API continuar atendendo durante o import
+        await asyncio.to_thread(importlib.import_module, "crew")
+        print(f"🔥 Crew carregada em {time.perf_counter() - inicio:.1f}s")
+        from tools.browser_pool import get_browser_pool
+        await run_async(get_browser_pool().start())
+        print(f"🔥 Pool de navegadores pronto em {time.perf_counter() - inicio:.1f}s")
+    except Exception as e:
+        print(f"Erro no pré-aquecimento: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # O loop do servidor passa a ser o loop compartilhado das ferramentas: as análises do
+    # modo pipeline são aguardadas diretamente nele, sem uma thread por análise
+    adopted = adopt_loop()
+    if not adopted:
+        print("Loop das ferramentas já iniciado; a API usará run_async para chegar até ele")
+    # O pré-aquecimento roda em segundo plano: o servidor já aceita requisições enquanto isso
+    warmup = asyncio.ensure_future(prewarm()) if PREWARM else None
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    if adopted:
+        # Fecha navegadores e conexões enquanto o loop ainda está rodando
+        await shutdown()
 
 # Inicialização da API FastAPI
 app = FastAPI(
     title="Scholar Leads API",
     description="API para busca de pesquisadores no Google Scholar",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Modelo de dados para os pesquisadores
@@ -31,6 +81,9 @@ class Researcher(BaseModel):
     nome: str
     instituicao: Optional[str] = None
     email: Optional[str] = None
+    modo: Literal["crew", "pipeline"] = "pipeline"  # pipeline: sem agentes, LLM só no veredito (com cache)
+    todas_publicacoes: bool = False  # só no modo pipeline: analisa a lista completa de artigos
+    incremental: bool = False  # só no modo pipeline: reaproveita o último resultado salvo do perfil
 
 @app.get("/")
 def root():
@@ -56,59 +109,374 @@ def process_crew_output(result):
         # Se não for JSON, retornar como string
         return {"raw_output": result_str}
 
-@app.post("/analyze")
-def analyze_researcher(researcher: Researcher):
+def finish_analysis(researcher: Researcher, result):
+    """Processa o resultado de executar e salva no banco; retorna o corpo da resposta."""
+    # Processar o resultado do CrewOutput
+    processed_result = process_crew_output(result)
+    
+    # Verificar se há erro
+    if isinstance(processed_result, dict) and "error" in processed_result:
+        return {
+            "status": "error",
+            "message": processed_result["error"],
+            "pesquisador": researcher.model_dump()
+        }
+    
+    # Salvar o resultado processado no banco de resultados
+    registro = save_result(researcher.nome, processed_result,
+                           institution=researcher.instituicao, email=researcher.email)
+    
+    # Retornar os resultados
+    return {
+        "status": "success",
+        "pesquisador": researcher.model_dump(),
+        "resultado": processed_result,
+        "registro": registro
+    }
+
+def analysis_error(researcher: Researcher, error: Exception):
+    print(f"Erro durante a análise: {error}")
+    return {
+        "status": "error",
+        "message": str(error),
+        "pesquisador": researcher.model_dump()
+    }
+
+def run_analysis(researcher: Researcher, progress_callback=None, profile_url=None):
     """
-    Endpoint para analisar um pesquisador acadêmico.
-    Executa a análise e salva os resultados em um arquivo.
+    Executa a análise de um pesquisador e salva o resultado.
+    Usada pelos workers de jobs, que rodam em threads próprias.
     """
     try:
         print(f"Iniciando análise para: {researcher.nome}")
+        from crew import executar
         
         # Executar a análise usando a função executar
         result = executar(
             nome_pesquisador=researcher.nome,
             email=researcher.email,
-            institution=researcher.instituicao
+            institution=researcher.instituicao,
+            progress_callback=progress_callback,
+            profile_url=profile_url,
+            modo=researcher.modo,
+            todas_publicacoes=researcher.todas_publicacoes,
+            incremental=researcher.incremental
         )
-        
-        # Processar o resultado do CrewOutput
-        processed_result = process_crew_output(result)
-        
-        # Verificar se há erro
-        if isinstance(processed_result, dict) and "error" in processed_result:
-            return {
-                "status": "error",
-                "message": processed_result["error"],
-                "pesquisador": researcher.model_dump()
-            }
-        
-        # Salvar o resultado processado em um arquivo
-        file_path = save_result(researcher.nome, processed_result)
-        
-        # Retornar os resultados
-        return {
-            "status": "success",
-            "pesquisador": researcher.model_dump(),
-            "resultado": processed_result,
-            "arquivo_gerado": file_path
-        }
-        
+        return finish_analysis(researcher, result)
     except Exception as e:
-        print(f"Erro durante a análise: {e}")
-        return {
-            "status": "error",
-            "message": str(e),
-            "pesquisador": researcher.model_dump()
-        }
+        return analysis_error(researcher, e)
+
+async def run_analysis_async(researcher: Researcher, progress_callback=None, profile_url=None):
+    """
+    Versão assíncrona de run_analysis, usada pelos endpoints: no modo pipeline, várias
+    análises compartilham o loop da API em vez de ocupar uma thread cada.
+    """
+    try:
+        print(f"Iniciando análise para: {researcher.nome}")
+        from crew import executar_async
+
+        result = await executar_async(
+            nome_pesquisador=researcher.nome,
+            email=researcher.email,
+            institution=researcher.instituicao,
+            progress_callback=progress_callback,
+            profile_url=profile_url,
+            modo=researcher.modo,
+            todas_publicacoes=researcher.todas_publicacoes,
+            incremental=researcher.incremental
+        )
+        # Gravação no SQLite fora do loop
+        return await asyncio.to_thread(finish_analysis, researcher, result)
+    except Exception as e:
+        return analysis_error(researcher, e)
+
+@app.post("/analyze")
+async def analyze_researcher(researcher: Researcher):
+    """
+    Endpoint para analisar um pesquisador acadêmico.
+    Executa a análise e salva os resultados no banco de resultados.
+    """
+    return await run_analysis_async(researcher)
+
+def sse_event(event: str, data: Any) -> str:
+    """Formata um evento no formato text/event-stream."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@app.get("/analyze/stream")
+async def analyze_stream(researcher: Researcher = Depends()):
+    """
+    Analisa um pesquisador emitindo os resultados parciais via server-sent events, na ordem
+    em que ficam disponíveis:
+
+    - progresso: {"etapa", "status"} a cada etapa iniciada ou concluída
+    - candidatos: URLs dos perfis encontrados na busca
+    - ranking: candidatos (quando há mais de um) com dados do cabeçalho e pontuação, do melhor ao pior
+    - perfil: nome, área, citações e artigos do cabeçalho do perfil
+    - resumo: {"indice", "url", "abstract"} a cada resumo extraído
+    - coautores: cada lote de coautores (barra lateral, página "ver todos" ou, na atualização
+      incremental, a lista anterior reaproveitada)
+    - link_completo: {"url", "artigo_completo"} a cada link de texto completo encontrado
+    - veredito: a análise qualitativa
+    - resultado: o mesmo corpo retornado por /analyze (já salvo no banco)
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def send(event: str, data: Any):
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    async def analysis():
+        try:
+            result = await run_analysis_async(
+                researcher,
+                progress_callback=lambda etapa, status: send("progresso", {"etapa": etapa, "status": status})
+            )
+            # Na crew o veredito só existe na resposta final do último agente
+            resultado = result.get("resultado")
+            if researcher.modo == "crew" and isinstance(resultado, dict) and "veredict" in resultado:
+                send("veredito", {key: resultado[key] for key in ("qualitative_research_analysis", "veredict")
+                                  if key in resultado})
+            send("resultado", result)
+        finally:
+            loop.call_soon_threadsafe(events.put_nowait, None)
+
+    async def stream():
+        # A tarefa copia o contexto com o assinante, que segue até as ferramentas
+        # (inclusive pela thread da crew, já que to_thread também copia o contexto)
+        with subscribe(send):
+            task = asyncio.ensure_future(analysis())
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(events.get(), timeout=SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                yield sse_event(*item)
+        finally:
+            if not task.done():
+                print(f"Cliente desconectou do stream; a análise de {researcher.nome} continua em segundo plano")
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def researcher_key(researcher: Researcher):
+    """Chave usada para deduplicar a busca de pesquisadores idênticos em um lote."""
+    return tuple((value or "").strip().lower() for value in (researcher.nome, researcher.instituicao, researcher.email))
+
+def analysis_options(researcher: Researcher):
+    """Opções que mudam o resultado da análise: perfis iguais só são analisados juntos se coincidirem."""
+    return researcher.modo, researcher.todas_publicacoes, researcher.incremental
+
+async def resolve_profile(researcher: Researcher):
+    """
+    Executa só a etapa de busca e retorna a URL do perfil mais compatível com as pistas
+    (ou None e a mensagem).
+    """
+    from tools.disambiguation import rank_candidates
+    from tools.scholar_search_tool import search_scholar_profile
+    result = await run_async(search_scholar_profile(researcher.nome, researcher.email, researcher.instituicao))
+    profiles = [line.strip() for line in result.splitlines() if line.strip().startswith("http")]
+    if not profiles:
+        return None, result
+    ranking = await run_async(rank_candidates(profiles, researcher.nome, researcher.email, researcher.instituicao))
+    return ranking[0].profile_url, None
+
+@app.post("/analyze/batch")
+async def analyze_batch(researchers: List[Researcher]):
+    """
+    Analisa uma lista de pesquisadores em paralelo e devolve os resultados em NDJSON,
+    uma linha por perfil assim que cada análise termina.
+
+    Pesquisadores repetidos (nome, instituição, email) são buscados uma única vez. Cada
+    análise começa assim que a busca do seu pesquisador termina; os que resolvem para o
+    mesmo perfil do Scholar com as mesmas opções (modo, todas_publicacoes, incremental) são
+    analisados uma única vez, e quem chega depois da análise emitida recebe o mesmo resultado.
+    No modo pipeline, os perfis cujo crawling termina perto um do outro passam juntos pelo
+    classificador local (uma chamada de classify() por janela, ver ClassifierBatcher).
+    """
+    from tools.qualitative_classifier import ClassifierBatcher, classifier_batch, get_classifier
+    groups: Dict[tuple, List[Researcher]] = {}
+    for researcher in researchers:
+        groups.setdefault(researcher_key(researcher), []).append(researcher)
+    print(f"Lote recebido: {len(researchers)} pesquisadores, {len(groups)} únicos")
+
+    semaphore = asyncio.Semaphore(max(1, BATCH_CONCURRENCY))
+    classifier = get_classifier()
+    batcher = ClassifierBatcher(classifier) if classifier is not None else None
+    lines: asyncio.Queue = asyncio.Queue()
+    # (user_id, opções) -> {"group": pesquisadores do perfil, "result": resultado já emitido}
+    analyses: Dict[tuple, dict] = {}
+
+    def emit(data: dict):
+        lines.put_nowait(json.dumps(data, ensure_ascii=False, default=str) + "\n")
+
+    async def search(group: List[Researcher]):
+        async with semaphore:
+            try:
+                with request_priority(BATCH):
+                    return await resolve_profile(group[0])
+            except Exception as e:
+                return None, str(e)
+
+    async def analyze(user_id: str, profile_url: str, entry: dict):
+        async with semaphore:
+            with request_priority(BATCH), classifier_batch(batcher):
+                result = await run_analysis_async(entry["group"][0], None, profile_url)
+        result["user_id"] = user_id
+        entry["result"] = result
+        emit({**result, "pesquisadores": [r.model_dump() for r in entry["group"]]})
+
+    async def search_and_analyze(group: List[Researcher]):
+        profile_url, message = await search(group)
+        user_id = scholar_user_id(profile_url) if profile_url else None
+        if not user_id:
+            emit({
+                "status": "error",
+                "message": message or "Nenhum perfil encontrado para o pesquisador.",
+                "pesquisadores": [r.model_dump() for r in group]
+            })
+            return
+        started = []
+        for researcher in group:
+            key = (user_id, *analysis_options(researcher))
+            entry = analyses.get(key)
+            if entry is None:
+                entry = analyses[key] = {"group": [researcher], "result": None}
+                started.append(analyze(user_id, profile_url, entry))
+            elif entry["result"] is None:
+                # Análise em andamento: o pesquisador entra no resultado quando ela terminar
+                entry["group"].append(researcher)
+            else:
+                emit({**entry["result"], "pesquisadores": [researcher.model_dump()]})
+        await asyncio.gather(*started)
+
+    async def run_all():
+        try:
+            await asyncio.gather(*[search_and_analyze(group) for group in groups.values()])
+            print(f"Lote: {len(analyses)} perfis distintos analisados")
+        finally:
+            lines.put_nowait(None)
+
+    async def stream():
+        task = asyncio.ensure_future(run_all())
+        try:
+            while True:
+                line = await lines.get()
+                if line is None:
+                    break
+                yield line
+        finally:
+            if not task.done():
+                print("Cliente desconectou do lote; as análises continuam em segundo plano")
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/researchers/{user_id}")
+def get_researcher(user_id: str, historico: bool = False):
+    """Retorna o resultado mais recente de um pesquisador pelo id do Scholar (e o histórico, se pedido)."""
+    record = get_store().get(user_id, history=historico)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Pesquisador não encontrado")
+    return record
+
+@app.get("/researchers")
+def list_researchers(name: Optional[str] = None, institution: Optional[str] = None,
+                     email_domain: Optional[str] = None, research_area: Optional[str] = None,
+                     limit: int = 100):
+    """Busca pesquisadores já analisados por nome, instituição, domínio de email ou área."""
+    return get_store().search(name=name, institution=institution, email_domain=email_domain,
+                              research_area=research_area, limit=min(max(1, limit), 1000))
+
+@app.get("/authors/search")
+async def author_search(query: str, max_results: Optional[int] = None, min_citations: Optional[int] = None):
+    """
+    Busca autores no Scholar (por exemplo, pelo nome de uma instituição) seguindo todas as
+    páginas de resultados e emitindo em NDJSON cada autor (id, nome, afiliação, domínio de
+    email, citações, interesses) assim que sua página é lida. O Scholar ordena os autores
+    por citações, então `min_citations` encerra a busca no primeiro autor abaixo do mínimo.
+    """
+    from dataclasses import asdict
+    from tools.author_search import iter_authors
+    stop = (lambda candidate: candidate.total_citations < min_citations) if min_citations is not None else None
+
+    async def stream():
+        try:
+            async for candidate in stream_async(iter_authors(query, max_results=max_results, stop=stop)):
+                yield json.dumps(asdict(candidate), ensure_ascii=False) + "\n"
+        except RuntimeError as e:
+            yield json.dumps({"status": "error", "message": str(e)}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/coauthors/graph")
+async def coauthor_graph(profile_url: str, depth: Optional[int] = None, page_budget: Optional[int] = None):
+    """
+    Expande o grafo de coautores a partir de um perfil, em largura até `depth` níveis,
+    emitindo nós e arestas em NDJSON conforme são descobertos.
+    Sem `depth` e `page_budget`, valem SCHOLAR_GRAPH_MAX_DEPTH e SCHOLAR_GRAPH_PAGE_BUDGET.
+    """
+    if not scholar_user_id(profile_url):
+        raise HTTPException(status_code=400, detail="profile_url deve conter o parâmetro user=")
+    from tools.coauthor_graph import crawl_coauthor_graph, GRAPH_MAX_DEPTH, GRAPH_PAGE_BUDGET
+    depth = GRAPH_MAX_DEPTH if depth is None else depth
+    page_budget = GRAPH_PAGE_BUDGET if page_budget is None else page_budget
+
+    async def stream():
+        async for event in stream_async(crawl_coauthor_graph(profile_url, max_depth=depth, page_budget=page_budget)):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def run_job(params: Dict[str, Any], progress_callback):
+    """Executa um job enfileirado; as buscas de jobs cedem a vez às análises interativas."""
+    with request_priority(BATCH):
+        return run_analysis(Researcher(**params), progress_callback)
+
+# Pool de workers para análises assíncronas
+job_manager = JobManager(runner=run_job)
+
+JOBS.labels(state="queued").set_function(lambda: job_manager.stats()["queued"])
+JOBS.labels(state="running").set_function(lambda: job_manager.stats()["running"])
+
+@app.post("/jobs", status_code=202)
+def create_job(researcher: Researcher):
+    """
+    Enfileira a análise de um pesquisador e retorna imediatamente o id do job.
+    Retorna 429 quando a fila de jobs está cheia.
+    """
+    try:
+        job = job_manager.submit(researcher.model_dump())
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Retorna o status, o progresso por etapa e, ao final, o resultado de um job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job.to_dict()
+
+@app.get("/metrics")
+def metrics():
+    """Métricas no formato do Prometheus: latência por etapa, buscas de páginas, cache, falhas, jobs e navegadores."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 if __name__ == "__main__":
-    # Obter o caminho do diretório de dados
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(base_dir, 'data')
-    
+    if "--startup-report" in sys.argv:
+        # Tempo de import da API e da crew (carregada na primeira análise), por pacote
+        from tools.startup import startup_report
+        startup_report()
+        sys.exit(0)
+
+    import uvicorn
+
     print(f"🚀 Iniciando Scholar Leads API na porta {PORT}")
-    print(f"📁 Diretório de dados: {data_dir}")
+    print(f"📁 Banco de resultados: {get_store().path}")
     
     uvicorn.run(
         "app:app",
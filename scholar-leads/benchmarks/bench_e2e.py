@@ -0,0 +1,233 @@
+"""
+Benchmark ponta a ponta offline: o Scholar e a API da OpenAI são substituídos por um servidor
+local (benchmarks/stand_in.py) que serve as páginas de benchmarks/fixtures e um LLM falso.
+
+Mede a latência de search_scholar_profile, crawl_scholar_profile e
+ArticleAnalyzerHelper.add_full_article_links, a latência por etapa de crew.executar em cada
+modo, a vazão com N análises simultâneas e o pico de memória (RSS) do processo. O resultado
+é gravado em JSON para comparar versões.
+
+Uso:
+    python benchmarks/bench_e2e.py [--iteracoes 5] [--concorrencia 4] [--modos pipeline,crew]
+                                   [--latencia-ms 0] [--llm-latencia-ms 0]
+                                   [--saida arquivo.json] [--comparar anterior.json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from benchmarks.stand_in import RESEARCHER_NAME, RESEARCHER_USER_ID, StandInServer  # noqa: E402
+
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+def configure_environment(base_url: str):
+    """Aponta o código para o servidor local. Precisa rodar antes de importar os módulos do projeto."""
+    os.environ["SCHOLAR_BASE_URL"] = base_url
+    os.environ["SCHOLAR_FETCH_ENGINE"] = "http"
+    os.environ["SCHOLAR_CACHE_ENABLED"] = "0"
+    os.environ["SCHOLAR_LLM_CACHE_ENABLED"] = "0"
+    # O veredito passa sempre pelo LLM simulado, para comparar com medições anteriores
+    # (SCHOLAR_CLASSIFIER_ENABLED=1 mede o pipeline com o pré-filtro local)
+    os.environ.setdefault("SCHOLAR_CLASSIFIER_ENABLED", "0")
+    # Sem limite de taxa efetivo no servidor local (pode ser sobrescrito para medir o agendador)
+    os.environ.setdefault("SCHOLAR_RATE_LIMIT", "1000")
+    os.environ.setdefault("SCHOLAR_RATE_BURST", "1000")
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ["OPENAI_API_BASE"] = f"{base_url}/v1"
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+    os.environ.setdefault("OPENAI_MODEL", "gpt-4o-mini")
+    os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4o-mini")
+    os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+    os.environ["OTEL_SDK_DISABLED"] = "true"
+
+def peak_rss_mb() -> float:
+    """Pico de memória residente do processo (ru_maxrss é KB no Linux e bytes no macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def summarize(samples):
+    """Estatísticas de uma lista de latências em segundos, convertidas para ms."""
+    ms = sorted(s * 1000 for s in samples)
+    if not ms:
+        return {}
+    # "inclusive" interpola entre as amostras: com poucas, o p95 nunca passa do máximo
+    p95 = statistics.quantiles(ms, n=20, method="inclusive")[-1] if len(ms) > 1 else ms[0]
+    return {
+        "n": len(ms),
+        "min_ms": round(ms[0], 2),
+        "media_ms": round(statistics.fmean(ms), 2),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p95_ms": round(p95, 2),
+        "max_ms": round(ms[-1], 2),
+    }
+
+def timed(func, iterations: int):
+    samples, result = [], None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+def bench_tools(server: StandInServer, iterations: int):
+    """Latência das ferramentas chamadas diretamente."""
+    from tools.articles_analyzer_tool import ArticleAnalyzerHelper
+    from tools.runtime import run_sync
+    from tools.scholar_crawler_tool import crawl_scholar_profile
+    from tools.scholar_search_tool import search_scholar_profile
+
+    profile_url = f"{server.base_url}/citations?user={RESEARCHER_USER_ID}&hl=pt-BR"
+    results = {}
+
+    samples, found = timed(lambda: run_sync(search_scholar_profile(RESEARCHER_NAME)), iterations)
+    results["search_scholar_profile"] = {**summarize(samples), "perfis": len(found.splitlines())}
+
+    samples, raw = timed(lambda: run_sync(crawl_scholar_profile(profile_url)), iterations)
+    perfil = json.loads(raw)
+    if "error" in perfil:
+        raise RuntimeError(f"crawl_scholar_profile falhou: {perfil['error']}")
+    results["crawl_scholar_profile"] = {**summarize(samples), "artigos": len(perfil["articles"]),
+                                        "coautores": len(perfil["coauthors"])}
+
+    helper = ArticleAnalyzerHelper()
+    samples, data = timed(lambda: run_sync(helper.add_full_article_links(json.loads(raw))), iterations)
+    results["add_full_article_links"] = {
+        **summarize(samples),
+        "links": sum(1 for article in data["articles"] if article.get("artigo_completo")),
+    }
+    return results
+
+def run_analysis(modo: str):
+    """Uma chamada de crew.executar; retorna (latência total, latência por etapa)."""
+    from crew import executar
+
+    started = {}
+    stages = {}
+
+    def progress(etapa, status):
+        now = time.perf_counter()
+        if status == "running":
+            started[etapa] = now
+        elif status == "done" and etapa in started:
+            stages[etapa] = now - started[etapa]
+
+    start = time.perf_counter()
+    executar(RESEARCHER_NAME, progress_callback=progress, modo=modo)
+    return time.perf_counter() - start, stages
+
+def bench_executar(modo: str, iterations: int):
+    totals, per_stage = [], {}
+    for _ in range(iterations):
+        total, stages = run_analysis(modo)
+        totals.append(total)
+        for etapa, seconds in stages.items():
+            per_stage.setdefault(etapa, []).append(seconds)
+    return {"total": summarize(totals), "etapas": {etapa: summarize(s) for etapa, s in per_stage.items()}}
+
+def bench_throughput(modo: str, concurrency: int, analyses: int):
+    """Vazão com `concurrency` análises simultâneas (threads, como nos workers da API)."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [total for total, _ in pool.map(lambda _: run_analysis(modo), range(analyses))]
+    elapsed = time.perf_counter() - start
+    return {
+        "concorrencia": concurrency,
+        "analises": analyses,
+        "duracao_s": round(elapsed, 3),
+        "analises_por_s": round(analyses / elapsed, 3),
+        "latencia": summarize(latencies),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current: dict, previous_path: str):
+    """Imprime a variação de p50 (e vazão) em relação a um resultado anterior."""
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+
+    def flatten(data, prefix=""):
+        for key, value in data.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                yield from flatten(value, f"{path}.")
+            elif key in ("p50_ms", "analises_por_s") or path.startswith("pico_rss_mb."):
+                yield path, value
+
+    before = dict(flatten(previous.get("resultados", {})))
+    print(f"\nComparação com {previous_path} ({previous.get('revisao')}):")
+    for path, value in flatten(current["resultados"]):
+        if path in before and before[path]:
+            change = (value - before[path]) / before[path] * 100
+            print(f"  {path:<60}{before[path]:>10} → {value:<10} ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iteracoes", type=int, default=5, help="repetições de cada medição (padrão: 5)")
+    parser.add_argument("--concorrencia", type=int, default=4, help="análises simultâneas na medição de vazão")
+    parser.add_argument("--modos", default="pipeline,crew", help="modos de crew.executar a medir")
+    parser.add_argument("--latencia-ms", type=float, default=0, help="latência simulada por página servida")
+    parser.add_argument("--llm-latencia-ms", type=float, default=0, help="latência simulada por chamada ao LLM")
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: benchmarks/results/<data>.json)")
+    parser.add_argument("--comparar", help="resultado anterior para comparar")
+    args = parser.parse_args()
+
+    server = StandInServer(latency=args.latencia_ms / 1000, llm_latency=args.llm_latencia_ms / 1000).start()
+    configure_environment(server.base_url)
+    print(f"Servidor local em {server.base_url}")
+
+    resultados = {}
+    try:
+        print("Medindo ferramentas...")
+        resultados["ferramentas"] = bench_tools(server, args.iteracoes)
+        resultados["pico_rss_mb"] = {"ferramentas": peak_rss_mb()}
+
+        for modo in [m.strip() for m in args.modos.split(",") if m.strip()]:
+            print(f"Medindo crew.executar (modo={modo})...")
+            server.requests.clear()
+            resultados[f"executar_{modo}"] = bench_executar(modo, args.iteracoes)
+            resultados[f"executar_{modo}"]["requisicoes_por_analise"] = {
+                route: round(count / args.iteracoes, 2) for route, count in sorted(server.requests.items())
+            }
+            print(f"Medindo vazão (modo={modo}, {args.concorrencia} simultâneas)...")
+            resultados[f"vazao_{modo}"] = bench_throughput(modo, args.concorrencia, args.concorrencia * 2)
+            resultados["pico_rss_mb"][modo] = peak_rss_mb()
+    finally:
+        server.stop()
+
+    report = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "revisao": git_revision(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": vars(args),
+        "resultados": resultados,
+    }
+
+    output = args.saida or os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+    print(f"\n✅ Resultado gravado em {output}")
+    if args.comparar:
+        compare(report, args.comparar)
+
+if __name__ == "__main__":
+    main()
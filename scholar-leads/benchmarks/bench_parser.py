@@ -0,0 +1,137 @@
+"""
+Micro-benchmark do parsing das páginas do Scholar: versão anterior (BeautifulSoup com
+html.parser, um parse por extração) contra tools/scholar_parser.py (lxml, parse único e
+seletores pré-compilados), usando as páginas salvas em benchmarks/fixtures.
+
+Uso: python benchmarks/bench_parser.py [--iteracoes N]
+"""
+import argparse
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from tools.scholar_parser import (  # noqa: E402
+    long_value, parse_citation_page, parse_coauthors_page, parse_profile, parse_search_results
+)
+
+FIXTURES_DIR = os.path.join(BASE_DIR, "benchmarks", "fixtures")
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+# --- Implementação anterior (copiada dos tools antes da troca de parser) ---
+
+def legacy_profile(html: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    name = soup.select_one('#gsc_prf_in')
+    research_interests = soup.select_one('#gsc_prf_int')
+    total_citations = soup.select_one('#gsc_rsb_st td.gsc_rsb_std')
+    articles = [
+        (article.text.strip(), f"https://scholar.google.com{article['href']}")
+        for article in soup.select('#gsc_a_b .gsc_a_t a')[:5]
+    ]
+    coauthors = []
+    for elem in soup.select('.gsc_rsb_aa'):
+        link = elem.find('a')
+        coauthors.append((elem.text.strip(), link.get('href') if link else None))
+    view_all_link = soup.select_one('a.gsc_rsb_lbl')
+    return {
+        "name": name.text if name else "Unknown",
+        "research_area": research_interests.text.split(',')[0] if research_interests else "Not found",
+        "total_citations": int(total_citations.text) if total_citations else 0,
+        "articles": articles,
+        "coauthors": coauthors,
+        "coauthors_url": f"https://scholar.google.com{view_all_link['href']}" if view_all_link else None,
+    }
+
+def legacy_coauthors_page(html: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [(link.text.strip(), link.get('href')) for link in soup.select('a[href*="user="]')]
+
+def legacy_search(html: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    return ["https://scholar.google.com" + link['href']
+            for link in soup.select('div.gsc_1usr a[href*="user="]') if link.get('href')]
+
+def legacy_abstract(html: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    descr_label = soup.find('div', string='Descrição') or soup.find('div', string='Description')
+    if descr_label and descr_label.parent:
+        next_sibling = descr_label.find_next_sibling('div', {'class': 'gsc_oci_value'})
+        if next_sibling:
+            return next_sibling.text.strip()
+    abstract_elem = soup.find(id='gsc_oci_desc')
+    if abstract_elem and abstract_elem.text.strip():
+        return abstract_elem.text.strip()
+    for value in soup.select('.gsc_oci_value'):
+        text = value.text.strip()
+        if len(text) > 100 and not text.count("\n") > 5:
+            return text
+    return None
+
+def legacy_full_text_link(html: str):
+    # A página do artigo era parseada uma segunda vez pelo ArticleAnalyzer
+    soup = BeautifulSoup(html, 'html.parser')
+    link_elem = soup.select_one("div.gsc_oci_title_ggi a")
+    return link_elem['href'] if link_elem and link_elem.get('href') else None
+
+# --- Implementação nova ---
+
+def new_profile(html: str):
+    page = parse_profile(html)
+    return {
+        "name": page.header.name,
+        "research_area": page.header.research_area,
+        "total_citations": page.header.total_citations,
+        "articles": [(row.title, row.url) for row in page.articles[:5]],
+        "coauthors": [(entry.text, entry.href) for entry in page.coauthors],
+        "coauthors_url": page.coauthors_url,
+    }
+
+def new_coauthors_page(html: str):
+    return [(entry.text, entry.href) for entry in parse_coauthors_page(html)]
+
+def new_citation(html: str):
+    page = parse_citation_page(html)
+    return page.description or long_value(page), page.full_text_link
+
+CASES = [
+    ("perfil", "profile.html", legacy_profile, new_profile),
+    ("coautores", "coauthors.html", legacy_coauthors_page, new_coauthors_page),
+    ("busca", "search.html", legacy_search, parse_search_results),
+    ("artigo (resumo + link)", "citation.html",
+     lambda html: (legacy_abstract(html), legacy_full_text_link(html)), new_citation),
+]
+
+def bench(func, html: str, iterations: int) -> float:
+    """Tempo médio por chamada, em milissegundos."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(html)
+    return (time.perf_counter() - start) / iterations * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iteracoes", type=int, default=200, help="chamadas por caso (padrão: 200)")
+    args = parser.parse_args()
+
+    print(f"{'página':<24}{'anterior (ms)':>15}{'novo (ms)':>12}{'ganho':>9}  saída igual")
+    total_legacy = total_new = 0.0
+    for label, fixture, legacy, new in CASES:
+        html = load_fixture(fixture)
+        same = legacy(html) == new(html)
+        legacy_ms = bench(legacy, html, args.iteracoes)
+        new_ms = bench(new, html, args.iteracoes)
+        total_legacy += legacy_ms
+        total_new += new_ms
+        print(f"{label:<24}{legacy_ms:>15.3f}{new_ms:>12.3f}{legacy_ms / new_ms:>8.1f}x  {'sim' if same else 'NÃO'}")
+    print(f"{'total':<24}{total_legacy:>15.3f}{total_new:>12.3f}{total_legacy / total_new:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
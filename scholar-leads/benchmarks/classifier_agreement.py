@@ -0,0 +1,75 @@
+"""
+Concordância do classificador local (tools/qualitative_classifier.py) com os vereditos do LLM
+registrados em benchmarks/fixtures/qualitative_labels.json.
+
+Mede, com validação cruzada leave-one-out (cada pesquisador é classificado por um modelo
+ajustado sem ele), quantos casos o classificador decide sozinho, a concordância com o LLM
+nesses casos e quantos vão para o LLM. Também mede o léxico sem ajuste.
+
+Uso: python benchmarks/classifier_agreement.py [--salvar]
+     --salvar ajusta o modelo com todos os exemplos e grava config/qualitative_classifier.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from tools.qualitative_classifier import (  # noqa: E402
+    CLASSIFIER_MODEL_PATH, QualitativeClassifier, researcher_text
+)
+
+LABELS_PATH = os.path.join(BASE_DIR, "benchmarks", "fixtures", "qualitative_labels.json")
+
+def load_labels():
+    with open(LABELS_PATH, "r", encoding="utf-8") as f:
+        exemplos = json.load(f)
+    return exemplos, np.array([e["llm_is_qualitative_researcher"] for e in exemplos])
+
+def report(nome: str, decisions, labels):
+    decididos = [(d, y) for d, y in zip(decisions, labels) if d.confident]
+    acertos = sum((d.decision == "qualitativo") == y for d, y in decididos)
+    print(f"\n{nome}")
+    print(f"  decididos localmente: {len(decididos)}/{len(labels)} ({len(decididos) / len(labels):.0%})")
+    if decididos:
+        print(f"  concordância com o LLM nos decididos: {acertos}/{len(decididos)} ({acertos / len(decididos):.0%})")
+    print(f"  enviados ao LLM (ambíguos): {len(labels) - len(decididos)}")
+    for d, y in zip(decisions, labels):
+        if d.confident and (d.decision == "qualitativo") != y:
+            print(f"  discordância: score {d.score:.2f}, LLM={'qualitativo' if y else 'nao_qualitativo'}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--salvar", action="store_true", help=f"grava o modelo ajustado em {CLASSIFIER_MODEL_PATH}")
+    args = parser.parse_args()
+
+    exemplos, labels = load_labels()
+    textos = [researcher_text(e) for e in exemplos]
+
+    report("Léxico sem ajuste", QualitativeClassifier().classify(exemplos), labels)
+
+    decisions = []
+    for i in range(len(exemplos)):
+        treino = [j for j in range(len(exemplos)) if j != i]
+        modelo = QualitativeClassifier().fit([textos[j] for j in treino], labels[treino])
+        decisions.append(modelo.classify([exemplos[i]])[0])
+    report("Modelo ajustado (leave-one-out)", decisions, labels)
+
+    modelo = QualitativeClassifier().fit(textos, labels)
+    lote = exemplos * 100
+    start = time.perf_counter()
+    modelo.classify(lote)
+    elapsed = time.perf_counter() - start
+    print(f"\nLote de {len(lote)} pesquisadores classificado em {elapsed * 1000:.1f} ms")
+
+    if args.salvar:
+        modelo.save()
+        print(f"Modelo gravado em {CLASSIFIER_MODEL_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Servidor HTTP local que substitui o Google Scholar e a API da OpenAI nos benchmarks.
+
+- /citations?view_op=search_authors  → fixtures/search.html
+- /citations?view_op=list_colleagues → fixtures/coauthors.html
+- /citations?view_op=view_citation   → fixtures/citation.html
+- /citations?user=...                → fixtures/profile.html
+- POST /v1/chat/completions          → LLM falso e determinístico (veredito do pipeline e
+                                       ciclo Thought/Action/Final Answer dos agentes da crew)
+"""
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Nome do pesquisador das fixtures
+RESEARCHER_NAME = "Maria Souza"
+RESEARCHER_USER_ID = "MSOUZA0001"
+
+ROUTES = {
+    "search_authors": "search.html",
+    "list_colleagues": "coauthors.html",
+    "view_citation": "citation.html",
+}
+
+def load_fixtures():
+    fixtures = {}
+    for name in set(ROUTES.values()) | {"profile.html"}:
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            fixtures[name] = f.read()
+    return fixtures
+
+class FakeLLM:
+    """
+    Respostas fixas no formato do chat completions da OpenAI.
+
+    - Prompt do veredito (pipeline): JSON com o veredito, decidido pela contagem de
+      termos qualitativos nos dados enviados.
+    - Prompt de agente (crew): chama a ferramenta listada no prompt com os argumentos
+      tirados da própria task e, depois da observação, devolve o resultado da ferramenta
+      como resposta final.
+    """
+
+    QUALITATIVE_TERMS = ["qualitativ", "grupos focais", "entrevista", "etnografi", "análise de conteúdo"]
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def reply(self, messages) -> str:
+        text = "\n".join(str(message.get("content") or "") for message in messages)
+        if "Dados do pesquisador:" in text:
+            return self.verdict(text.split("Dados do pesquisador:", 1)[1])
+        if "Observation:" in text:
+            observation = text.rsplit("Observation:", 1)[1].strip()
+            return f"Thought: I now know the final answer\nFinal Answer: {observation}"
+        tool = re.search(r"Tool Name: (.+)", text)
+        if not tool:
+            return "Thought: I now know the final answer\nFinal Answer: {}"
+        tool_name = tool.group(1).strip()
+        return (f"Thought: I should use the {tool_name} tool\nAction: {tool_name}\n"
+                f"Action Input: {json.dumps(self.tool_input(tool_name, text), ensure_ascii=False)}")
+
+    def tool_input(self, tool_name: str, text: str) -> dict:
+        if tool_name == "Google Scholar Search":
+            name = re.search(r"Pesquisador: '(.+?)'", text)
+            return {"researcher_name": name.group(1) if name else RESEARCHER_NAME}
+        if tool_name == "Google Scholar Crawler":
+            url = re.search(re.escape(self.base_url) + r"/citations\?[^\s'\"]*user=[\w-]+[^\s'\"]*", text)
+            return {"profile_url": url.group(0) if url else
+                    f"{self.base_url}/citations?user={RESEARCHER_USER_ID}&hl=pt-BR"}
+        return {"perfil_data": self.context_json(text)}
+
+    @staticmethod
+    def context_json(text: str) -> str:
+        """Primeiro objeto JSON do contexto da task (a saída da task anterior)."""
+        decoder = json.JSONDecoder()
+        start = text.find("context you're working with")
+        for match in re.finditer(r'\{\s*"name"', text[max(start, 0):]):
+            try:
+                data, _ = decoder.raw_decode(text[max(start, 0) + match.start():])
+                return json.dumps(data, ensure_ascii=False)
+            except json.JSONDecodeError:
+                continue
+        return "{}"
+
+    def verdict(self, data: str) -> str:
+        lowered = data.lower()
+        hits = sum(lowered.count(term) for term in self.QUALITATIVE_TERMS)
+        qualitative = hits >= 3
+        return json.dumps({
+            "qualitative_research_analysis": {
+                "contains_qualitative_research": hits > 0,
+                "is_qualitative_researcher": qualitative,
+                "detailed_analysis": f"{hits} indicadores de pesquisa qualitativa encontrados.",
+            },
+            "veredict": "Pesquisador qualitativo" if qualitative else "Pesquisa não qualitativa",
+        }, ensure_ascii=False)
+
+class StandInServer:
+    """Sobe o servidor em uma thread; `latency` e `llm_latency` simulam o tempo de rede e do LLM."""
+
+    def __init__(self, latency: float = 0.0, llm_latency: float = 0.0, port: int = 0):
+        self.latency = latency
+        self.llm_latency = llm_latency
+        self.fixtures = load_fixtures()
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self.llm = FakeLLM(self.base_url)
+        self._thread: Optional[threading.Thread] = None
+
+    def count(self, route: str):
+        with self._lock:
+            self.requests[route] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                parts = urllib.parse.urlsplit(self.path)
+                params = dict(urllib.parse.parse_qsl(parts.query))
+                fixture = ROUTES.get(params.get("view_op", ""))
+                if fixture is None and parts.path == "/citations" and "user" in params:
+                    fixture = "profile.html"
+                if fixture is None:
+                    server.count("404")
+                    self.send(404, b"not found", "text/plain")
+                    return
+                server.count(fixture.split(".")[0])
+                if server.latency:
+                    time.sleep(server.latency)
+                self.send(200, server.fixtures[fixture], "text/html; charset=utf-8")
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    server.count("404")
+                    self.send(404, b"not found", "text/plain")
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                server.count("llm")
+                if server.llm_latency:
+                    time.sleep(server.llm_latency)
+                content = server.llm.reply(body.get("messages", []))
+                response = {
+                    "id": "chatcmpl-benchmark",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                }
+                self.send(200, json.dumps(response, ensure_ascii=False).encode("utf-8"), "application/json")
+
+        return Handler
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -2,6 +2,8 @@ import os
 import json
 import yaml
 import sys
+import threading
+import time
 from crewai import Agent, Task, Crew, Process
 from tools.scholar_search_tool import ScholarSearchTool
 from tools.scholar_crawler_tool import ScholarCrawlerTool
@@ -13,23 +15,48 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-from llm_config import llm
-from langchain_openai import ChatOpenAI
+from llm_config import get_chat_llm
+from tools.metrics import analysis_tracker, instrument_litellm, stage_progress, stage_timer
+from tools.runtime import run_async
+
+# Mede cada chamada dos agentes ao LLM
+instrument_litellm()
 
 # Obter o diretório base do projeto
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_DIR = os.path.join(BASE_DIR, 'config')
 
+# Conteúdo dos YAMLs já lidos, por caminho: (mtime_ns, dados)
+_yaml_cache = {}
+_yaml_lock = threading.Lock()
+# Agentes montados uma vez por processo e o agents.yaml usado para montá-los
+_agent_templates = None
+_agent_templates_config = None
+_agent_templates_lock = threading.Lock()
+
 def load_yaml(file_path):
-    """Carrega arquivo YAML usando caminho absoluto"""
+    """
+    Carrega arquivo YAML usando caminho absoluto
+
+    O conteúdo fica em memória e só é lido de novo quando a data de modificação do arquivo
+    muda. O dict retornado é compartilhado entre as execuções e não deve ser alterado.
+    """
     absolute_path = os.path.join(CONFIG_DIR, os.path.basename(file_path))
-    with open(absolute_path, 'r') as file:
-        return yaml.safe_load(file)
+    mtime = os.stat(absolute_path).st_mtime_ns
+    cached = _yaml_cache.get(absolute_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _yaml_lock:
+        cached = _yaml_cache.get(absolute_path)
+        if cached is None or cached[0] != mtime:
+            with open(absolute_path, 'r') as file:
+                cached = (mtime, yaml.safe_load(file))
+            _yaml_cache[absolute_path] = cached
+            print(f"Configuração carregada: {os.path.basename(absolute_path)}")
+    return cached[1]
 
-def create_agents():
-    """Criar os agentes da crew"""
-    agents_config = load_yaml('agents.yaml')
-    
+def build_agents(agents_config):
+    """Monta os agentes da crew a partir da configuração"""
     # Agente buscador
     buscador = Agent(
         role=agents_config['buscador_scholar']['role'],
@@ -62,10 +89,52 @@ def create_agents():
 
     return [buscador, analista, analista_artigos]
 
-def create_tasks(agents, researcher_name, email=None, institution=None):
-    """Criar as tasks da crew"""
+def get_agent_templates():
+    """
+    Agentes-modelo do processo, montados na primeira execução e de novo apenas quando o
+    agents.yaml muda. Nunca são executados diretamente: cada execução usa cópias.
+    """
+    global _agent_templates, _agent_templates_config
+    agents_config = load_yaml('agents.yaml')
+    with _agent_templates_lock:
+        if _agent_templates is None or _agent_templates_config is not agents_config:
+            _agent_templates = build_agents(agents_config)
+            _agent_templates_config = agents_config
+        return _agent_templates
+
+def create_agents():
+    """
+    Criar os agentes da crew
+
+    Cada execução recebe cópias dos agentes-modelo (Agent.copy reaproveita as ferramentas
+    e o LLM), já que a crew guarda estado de execução nos próprios agentes.
+    """
+    return [agent.copy() for agent in get_agent_templates()]
+
+def create_tasks(agents, researcher_name, email=None, institution=None, profile_url=None):
+    """
+    Criar as tasks da crew
+
+    Se profile_url for informado, a busca já foi feita: a task de busca é omitida e
+    a URL é passada diretamente para a task de análise de perfil.
+    """
     tasks_config = load_yaml('tasks.yaml')
     
+    if profile_url:
+        task_analise = Task(
+            description=tasks_config['task_analise_scholar']['description'].format(perfil_url=profile_url),
+            agent=agents[1],  # analista
+            expected_output=tasks_config['task_analise_scholar']['expected_output'],
+            output_key="perfil_data"
+        )
+        task_analisa_artigos = Task(
+            description=tasks_config['task_analisa_artigos']['description'],
+            agent=agents[2],  # analista_artigos
+            expected_output=tasks_config['task_analisa_artigos']['expected_output'],
+            inputs={"perfil_data": "{{ perfil_data }}"}
+        )
+        return [task_analise, task_analisa_artigos]
+    
     # Task de busca
     task_busca = Task(
         description=tasks_config['task_busca_perfil']['description'].format(
@@ -97,8 +166,53 @@ def create_tasks(agents, researcher_name, email=None, institution=None):
     
     return [task_busca, task_analise, task_analisa_artigos]
 
-def executar(nome_pesquisador, email=None, institution=None):
-    """Executar o fluxo do CrewAI"""
+# Etapas executadas pela crew, na ordem das tasks
+ETAPAS = ["busca", "perfil", "artigos"]
+
+def executar(nome_pesquisador, email=None, institution=None, progress_callback=None, profile_url=None, modo="pipeline",
+             todas_publicacoes=False, incremental=False):
+    """
+    Executar o fluxo do CrewAI
+
+    progress_callback(etapa, status), se fornecido, é chamado quando cada etapa
+    (busca, perfil, artigos) começa ("running") e termina ("done").
+    profile_url, se fornecido, pula a etapa de busca e analisa diretamente esse perfil.
+    modo="pipeline" (o padrão) chama as ferramentas diretamente e usa o LLM apenas para o
+    veredito, que passa pelo classificador local e pelo cache de respostas do LLM: a nova
+    análise de um pesquisador já visto não gasta tokens. Nesse modo, todas_publicacoes=True
+    inclui a lista completa de artigos na análise e incremental=True reaproveita o que não
+    mudou desde o último resultado salvo do perfil. modo="crew" executa os agentes do CrewAI,
+    que chamam o LLM a cada execução.
+    """
+    # A duração de cada etapa é registrada nas métricas antes de repassar o progresso
+    progress_callback = stage_progress(modo, progress_callback)
+    with analysis_tracker(modo):
+        if modo == "pipeline":
+            from pipeline import executar_pipeline
+            return executar_pipeline(nome_pesquisador, email, institution, progress_callback, profile_url,
+                                     todas_publicacoes, incremental)
+        return executar_crew(nome_pesquisador, email, institution, progress_callback, profile_url)
+
+async def executar_async(nome_pesquisador, email=None, institution=None, progress_callback=None, profile_url=None,
+                         modo="pipeline", todas_publicacoes=False, incremental=False):
+    """
+    Versão assíncrona de executar, para quem já está em um loop de eventos (a API)
+
+    No modo pipeline a análise é uma corrotina no loop compartilhado de tools.runtime (o
+    próprio loop da API, quando adotado com adopt_loop), então várias análises dividem o
+    mesmo loop sem ocupar uma thread cada. A crew do CrewAI é síncrona e roda em uma thread.
+    """
+    progress_callback = stage_progress(modo, progress_callback)
+    with analysis_tracker(modo):
+        if modo == "pipeline":
+            from pipeline import executar_pipeline_async
+            return await run_async(executar_pipeline_async(nome_pesquisador, email, institution, progress_callback,
+                                                           profile_url, todas_publicacoes, incremental))
+        return await asyncio.to_thread(executar_crew, nome_pesquisador, email, institution, progress_callback,
+                                       profile_url)
+
+def executar_crew(nome_pesquisador, email=None, institution=None, progress_callback=None, profile_url=None):
+    """Executa a análise com os agentes da crew (usada por executar no modo "crew")."""
     print(f"\n🔍 Iniciando busca para: {nome_pesquisador}")
     
     # Exibir informações adicionais usadas na busca
@@ -109,28 +223,47 @@ def executar(nome_pesquisador, email=None, institution=None):
         if institution:
             print(f"  - Instituição: {institution}")
     
-    # Criar agentes
-    agents = create_agents()
+    # Criar agentes e tasks (configuração e agentes-modelo vêm da memória)
+    inicio_preparacao = time.perf_counter()
+    with stage_timer("crew_setup"):
+        agents = create_agents()
+        tasks = create_tasks(agents, nome_pesquisador, email, institution, profile_url)
+    print(f"⏱️ Preparação da crew: {(time.perf_counter() - inicio_preparacao) * 1000:.1f} ms")
+    etapas = ETAPAS
+    if profile_url:
+        print(f"  - Perfil já conhecido: {profile_url}")
+        agents = agents[1:]
+        etapas = ETAPAS[1:]
+        if progress_callback is not None:
+            progress_callback(ETAPAS[0], "done")
     
-    # Criar tasks
-    tasks = create_tasks(agents, nome_pesquisador, email, institution)
-    
-    # Configurar LLM
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0,
-        verbose=True
-    )
+    # LLM do gerente (cliente compartilhado entre execuções)
+    llm = get_chat_llm("gpt-4o-mini")
     
+    # Notificar o progresso a cada task concluída
+    etapas_concluidas = []
+
+    def task_callback(output):
+        if progress_callback is None or len(etapas_concluidas) >= len(etapas):
+            return
+        etapa = etapas[len(etapas_concluidas)]
+        etapas_concluidas.append(etapa)
+        progress_callback(etapa, "done")
+        if len(etapas_concluidas) < len(etapas):
+            progress_callback(etapas[len(etapas_concluidas)], "running")
+
     # Criar e executar crew
     crew = Crew(
         agents=agents,
         tasks=tasks,
         manager_llm=llm,
         process=Process.sequential,
-        verbose=True
+        verbose=True,
+        task_callback=task_callback
     )
 
+    if progress_callback is not None:
+        progress_callback(etapas[0], "running")
     resultado = crew.kickoff()                                                                                                                                                                                                                                                                            
     print("\n✅ Análise concluída com sucesso!")
     
@@ -144,7 +277,9 @@ if __name__ == "__main__":
     email = input("Digite o domínio de email (ex: ufjf.br, pressione Enter para pular): ") or None
     institution = input("Digite a instituição (ex: UFJF, pressione Enter para pular): ") or None
     
-    result = executar(nome_pesquisador, email, institution)
+    modo = input("Modo de execução (pipeline/crew, pressione Enter para pipeline): ") or "pipeline"
+    
+    result = executar(nome_pesquisador, email, institution, modo=modo)
 
     try:
         # Se for JSON, formatar bonitinho
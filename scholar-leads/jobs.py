@@ -0,0 +1,134 @@
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Configuração do pool de execução de jobs
+JOB_WORKERS = int(os.getenv("SCHOLAR_JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("SCHOLAR_JOB_QUEUE_SIZE", "50"))
+JOB_HISTORY = int(os.getenv("SCHOLAR_JOB_HISTORY", "1000"))
+
+# Etapas do pipeline, na ordem em que são executadas (mesmas de crew.ETAPAS)
+STAGES = ["busca", "perfil", "artigos"]
+
+class JobQueueFull(Exception):
+    """A fila de jobs atingiu o limite configurado."""
+
+class Job:
+    """Uma análise enfileirada, com status e progresso por etapa."""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = "queued"
+        self.stages = {stage: "pending" for stage in STAGES}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def update_stage(self, stage: str, status: str):
+        """Callback de progresso usado pelo executar."""
+        self.stages[stage] = status
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stages": dict(self.stages),
+            "pesquisador": self.params,
+            "resultado": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+class JobManager:
+    """
+    Executa análises em segundo plano com um número fixo de workers.
+
+    `runner(params, progress_callback)` faz o trabalho de fato e retorna o resultado.
+    A fila é limitada: quando cheia, `submit` levanta JobQueueFull.
+    """
+
+    def __init__(self, runner: Callable[[Dict[str, Any], Callable[[str, str], None]], Dict[str, Any]],
+                 workers: int = JOB_WORKERS, max_queue: int = JOB_QUEUE_SIZE, history: int = JOB_HISTORY):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.history = history
+        self._queue: "queue.Queue[Job]" = queue.Queue(maxsize=max(1, max_queue))
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"scholar-job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, params: Dict[str, Any]) -> Job:
+        """Enfileira uma análise e retorna o job imediatamente."""
+        self._ensure_workers()
+        job = Job(params)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise JobQueueFull(f"Fila de jobs cheia ({self._queue.maxsize} aguardando)")
+        with self._lock:
+            self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == "running")
+        return {"workers": self.workers, "queued": self._queue.qsize(), "running": running}
+
+    def _prune(self):
+        """Descarta os jobs finalizados mais antigos além do limite de histórico."""
+        excess = len(self._jobs) - self.history
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status in ("done", "error"):
+                del self._jobs[job_id]
+                excess -= 1
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.now()
+            try:
+                job.result = self.runner(job.params, job.update_stage)
+                if isinstance(job.result, dict) and job.result.get("status") == "error":
+                    job.status = "error"
+                    job.error = job.result.get("message")
+                else:
+                    job.status = "done"
+            except Exception as e:
+                print(f"Erro no job {job.id}: {e}")
+                job.status = "error"
+                job.error = str(e)
+            finally:
+                for stage, status in job.stages.items():
+                    if status == "running":
+                        job.stages[stage] = "error" if job.status == "error" else "done"
+                job.finished_at = datetime.now()
+                self._queue.task_done()
@@ -1,10 +1,30 @@
-from crewai import LLM
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = LLM(
-    model = os.getenv("OPENAI_MODEL"),
-    api_key = os.getenv("OPENAI_API_KEY")
-)
+# crewai e langchain_openai são importados no primeiro uso: carregá-los leva segundos
+
+@lru_cache(maxsize=None)
+def get_llm():
+    """LLM padrão (crewai.LLM) configurado por OPENAI_MODEL e OPENAI_API_KEY."""
+    from crewai import LLM
+
+    return LLM(
+        model = os.getenv("OPENAI_MODEL"),
+        api_key = os.getenv("OPENAI_API_KEY")
+    )
+
+@lru_cache(maxsize=None)
+def get_chat_llm(model: str = "gpt-4o-mini", temperature: float = 0):
+    """Cliente ChatOpenAI compartilhado pelo processo (um por modelo e temperatura)."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=model, temperature=temperature)
+
+def __getattr__(name):
+    # `from llm_config import llm` continua funcionando, criando o LLM só nesse momento
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,34 +2,12 @@
 import sys
 import warnings
 import json
-import os
-from datetime import datetime
-from crew import executar
+from utils import save_result
 from rich.console import Console
 from rich.panel import Panel
 
 console = Console()
 
-def normalize_name(name: str) -> str:
-    """
-    Normaliza o nome do pesquisador para criar um caminho seguro para arquivo.
-    
-    Args:
-        name: Nome do pesquisador
-        
-    Returns:
-        str: Nome normalizado e seguro para uso em caminhos de arquivo
-    """
-    # Remove espaços extras e converte para minúsculas
-    normalized = name.strip()
-    
-    # Substitui caracteres especiais e espaços por underscore
-    import re
-    normalized = re.sub(r'[^a-zA-Z0-9\s]', '', normalized)
-    normalized = normalized.replace(' ', '_')
-    
-    return normalized
-
 def display_results(result_json: dict):
     """Exibe os resultados formatados no terminal"""
     console.print("\n✅ [green]Análise concluída com sucesso![/green]\n")
@@ -106,24 +84,6 @@ def display_results(result_json: dict):
             if "detailed_analysis" in analysis and analysis["detailed_analysis"]:
                 console.print(Panel(analysis["detailed_analysis"]))
 
-def save_result(researcher_name: str, data: dict):
-    """Salva o resultado em um arquivo JSON"""
-    # Criar diretório data se não existir
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(base_dir, 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    
-    # Criar nome do arquivo com timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"{normalize_name(researcher_name)}_{timestamp}.json"
-    filepath = os.path.join(data_dir, filename)
-    
-    # Salvar arquivo
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    return filepath
-
 def run():
     """
     Inicia a crew para busca e análise de perfil do Google Scholar.
@@ -144,9 +104,15 @@ def run():
         email = input("Digite o domínio de email (ex: ufrj.br, pressione Enter para pular): ").strip() or None
         institution = input("Digite a instituição (ex: UFRJ, pressione Enter para pular): ").strip() or None
         
-        # Executar o fluxo do CrewAI
+        # Modo de execução: crew (agentes) ou pipeline (ferramentas diretas, LLM só no veredito)
+        modo = input("Modo de execução (pipeline/crew, pressione Enter para pipeline): ").strip().lower() or "pipeline"
+        if modo not in ("crew", "pipeline"):
+            raise ValueError(f"Modo de execução inválido: {modo}")
+        
+        # Executar o fluxo do CrewAI (importado só agora: os prompts aparecem sem esperar o crewai)
         console.print("\n⏳ [bold]Buscando informações no Google Scholar...[/bold]")
-        result = executar(researcher_name, email, institution)
+        from crew import executar
+        result = executar(researcher_name, email, institution, modo=modo)
 
         # Converter o resultado para string se necessário
         if hasattr(result, 'raw_output'):
@@ -164,8 +130,8 @@ def run():
                 console.print("\nTente ajustar os termos da busca ou adicionar mais informações como instituição ou email para encontrar o perfil.")
                 return
             
-            # Salvar resultado em arquivo
-            saved_file = save_result(researcher_name, parsed_result)
+            # Salvar resultado no banco de resultados
+            registro = save_result(researcher_name, parsed_result, institution=institution, email=email)
             
             # Exibir resultados formatados
             display_results(parsed_result)
@@ -174,7 +140,7 @@ def run():
             console.print("\n📋 [bold]JSON Completo:[/bold]")
             console.print(json.dumps(parsed_result, indent=2, ensure_ascii=False))
             
-            console.print(f"\n💾 [bold]Resultado salvo em:[/bold] {saved_file}")
+            console.print(f"\n💾 [bold]Resultado salvo no banco:[/bold] user_id={registro['user_id']}, registro #{registro['result_id']}")
             
         except json.JSONDecodeError:
             # Se não for JSON, mostrar como texto
@@ -186,5 +152,10 @@ def run():
         sys.exit(1)
 
 if __name__ == "__main__":
+    if "--startup-report" in sys.argv:
+        # Tempo de import do CLI e da crew, por pacote
+        from tools.startup import startup_report
+        startup_report(["main", "crew"])
+        sys.exit(0)
     warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
     run()
\ No newline at end of file
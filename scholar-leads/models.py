@@ -6,7 +6,14 @@ class Article(BaseModel):
     title: str = Field(..., description="article title")
     url: HttpUrl = Field(..., description="article URL")
     abstract: Optional[str] = Field(None, description="article abstract/summary extracted from the article page")
-    artigo_completo: Optional[HttpUrl] = Field(None, description="URL do artigo completo encontrado pela ferramenta articles_analyzer_tool")
+    artigo_completo: Optional[HttpUrl] = Field(None, description="URL do artigo completo, extraída da página do artigo junto com o resumo")
+
+class Publication(BaseModel):
+    """Modelo para representar uma linha da tabela completa de artigos do perfil"""
+    title: str = Field(..., description="article title")
+    url: Optional[HttpUrl] = Field(None, description="article URL")
+    year: Optional[int] = Field(None, description="publication year")
+    citations: int = Field(0, description="number of citations")
 
 class Coauthor(BaseModel):
     """Modelo para representar um coautor"""
@@ -30,6 +37,10 @@ class ScholarProfile(BaseModel):
         default_factory=list,
         description="list of coauthors"
     )
+    publications: List[Publication] = Field(
+        default_factory=list,
+        description="complete list of the researcher's articles (only when requested)"
+    )
     veredict: Optional[str] = Field(None, description="If this researcher does qualitative research")
 
 class CamposPesquisa(BaseModel):
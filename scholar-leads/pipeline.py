@@ -0,0 +1,225 @@
+import asyncio
+import json
+import re
+
+from crew import load_yaml
+from llm_config import get_chat_llm
+from tools.scholar_search_tool import search_scholar_profile
+from tools.scholar_crawler_tool import crawl_scholar_profile
+from tools.articles_analyzer_tool import ArticleAnalyzerHelper
+from tools.disambiguation import rank_candidates
+from tools.events import publish
+from tools.llm_cache import get_llm_cache, llm_cache_key
+from tools.metrics import REFRESH_ITEMS, llm_call_timer
+from tools.page_cache import scholar_user_id
+from tools.qualitative_classifier import classify_profile, local_verdict
+from tools.refresh import RefreshReport, previous_verdict
+from tools.runtime import run_sync
+
+# Modos de execução disponíveis para a análise
+MODOS = ["crew", "pipeline"]
+# Modelo usado no veredito
+VERDICT_MODEL = "gpt-4o-mini"
+# Versão da montagem do prompt e da leitura da resposta do veredito; incremente ao mudar
+# build_verdict_messages ou parse_verdict para invalidar o cache de respostas do LLM
+VERDICT_PROMPT_VERSION = "1"
+# Limite de títulos da lista completa de artigos enviados ao LLM
+MAX_PUBLICATIONS_IN_PROMPT = 200
+
+def build_verdict_messages(perfil: dict):
+    """Monta as mensagens enviadas ao LLM para o veredito qualitativo."""
+    agents_config = load_yaml('agents.yaml')['analista_artigos']
+    task_config = load_yaml('tasks.yaml')['task_veredito_qualitativo']
+
+    artigos = [
+        {"title": artigo.get("title"), "abstract": artigo.get("abstract")}
+        for artigo in perfil.get("articles", [])
+    ]
+    dados = {
+        "name": perfil.get("name"),
+        "research_area": perfil.get("research_area"),
+        "articles": artigos,
+    }
+    # Com a lista completa de artigos, o LLM também recebe os títulos (e anos) do restante do corpus
+    publicacoes = perfil.get("publications") or []
+    if publicacoes:
+        dados["all_publication_titles"] = [
+            f"{p.get('title')} ({p.get('year')})" if p.get("year") else p.get("title")
+            for p in publicacoes[:MAX_PUBLICATIONS_IN_PROMPT]
+        ]
+
+    system = f"{agents_config['role']}\n{agents_config['goal']}\n{agents_config['backstory']}"
+    user = (
+        f"{task_config['description']}\n{task_config['expected_output']}\n"
+        f"Dados do pesquisador:\n{json.dumps(dados, ensure_ascii=False)}"
+    )
+    return [("system", system), ("human", user)]
+
+def parse_verdict(content: str) -> dict:
+    """Extrai o JSON do veredito da resposta do LLM."""
+    match = re.search(r'\{.*\}', content, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group(0))
+        except json.JSONDecodeError:
+            pass
+    return {"veredict": content.strip()}
+
+async def qualitative_verdict(perfil: dict) -> dict:
+    """
+    Única chamada ao LLM do pipeline: o veredito sobre pesquisa qualitativa.
+    Casos claros (positivos ou negativos) são decididos pelo classificador local sem chamar o
+    LLM (em um lote, junto com os outros perfis do lote; ver ClassifierBatcher); se as
+    mesmas mensagens já foram enviadas ao mesmo modelo, a resposta vem do cache.
+    """
+    decision = await classify_profile(perfil)
+    if decision is not None and decision.confident:
+        print(f"Veredito decidido localmente ({decision.decision}, score {decision.score:.2f})")
+        verdict = local_verdict(decision)
+        verdict["classifier"] = {"score": decision.score, "decision": decision.decision, "source": "local"}
+        publish("veredito", verdict)
+        return verdict
+
+    messages = build_verdict_messages(perfil)
+    cache = get_llm_cache()
+    key = llm_cache_key(VERDICT_MODEL, VERDICT_PROMPT_VERSION, messages)
+    verdict = await asyncio.to_thread(cache.get, key) if cache is not None else None
+    if verdict is not None:
+        print("Veredito recuperado do cache (artigos sem alteração)")
+    else:
+        with llm_call_timer("veredito", VERDICT_MODEL):
+            response = await get_chat_llm(VERDICT_MODEL).ainvoke(messages)
+        verdict = parse_verdict(response.content)
+        if cache is not None and "qualitative_research_analysis" in verdict:
+            await asyncio.to_thread(cache.set, key, verdict)
+    if decision is not None:
+        verdict["classifier"] = {"score": decision.score, "decision": decision.decision, "source": "llm"}
+    publish("veredito", verdict)
+    return verdict
+
+def stored_result(profile_url):
+    """Último resultado salvo do perfil, ou None."""
+    from store import get_store
+    user_id = scholar_user_id(profile_url)
+    registro = get_store().get(user_id) if user_id else None
+    return registro["resultado"] if registro else None
+
+async def executar_pipeline_async(nome_pesquisador, email=None, institution=None,
+                                  progress_callback=None, profile_url=None, todas_publicacoes=False,
+                                  incremental=False):
+    """
+    Executa busca → crawling do perfil → links dos artigos diretamente no código,
+    usando o LLM apenas para o veredito qualitativo.
+    Com todas_publicacoes=True, a lista completa de artigos do perfil também é buscada.
+    Com incremental=True, o perfil é comparado com o último resultado salvo: só os artigos
+    novos são buscados e o veredito só é refeito se os artigos analisados mudaram (ver
+    tools/refresh.py); o que foi reaproveitado vai em `refresh`.
+    Retorna o JSON final no mesmo formato produzido pela crew.
+    """
+    print(f"\n🔍 Iniciando pipeline direto para: {nome_pesquisador}")
+
+    def progresso(etapa, status):
+        if progress_callback is not None:
+            progress_callback(etapa, status)
+
+    # Etapa 1: busca do perfil (pulada quando a URL já é conhecida). Com vários candidatos,
+    # os cabeçalhos são comparados com as pistas e só o melhor é analisado a fundo
+    ranking = []
+    if not profile_url:
+        progresso("busca", "running")
+        resultado_busca = await search_scholar_profile(nome_pesquisador, email, institution)
+        perfis = [linha.strip() for linha in resultado_busca.splitlines() if linha.strip().startswith("http")]
+        if not perfis:
+            progresso("busca", "error")
+            return json.dumps({"error": resultado_busca}, ensure_ascii=False)
+        ranking = await rank_candidates(perfis, nome_pesquisador, email, institution)
+        profile_url = ranking[0].profile_url
+        print(f"Perfil selecionado: {profile_url}")
+    progresso("busca", "done")
+
+    # Etapa 2: crawling do perfil (incremental, se houver um resultado salvo)
+    progresso("perfil", "running")
+    anterior = await asyncio.to_thread(stored_result, profile_url) if incremental else None
+    if incremental and anterior is None:
+        print("Nenhum resultado salvo para este perfil; fazendo a análise completa")
+    perfil = json.loads(await crawl_scholar_profile(profile_url, all_publications=todas_publicacoes,
+                                                    previous=anterior))
+    if "error" in perfil:
+        progresso("perfil", "error")
+        return json.dumps(perfil, ensure_ascii=False)
+    progresso("perfil", "done")
+
+    # Etapa 3: links completos dos artigos e veredito qualitativo
+    progresso("artigos", "running")
+    perfil = await ArticleAnalyzerHelper().add_full_article_links(perfil)
+    verdict = previous_verdict(anterior, perfil)
+    verdict_reused = verdict is not None
+    if verdict_reused:
+        print("Veredito reaproveitado do resultado anterior (artigos sem alteração)")
+        publish("veredito", verdict)
+    else:
+        verdict = await qualitative_verdict(perfil)
+    perfil.update(verdict)
+    if "refresh" in perfil:
+        report = RefreshReport(**perfil["refresh"])
+        report.verdict = "reused" if verdict_reused else "rerun"
+        REFRESH_ITEMS.labels(item="verdict", action=report.verdict).inc()
+        perfil["refresh"] = report.to_dict()
+        print(f"♻️ Atualização incremental: {report.summary()}")
+    progresso("artigos", "done")
+
+    if len(ranking) > 1:
+        perfil["candidate_ranking"] = [candidato.to_dict() for candidato in ranking]
+
+    print("\n✅ Análise concluída com sucesso!")
+    return json.dumps(perfil, ensure_ascii=False)
+
+def executar_pipeline(nome_pesquisador, email=None, institution=None,
+                      progress_callback=None, profile_url=None, todas_publicacoes=False, incremental=False):
+    """Versão síncrona de executar_pipeline_async."""
+    return run_sync(executar_pipeline_async(
+        nome_pesquisador, email, institution, progress_callback, profile_url, todas_publicacoes, incremental
+    ))
+
+def atualizar_resultados(user_ids=None, todas_publicacoes=False):
+    """
+    Atualiza de forma incremental os pesquisadores salvos (todos, do mais antigo para o mais
+    recente, ou só `user_ids`) e grava os novos resultados. Imprime o que cada atualização
+    reaproveitou e o total do ciclo; retorna os totais.
+    """
+    from crew import executar
+    from store import get_store
+    from utils import save_result
+
+    store = get_store()
+    totais = {"pesquisadores": 0, "erros": 0, "resumos_reaproveitados": 0, "resumos_buscados": 0,
+              "coautores_reaproveitados": 0, "vereditos_reaproveitados": 0}
+    for user_id in user_ids or store.user_ids():
+        registro = store.get(user_id)
+        if registro is None:
+            print(f"⚠️ {user_id}: nenhum resultado salvo")
+            continue
+        nome = registro["name"] or registro["resultado"].get("name") or user_id
+        try:
+            resultado = json.loads(executar(nome, profile_url=registro["profile_url"], modo="pipeline",
+                                            todas_publicacoes=todas_publicacoes, incremental=True))
+        except Exception as e:
+            resultado = {"error": str(e)}
+        if "error" in resultado:
+            print(f"❌ {nome}: {resultado['error']}")
+            totais["erros"] += 1
+            continue
+        save_result(nome, resultado, institution=registro["institution"], email=registro["email_domain"])
+        report = RefreshReport(**resultado["refresh"])
+        totais["pesquisadores"] += 1
+        totais["resumos_reaproveitados"] += len(report.articles_reused)
+        totais["resumos_buscados"] += len(report.articles_fetched)
+        totais["coautores_reaproveitados"] += report.coauthors == "reused"
+        totais["vereditos_reaproveitados"] += report.verdict == "reused"
+        print(f"✅ {nome}: {report.summary()}")
+
+    print(f"\n♻️ Ciclo de atualização: {totais['pesquisadores']} pesquisadores ({totais['erros']} com erro), "
+          f"resumos {totais['resumos_reaproveitados']} reaproveitados / {totais['resumos_buscados']} buscados, "
+          f"coautores reaproveitados em {totais['coautores_reaproveitados']}, "
+          f"vereditos reaproveitados em {totais['vereditos_reaproveitados']}")
+    return totais
@@ -0,0 +1,217 @@
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from tools.page_cache import scholar_user_id
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+DB_PATH = os.getenv("SCHOLAR_DB_PATH", os.path.join(DATA_DIR, "scholar_leads.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    researcher_name TEXT NOT NULL,
+    crawled_at TEXT NOT NULL,
+    source TEXT UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_user ON results(user_id, crawled_at);
+
+CREATE TABLE IF NOT EXISTS researchers (
+    user_id TEXT PRIMARY KEY,
+    name TEXT,
+    institution TEXT,
+    email_domain TEXT,
+    research_area TEXT,
+    profile_url TEXT,
+    crawled_at TEXT NOT NULL,
+    latest_result_id INTEGER NOT NULL REFERENCES results(id)
+);
+CREATE INDEX IF NOT EXISTS idx_researchers_name ON researchers(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_researchers_institution ON researchers(institution COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_researchers_email_domain ON researchers(email_domain COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_researchers_area ON researchers(research_area COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_researchers_crawled_at ON researchers(crawled_at);
+"""
+
+def email_domain(email: Optional[str]) -> Optional[str]:
+    """Retorna o domínio de um email (ou o próprio valor, se já for só o domínio)."""
+    if not email:
+        return None
+    return email.strip().lower().split("@")[-1] or None
+
+class ResultStore:
+    """
+    Armazena os resultados das análises em SQLite, indexados pelo id do Scholar (user=).
+
+    Cada análise gera uma linha em `results` (histórico completo); a tabela `researchers`
+    aponta para o resultado mais recente de cada pesquisador e indexa os campos de busca.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def save(self, researcher_name: str, data: Dict[str, Any], institution: Optional[str] = None,
+             email: Optional[str] = None, crawled_at: Optional[datetime] = None,
+             source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Grava um resultado e atualiza o índice do pesquisador.
+        Retorna os ids gravados ({"result_id", "user_id"}).
+        """
+        crawled_at = (crawled_at or datetime.now()).isoformat(timespec="seconds")
+        profile_url = data.get("profile_url")
+        user_id = scholar_user_id(str(profile_url)) if profile_url else None
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO results (user_id, researcher_name, crawled_at, source, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, researcher_name, crawled_at, source, json.dumps(data, ensure_ascii=False)),
+            )
+            if cursor.rowcount == 0:
+                # Arquivo já importado anteriormente
+                row = self._conn.execute("SELECT id FROM results WHERE source = ?", (source,)).fetchone()
+                return {"result_id": row["id"], "user_id": user_id}
+            result_id = cursor.lastrowid
+
+            if user_id:
+                self._conn.execute(
+                    """
+                    INSERT INTO researchers
+                        (user_id, name, institution, email_domain, research_area, profile_url, crawled_at, latest_result_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET
+                        name = excluded.name,
+                        institution = COALESCE(excluded.institution, researchers.institution),
+                        email_domain = COALESCE(excluded.email_domain, researchers.email_domain),
+                        research_area = excluded.research_area,
+                        profile_url = excluded.profile_url,
+                        crawled_at = excluded.crawled_at,
+                        latest_result_id = excluded.latest_result_id
+                    WHERE excluded.crawled_at >= researchers.crawled_at
+                    """,
+                    (user_id, data.get("name") or researcher_name, institution, email_domain(email),
+                     data.get("research_area"), str(profile_url), crawled_at, result_id),
+                )
+            self._conn.commit()
+        return {"result_id": result_id, "user_id": user_id}
+
+    def get(self, user_id: str, history: bool = False) -> Optional[Dict[str, Any]]:
+        """Retorna o índice do pesquisador com o resultado mais recente (e, opcionalmente, o histórico)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.*, res.data FROM researchers r JOIN results res ON res.id = r.latest_result_id "
+                "WHERE r.user_id = ?", (user_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            record = self._row_to_dict(row)
+            if history:
+                rows = self._conn.execute(
+                    "SELECT id, crawled_at, data FROM results WHERE user_id = ? ORDER BY crawled_at DESC",
+                    (user_id,)
+                ).fetchall()
+                record["historico"] = [
+                    {"result_id": r["id"], "crawled_at": r["crawled_at"], "resultado": json.loads(r["data"])}
+                    for r in rows
+                ]
+        return record
+
+    def user_ids(self) -> List[str]:
+        """Ids de todos os pesquisadores salvos, do resultado mais antigo para o mais recente."""
+        with self._lock:
+            rows = self._conn.execute("SELECT user_id FROM researchers ORDER BY crawled_at").fetchall()
+        return [row["user_id"] for row in rows]
+
+    def search(self, name: Optional[str] = None, institution: Optional[str] = None,
+               email_domain: Optional[str] = None, research_area: Optional[str] = None,
+               limit: int = 100) -> List[Dict[str, Any]]:
+        """Busca pesquisadores pelos campos indexados (correspondência parcial, sem diferenciar maiúsculas)."""
+        filters, params = [], []
+        for column, value in (("name", name), ("institution", institution),
+                              ("email_domain", email_domain), ("research_area", research_area)):
+            if value:
+                filters.append(f"r.{column} LIKE ? COLLATE NOCASE")
+                params.append(f"%{value}%")
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT r.*, res.data FROM researchers r JOIN results res ON res.id = r.latest_result_id "
+                f"{where} ORDER BY r.crawled_at DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        record = {key: row[key] for key in row.keys() if key != "data"}
+        record["resultado"] = json.loads(row["data"])
+        return record
+
+    def import_json_dir(self, data_dir: str = DATA_DIR) -> int:
+        """
+        Importa os arquivos <nome>_<AAAAMMDD_HHMMSS>.json gerados pela versão anterior.
+        Arquivos já importados são ignorados. Retorna quantos foram importados.
+        """
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+            filename = os.path.basename(path)
+            match = re.match(r'(.+)_(\d{8}_\d{6})\.json$', filename)
+            if match:
+                researcher_name = match.group(1).replace('_', ' ')
+                crawled_at = datetime.strptime(match.group(2), '%Y%m%d_%H%M%S')
+            else:
+                researcher_name = os.path.splitext(filename)[0]
+                crawled_at = datetime.fromtimestamp(os.path.getmtime(path))
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignorando {filename}: {e}")
+                continue
+            if not isinstance(data, dict):
+                print(f"Ignorando {filename}: conteúdo não é um objeto JSON")
+                continue
+            before = self._conn.total_changes
+            self.save(data.get("name") or researcher_name, data, crawled_at=crawled_at, source=filename)
+            if self._conn.total_changes > before:
+                imported += 1
+        return imported
+
+_store: Optional[ResultStore] = None
+
+def get_store() -> ResultStore:
+    """Retorna o store de resultados do processo."""
+    global _store
+    if _store is None:
+        _store = ResultStore()
+    return _store
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "importar":
+        data_dir = sys.argv[2] if len(sys.argv) > 2 else DATA_DIR
+        total = get_store().import_json_dir(data_dir)
+        print(f"✅ {total} arquivos importados de {data_dir} para {get_store().path}")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "atualizar":
+        # Atualização incremental dos pesquisadores salvos (todos ou os ids informados)
+        from pipeline import atualizar_resultados
+        args = [arg for arg in sys.argv[2:] if not arg.startswith("--")]
+        atualizar_resultados(args or None, todas_publicacoes="--todas-publicacoes" in sys.argv)
+    else:
+        print("Uso: python store.py importar [diretorio_data]")
+        print("     python store.py atualizar [user_id ...] [--todas-publicacoes]")
@@ -1,9 +1,73 @@
 import streamlit as st
 import json
+import queue
+import threading
 from crew import executar
 import os
+from tools.events import subscribe
 from utils import save_result
 
+def executar_com_eventos(pesquisador, email, institution, modo):
+    """
+    Executa a análise em uma thread e mostra os resultados parciais publicados pelas
+    ferramentas (tools.events) conforme chegam: candidatos, cabeçalho do perfil, resumos,
+    coautores e veredito. Só a thread do script pode atualizar a página, então os eventos
+    passam por uma fila. Os quadros parciais são apagados ao final, quando o resultado
+    completo é exibido.
+    """
+    eventos = queue.Queue()
+    saida = {}
+    etapa_atual = st.empty()
+    candidatos = st.empty()
+    perfil = st.empty()
+    resumos = st.empty()
+    coautores = st.empty()
+    veredito = st.empty()
+
+    def analisar():
+        try:
+            with subscribe(lambda evento, dados: eventos.put((evento, dados))):
+                saida["resultado"] = executar(
+                    pesquisador, email, institution, modo=modo,
+                    progress_callback=lambda etapa, status: eventos.put(("progresso", {"etapa": etapa, "status": status}))
+                )
+        except Exception as e:
+            saida["erro"] = e
+        finally:
+            eventos.put(None)
+
+    threading.Thread(target=analisar, daemon=True).start()
+    resumos_recebidos = []
+    coautores_recebidos = []
+    while True:
+        item = eventos.get()
+        if item is None:
+            break
+        evento, dados = item
+        if evento == "progresso":
+            etapa_atual.caption(f"Etapa {dados['etapa']}: {'concluída' if dados['status'] == 'done' else 'em andamento'}")
+        elif evento == "candidatos":
+            candidatos.caption(f"🔎 {len(dados['perfis'])} perfis candidatos encontrados")
+        elif evento == "perfil":
+            perfil.info(f"👤 {dados['name']} · {dados.get('research_area') or 'área não informada'} · "
+                        f"{dados.get('total_citations')} citações · {len(dados.get('articles') or [])} artigos")
+        elif evento == "resumo":
+            resumos_recebidos.append(dados)
+            com_resumo = sum(1 for r in resumos_recebidos if r.get("abstract"))
+            resumos.caption(f"📝 Resumos: {len(resumos_recebidos)} artigos lidos, {com_resumo} com resumo")
+        elif evento == "coautores":
+            coautores_recebidos.extend(dados["coautores"])
+            coautores.caption(f"👥 {len(coautores_recebidos)} coautores: "
+                              + ", ".join(c["name"] for c in coautores_recebidos[:10]))
+        elif evento == "veredito" and dados.get("veredict"):
+            veredito.info(f"🔬 {dados['veredict']}")
+
+    for quadro in (etapa_atual, candidatos, perfil, resumos, coautores, veredito):
+        quadro.empty()
+    if "erro" in saida:
+        raise saida["erro"]
+    return saida["resultado"]
+
 # Configuração da página
 st.set_page_config(page_title="Google Scholar Leads Search", page_icon="🔍", layout="centered")
 
@@ -18,6 +82,12 @@ with st.expander("Opções avançadas para melhorar a busca"):
     st.markdown("Estas informações são usadas para melhorar a precisão da busca quando existem múltiplos pesquisadores com o mesmo nome.")
     email_domain = st.text_input("Domínio do email (opcional, ex: ufjf.edu.br):")
     instituicao = st.text_input("Instituição (opcional, ex: UFJF):")
+    modo = st.radio(
+        "Modo de execução:",
+        ["pipeline", "crew"],
+        horizontal=True,
+        help="pipeline chama as ferramentas diretamente e usa o LLM apenas para o veredito (mais rápido, reprodutível e com cache); crew executa os agentes."
+    )
 
 # Botão para iniciar a busca
 if st.button("Buscar e Analisar"):
@@ -28,8 +98,8 @@ if st.button("Buscar e Analisar"):
                 email = email_domain.strip() if email_domain.strip() else None
                 institution = instituicao.strip() if instituicao.strip() else None
                 
-                # Executa o CrewAI
-                resultado = executar(pesquisador, email, institution)
+                # Executa a análise, exibindo os resultados parciais enquanto ela roda
+                resultado = executar_com_eventos(pesquisador, email, institution, modo)
                 
                 # Converter o resultado para string se necessário
                 if hasattr(resultado, 'raw_output'):
@@ -47,8 +117,8 @@ if st.button("Buscar e Analisar"):
                         st.info("Tente ajustar os termos da busca ou adicionar mais informações como instituição ou email para encontrar o perfil.")
                         st.stop()
                     
-                    # Salvar em arquivo
-                    filepath = save_result(pesquisador, resultado_json)
+                    # Salvar no banco de resultados
+                    registro = save_result(pesquisador, resultado_json, institution=institution, email=email)
                     
                     # Exibir os dados estruturados
                     st.success("✅ Análise concluída com sucesso!")
@@ -262,9 +332,9 @@ if st.button("Buscar e Analisar"):
                                     delta=None
                                 )
                     
-                    # Arquivo salvo
+                    # Registro salvo
                     st.divider()
-                    st.caption(f"💾 Resultado salvo em: {filepath}")
+                    st.caption(f"💾 Resultado salvo no banco: user_id={registro['user_id']}, registro #{registro['result_id']}")
                     
                 except json.JSONDecodeError:
                     st.error(f"❌ Erro ao processar os dados: Não foi possível interpretar o resultado como JSON.")
@@ -0,0 +1,74 @@
+import types
+
+import pytest
+
+from tools import disk_cache
+from tools.disk_cache import DiskCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio controlado pelo teste no lugar de time.time() do cache."""
+    now = {"t": 1_000_000.0}
+    monkeypatch.setattr(disk_cache, "time", types.SimpleNamespace(time=lambda: now["t"]))
+    return now
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache" / "entries.sqlite3")
+
+def test_ttl_expires_entries(clock, cache_path):
+    cache = DiskCache(cache_path, max_bytes=10_000, default_ttl=60)
+    cache.set("curta", b"a", ttl=10)
+    cache.set("padrao", b"b")
+    clock["t"] += 30
+    assert cache.get("curta") is None
+    assert cache.get("padrao") == b"b"
+    clock["t"] += 31
+    assert cache.get("padrao") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_evicts_least_recently_used(clock, cache_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "ACCESS_RESOLUTION", 0)
+    cache = DiskCache(cache_path, max_bytes=300, default_ttl=3600)
+    for key in ("a", "b", "c"):
+        cache.set(key, b"x" * 100)
+        clock["t"] += 1
+    assert cache.get("a") is not None  # "a" passa a ser a mais recente
+    clock["t"] += 1
+    cache.set("d", b"x" * 100)
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+    assert cache.stats()["bytes"] == 300
+
+def test_recent_access_is_not_rewritten(clock, cache_path):
+    cache = DiskCache(cache_path, max_bytes=10_000, default_ttl=3600)
+    cache.set("a", b"1")
+    clock["t"] += disk_cache.ACCESS_RESOLUTION / 2
+    cache.get("a")
+    assert cache._pending_access == {}
+    clock["t"] += disk_cache.ACCESS_RESOLUTION
+    cache.get("a")
+    assert cache._pending_access == {"a": clock["t"]}
+
+def test_size_total_tracks_replace_delete_and_reopen(clock, cache_path):
+    cache = DiskCache(cache_path, max_bytes=10_000, default_ttl=3600)
+    cache.set("a", b"x" * 100)
+    cache.set("a", b"x" * 40)
+    cache.set("b", b"x" * 10)
+    cache.delete("b")
+    cache.delete("inexistente")
+    assert cache.stats()["bytes"] == 40
+    cache.close()
+    reopened = DiskCache(cache_path, max_bytes=10_000, default_ttl=3600)
+    stats = reopened.stats()
+    assert (stats["entries"], stats["bytes"]) == (1, 40)
+    assert reopened.get("a") == b"x" * 40
+
+def test_entry_larger_than_limit_does_not_stay(clock, cache_path):
+    cache = DiskCache(cache_path, max_bytes=100, default_ttl=3600)
+    cache.set("a", b"x" * 50)
+    clock["t"] += 1
+    cache.set("grande", b"x" * 500)
+    assert cache.stats()["bytes"] <= 100
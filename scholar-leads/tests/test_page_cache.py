@@ -0,0 +1,24 @@
+from tools.page_cache import canonical_url, page_type, scholar_user_id
+
+def test_canonical_url_scholar_keeps_relevant_params_in_order():
+    a = canonical_url("http://scholar.google.com.br/citations?hl=pt-BR&user=ABC123&oi=ao&cstart=20&pagesize=100")
+    b = canonical_url("https://scholar.google.com/citations?pagesize=100&user=ABC123&cstart=20&hl=en")
+    assert a == b == "https://scholar.google.com/citations?cstart=20&pagesize=100&user=ABC123"
+
+def test_canonical_url_keeps_sortby():
+    assert canonical_url("https://scholar.google.com/citations?user=X&sortby=pubdate") != \
+        canonical_url("https://scholar.google.com/citations?user=X")
+
+def test_canonical_url_other_sites():
+    url = "https://www.Revista.org/artigo/1?utm_source=scholar&id=7&utm_medium=x#secao"
+    assert canonical_url(url) == "https://www.revista.org/artigo/1?id=7"
+    assert canonical_url("https://doi.org") == "https://doi.org/"
+
+def test_page_type_and_user_id():
+    assert page_type("https://scholar.google.com/citations?view_op=search_authors&mauthors=x") == "search"
+    assert page_type("https://scholar.google.com/citations?view_op=list_colleagues&user=X") == "coauthors"
+    assert page_type("https://scholar.google.com/citations?view_op=view_citation&citation_for_view=X:1") == "article"
+    assert page_type("https://scholar.google.com/citations?user=X") == "profile"
+    assert page_type("https://doi.org/10.1/x") == "external"
+    assert scholar_user_id("https://scholar.google.com/citations?hl=en&user=ABC123") == "ABC123"
+    assert scholar_user_id("https://doi.org/10.1/x") is None
@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+from conftest import FIXTURES_DIR
+from tools.qualitative_classifier import ClassifierBatcher, QualitativeClassifier, classifier_batch, classify_profile
+
+def perfil(*titulos):
+    return {"articles": [{"title": titulo, "abstract": None} for titulo in titulos]}
+
+def test_clear_cases_are_decided_locally():
+    decisions = QualitativeClassifier().classify([
+        perfil("Grupos focais e etnografia escolar", "Análise temática de entrevistas semiestruturadas"),
+        perfil("Deep learning for spectroscopy", "Regression models and neural networks for sensor data"),
+        perfil(),
+    ])
+    assert [d.decision for d in decisions] == ["qualitativo", "nao_qualitativo", "ambiguo"]
+    assert decisions[0].terms["grupo focal"] == 1
+
+def test_labeled_fixture_agreement():
+    with open(f"{FIXTURES_DIR}/qualitative_labels.json", encoding="utf-8") as f:
+        exemplos = json.load(f)
+    # Os casos decididos localmente concordam com o veredito do LLM anotado no fixture
+    decisions = QualitativeClassifier().classify(exemplos)
+    confiantes = [(d, e) for d, e in zip(decisions, exemplos) if d.confident]
+    assert confiantes
+    assert all((d.decision == "qualitativo") == e["llm_is_qualitative_researcher"] for d, e in confiantes)
+
+def test_batcher_classifies_concurrent_profiles_together():
+    calls = []
+
+    class Contador(QualitativeClassifier):
+        def classify(self, perfis):
+            calls.append(len(perfis))
+            return super().classify(perfis)
+
+    async def run():
+        async def um(atraso):
+            await asyncio.sleep(atraso)
+            return await classify_profile(perfil("Etnografia e grupos focais"))
+
+        with classifier_batch(ClassifierBatcher(Contador(), window=0.05)):
+            return await asyncio.gather(um(0), um(0.01), um(0.2))
+
+    decisions = asyncio.run(run())
+    assert calls == [2, 1]
+    sozinho = QualitativeClassifier().classify([perfil("Etnografia e grupos focais")])[0]
+    assert [d.score for d in decisions] == [sozinho.score] * 3
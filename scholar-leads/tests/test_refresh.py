@@ -0,0 +1,58 @@
+from models import Publication
+from tools.refresh import previous_verdict, publications_unchanged
+
+ARTIGO = "https://scholar.google.com/citations?view_op=view_citation&citation_for_view=X:{}"
+
+def publicacao(n, **kwargs):
+    return {"title": f"Artigo {n}", "url": ARTIGO.format(n), **kwargs}
+
+def anterior(**kwargs):
+    resultado = {
+        "total_citations": 50,
+        "research_area": "Educação",
+        "articles": [{**publicacao(1), "abstract": "Resumo 1"}, {**publicacao(2), "abstract": None}],
+        "publications": [publicacao(1), publicacao(2), {"title": "Sem link", "url": None}],
+        "qualitative_research_analysis": {"is_qualitative_researcher": True},
+        "veredict": "Qualitativo",
+        "classifier": {"source": "llm"},
+    }
+    resultado.update(kwargs)
+    return resultado
+
+def atual(previous, **kwargs):
+    perfil = {key: previous[key] for key in ("research_area", "articles", "publications")}
+    perfil.update(kwargs)
+    return perfil
+
+def test_publications_unchanged_with_known_recent_rows():
+    rows = [Publication(title="Artigo 2", url=ARTIGO.format(2)), Publication(title="Sem link", url=None)]
+    assert publications_unchanged(anterior(), 50, rows)
+
+def test_publications_changed_by_citations_or_unknown_row():
+    assert not publications_unchanged(anterior(), 51, [])
+    assert not publications_unchanged(anterior(), 50, [Publication(title="Artigo 3", url=ARTIGO.format(3))])
+    assert not publications_unchanged(anterior(), 50, [Publication(title="Outro sem link", url=None)])
+    assert not publications_unchanged(anterior(publications=[]), 50, [])
+
+def test_previous_verdict_reused_when_inputs_match():
+    previous = anterior()
+    verdict = previous_verdict(previous, atual(previous))
+    assert verdict == {key: previous[key] for key in ("qualitative_research_analysis", "veredict", "classifier")}
+
+def test_previous_verdict_rerun_when_article_gains_abstract():
+    previous = anterior()
+    articles = [dict(article) for article in previous["articles"]]
+    articles[1]["abstract"] = "Resumo encontrado agora"
+    assert previous_verdict(previous, atual(previous, articles=articles)) is None
+
+def test_previous_verdict_rerun_when_articles_or_area_change():
+    previous = anterior()
+    assert previous_verdict(previous, atual(previous, research_area="Saúde")) is None
+    assert previous_verdict(previous, atual(previous, articles=previous["articles"][:1])) is None
+    assert previous_verdict(previous, atual(previous, publications=previous["publications"] + [publicacao(3)])) is None
+
+def test_previous_verdict_without_saved_verdict():
+    previous = anterior()
+    del previous["qualitative_research_analysis"]
+    assert previous_verdict(previous, atual(previous)) is None
+    assert previous_verdict(None, atual(anterior())) is None
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+
+from tools import scheduler
+from tools.scheduler import DeadlineExceeded, HostLimiter
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(scheduler.random, "uniform", lambda a, b: 1.0)
+
+def test_block_halves_rate_and_pauses_with_growing_cooldown(monkeypatch):
+    monkeypatch.setattr(scheduler, "BLOCK_COOLDOWN", 10.0)
+    limiter = HostLimiter("teste", rate=4.0, burst=2)
+    limiter.record_block()
+    assert limiter.rate == 2.0
+    assert limiter.tokens == 0.0
+    first_pause = limiter.paused_until - time.monotonic()
+    assert 9.0 < first_pause <= 10.0
+    limiter.record_block()
+    assert limiter.rate == 1.0
+    assert 19.0 < limiter.paused_until - time.monotonic() <= 20.0
+    assert limiter.stats()["blocks"] == 2
+
+def test_rate_has_a_floor():
+    limiter = HostLimiter("teste", rate=1.0, burst=1)
+    for _ in range(20):
+        limiter.record_block()
+    assert limiter.rate == pytest.approx(scheduler.MIN_RATE_FACTOR)
+
+def test_success_recovers_rate_gradually():
+    limiter = HostLimiter("teste", rate=4.0, burst=1)
+    limiter.record_block()
+    limiter.record_success()
+    assert limiter.consecutive_blocks == 0
+    assert limiter.rate == pytest.approx(2.2)
+    for _ in range(30):
+        limiter.record_success()
+    assert limiter.rate == 4.0
+
+def test_acquire_waits_for_the_pause(monkeypatch):
+    monkeypatch.setattr(scheduler, "BLOCK_COOLDOWN", 0.2)
+
+    async def run():
+        limiter = HostLimiter("teste", rate=100.0, burst=1)
+        limiter.record_block()
+        start = time.monotonic()
+        await limiter.acquire(scheduler.INTERACTIVE, timeout=2)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.18
+
+def test_acquire_deadline_during_pause(monkeypatch):
+    monkeypatch.setattr(scheduler, "BLOCK_COOLDOWN", 5.0)
+
+    async def run():
+        limiter = HostLimiter("teste", rate=100.0, burst=1)
+        limiter.record_block()
+        await limiter.acquire(scheduler.INTERACTIVE, timeout=0.05)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+
+def test_interactive_requests_go_before_batch():
+    async def run():
+        limiter = HostLimiter("teste", rate=50.0, burst=1)
+        await limiter.acquire(scheduler.INTERACTIVE, timeout=1)  # consome a única vaga
+        order = []
+
+        async def take(priority, label):
+            await limiter.acquire(priority, timeout=2)
+            order.append(label)
+
+        await asyncio.gather(take(scheduler.BATCH, "lote"), take(scheduler.INTERACTIVE, "interativo"))
+        return order
+
+    assert asyncio.run(run()) == ["interativo", "lote"]
@@ -0,0 +1,71 @@
+from conftest import load_fixture
+from tools.page_cache import scholar_user_id
+from tools.scholar_parser import (
+    EXTERNAL_ABSTRACT_SELECTORS, SCHOLAR_URL, long_value, parse_citation_page, parse_coauthors_page,
+    parse_external_abstract, parse_profile, parse_search_page
+)
+
+def test_external_abstract_generic_selectors():
+    # Página sem seletores da editora nem metadados longos: cai nos seletores genéricos
+    abstract = parse_external_abstract(load_fixture("publisher.html"), "https://www.revistas.exemplo.br/artigo/123")
+    assert abstract is not None
+    assert abstract.startswith("Este estudo discute o uso de grupos focais")
+    assert "prática docente" in abstract
+    assert "Palavras-chave" not in abstract
+
+def test_external_abstract_selectors_match_legacy_order():
+    html = "<html><body><div id='abstract'>segundo</div><paper-abstract>primeiro</paper-abstract></body></html>"
+    assert len(EXTERNAL_ABSTRACT_SELECTORS) == 5
+    assert parse_external_abstract(html) == "primeiro"
+
+def test_external_abstract_missing():
+    assert parse_external_abstract("<html><body><p>Sem resumo</p></body></html>") is None
+
+def test_profile_page():
+    page = parse_profile(load_fixture("profile.html"))
+    assert page.header.name == "Maria Souza"
+    assert page.header.email_domain == "ufjf.br"
+    assert page.header.interests == ["Educação", "Pesquisa Qualitativa", "Formação Docente"]
+    assert page.header.total_citations == 1234
+    assert len(page.articles) == 20
+    first = page.articles[0]
+    assert first.title == "Grupos focais na pesquisa em educação: uma abordagem qualitativa"
+    assert first.url.startswith(f"{SCHOLAR_URL}/citations?view_op=view_citation")
+    assert (first.year, first.citations) == (2023, 120)
+    assert [scholar_user_id(entry.href) for entry in page.coauthors][:2] == ["JLIMA0001", "APCOSTA02"]
+    assert page.coauthors_url.endswith("view_op=list_colleagues&hl=pt-BR&user=MSOUZA0001")
+
+def test_citation_page():
+    page = parse_citation_page(load_fixture("citation.html"))
+    assert page.title == "Grupos focais na pesquisa em educação: uma abordagem qualitativa"
+    assert page.description.startswith("Este estudo discute o uso de grupos focais")
+    assert page.fields["Periódico"] == "Revista Brasileira de Educação"
+    assert page.full_text_link == "https://repositorio.ufjf.br/bitstream/123/grupos_focais.pdf"
+    assert page.title_link == "https://doi.org/10.1590/S1413-24782019000100001"
+    assert long_value(page) == page.description
+
+def test_coauthors_page():
+    ids = {scholar_user_id(entry.href) for entry in parse_coauthors_page(load_fixture("coauthors.html"))}
+    assert {"JLIMA0001", "PHSILVA07", "MDUARTE08"} <= ids
+
+def test_search_page():
+    page = parse_search_page(load_fixture("search.html"))
+    assert [c.user_id for c in page.candidates] == ["MSOUZA0001", "MSOUZA0002", "MSOUZA0003"]
+    assert page.candidates[1].total_citations == 1951
+    assert page.candidates[0].email_domain == "ufjf.br"
+    assert "after_author=XYZ123abc_" in page.next_url and "astart=10" in page.next_url
+
+def test_external_abstract_publisher_selector_wins():
+    html = (
+        "<html><head><meta name='description' content='Site da editora'></head><body>"
+        "<div class='abstract'>genérico</div><div id='Abs1-content'><p>Texto da Springer.</p></div></body></html>"
+    )
+    assert parse_external_abstract(html, "https://link.springer.com/article/10.1007/x") == "Texto da Springer."
+    assert parse_external_abstract(html, "https://example.org/artigo") == "genérico"
+
+def test_external_abstract_meta_and_ieee():
+    longo = "Texto nos metadados da página, longo o bastante para não ser a descrição do site. " * 2
+    html = f"<html><head><meta name='citation_abstract' content='{longo}'></head><body></body></html>"
+    assert parse_external_abstract(html) == longo.strip()
+    ieee = '<script>xplGlobal.document.metadata={"abstract":"Um resumo \\"citado\\" no IEEE.","title":"x"};</script>'
+    assert parse_external_abstract(ieee, "https://ieeexplore.ieee.org/document/1") == 'Um resumo "citado" no IEEE.'
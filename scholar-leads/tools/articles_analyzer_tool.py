@@ -1,10 +1,13 @@
-from typing import List, Dict, Any, Type
+from typing import List, Dict, Any, Optional, Type
 from pydantic import BaseModel, Field
 import json
 import asyncio
-from bs4 import BeautifulSoup
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
 from crewai.tools import BaseTool
+from tools.events import publish
+from tools.fetcher import fetch_page
+from tools.metrics import timed_stage
+from tools.runtime import run_async, run_sync
+from tools.scholar_parser import SCHOLAR_URL, absolute_url, parse_citation_page
 
 class ArticleAnalyzerInput(BaseModel):
     """Input schema para a ferramenta ArticleAnalyzer."""
@@ -25,6 +28,9 @@ class ArticleAnalyzer(BaseTool):
     args_schema: Type[BaseModel] = ArticleAnalyzerInput
     
     def _run(self, perfil_data: str) -> str:
+        return run_sync(self._arun(perfil_data))
+
+    async def _arun(self, perfil_data: str) -> str:
         """Executa a análise dos artigos e retorna o resultado, preservando o JSON original."""
         try:
             # Converter string JSON para dicionário
@@ -39,18 +45,9 @@ class ArticleAnalyzer(BaseTool):
                     "detailed_analysis": "Não foi possível analisar os dados devido a um erro de formato JSON."
                 })
             
-            # Extrair artigos e suas URLs
-            articles = data.get('articles', [])
-            article_urls = [article['url'] for article in articles]
-            
             # Executar análise assíncrona em memória (sem depender de arquivo)
             analyzer = ArticleAnalyzerHelper()
-            full_links = asyncio.run(analyzer.get_full_article_links(article_urls))
-            
-            # Adicionar os links completos aos artigos correspondentes
-            for article, full_link in zip(articles, full_links):
-                if full_link:
-                    article['artigo_completo'] = full_link
+            data = await run_async(analyzer.add_full_article_links(data))
             
             # Retornar o JSON original com os links adicionados aos artigos
             return json.dumps(data, ensure_ascii=False)
@@ -66,34 +63,46 @@ class ArticleAnalyzer(BaseTool):
 
 # Classe auxiliar para obter os links completos dos artigos
 class ArticleAnalyzerHelper:
-    async def get_full_article_links(self, urls: List[str]) -> List[str]:
-        crawler = AsyncWebCrawler()
-        await crawler.start()
+    async def add_full_article_links(self, data: dict) -> dict:
+        """
+        Adiciona o campo artigo_completo aos artigos do perfil quando o link é encontrado.
+
+        Artigos que já trazem o campo (o crawler extrai o link ao buscar o resumo, e deixa
+        null quando a página não tem link) não são buscados de novo; só os demais vão à rede.
+        """
+        pending = [article for article in data.get('articles', [])
+                   if 'artigo_completo' not in article and article.get('url')]
+        if not pending:
+            return data
         
-        try:
-            full_links = []
-            
-            async def process_url(url: str):
-                if not url.startswith("http"):
-                    url = f"https://scholar.google.com{url}"
-                    
-                config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
-                result = await crawler.arun(url=url, config=config)
-                
-                if result.success:
-                    soup = BeautifulSoup(result.html, 'html.parser')
-                    link_elem = soup.select_one("div.gsc_oci_title_ggi a")
-                    if link_elem and link_elem.get('href'):
-                        return link_elem['href']
-                return None
+        full_links = await self.get_full_article_links([article['url'] for article in pending])
+        
+        # Os links vêm na mesma ordem das URLs (None onde não há link)
+        for article, full_link in zip(pending, full_links):
+            if full_link:
+                article['artigo_completo'] = full_link
+        return data
+
+    async def get_full_article_links(self, urls: List[str]) -> List[Optional[str]]:
+        """Busca o link do texto completo de cada URL; a lista retornada é alinhada com `urls`."""
+        @timed_stage("full_link")
+        async def process_url(article_url: str):
+            url = article_url
+            if not url.startswith("http"):
+                url = f"{SCHOLAR_URL}{url}"
                 
-            tasks = [process_url(url) for url in urls]
-            results = await asyncio.gather(*tasks)
+            result = await fetch_page(url, expect="gsc_oci_title")
             
-            return [link for link in results if link]
+            if result.success:
+                page = parse_citation_page(result.html)
+                if page is not None and page.full_text_link:
+                    full_link = absolute_url(page.full_text_link)
+                    publish("link_completo", {"url": article_url, "artigo_completo": full_link})
+                    return full_link
+            return None
             
-        finally:
-            await crawler.close()
+        tasks = [process_url(url) for url in urls]
+        return await asyncio.gather(*tasks)
 
 # Método principal para teste direto
 async def main(json_path: str):
@@ -109,8 +118,8 @@ async def main(json_path: str):
     full_links = await analyzer.get_full_article_links(article_urls)
     
     print("\nLinks completos obtidos:")
-    for link in full_links:
-        print(link)
+    for url, link in zip(article_urls, full_links):
+        print(f"{url}: {link or 'não encontrado'}")
     
     return full_links
 
@@ -119,4 +128,4 @@ if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Uso: python articles_analyzer.py caminho/para/arquivo.json")
     else:
-        asyncio.run(main(sys.argv[1]))
+        run_sync(main(sys.argv[1]))
@@ -0,0 +1,66 @@
+import os
+import urllib.parse
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, List, Optional
+
+from tools.fetcher import fetch_page
+from tools.metrics import record_failure
+from tools.scholar_parser import SCHOLAR_URL, SearchCandidate, parse_search_page
+
+# Limite de páginas seguidas na busca de autores (o Scholar mostra 10 autores por página)
+AUTHOR_SEARCH_MAX_PAGES = int(os.getenv("SCHOLAR_AUTHOR_SEARCH_MAX_PAGES", "100"))
+
+def search_authors_url(query: str) -> str:
+    """URL da primeira página da busca de autores (view_op=search_authors)."""
+    return f"{SCHOLAR_URL}/citations?view_op=search_authors&mauthors={urllib.parse.quote(query)}&hl=pt-BR"
+
+async def iter_authors(query: str, max_results: Optional[int] = None,
+                       stop: Optional[Callable[[SearchCandidate], bool]] = None,
+                       max_pages: int = AUTHOR_SEARCH_MAX_PAGES) -> AsyncIterator[SearchCandidate]:
+    """
+    Gera os autores da busca do Scholar, na ordem dos resultados, seguindo a paginação
+    (after_author/astart) página a página: cada página só é conhecida pelo link da anterior,
+    então não há como buscá-las em paralelo.
+
+    A iteração termina na última página, após `max_results` autores, em `max_pages` páginas
+    ou no primeiro autor para o qual `stop(autor)` for verdadeiro (esse autor não é gerado).
+    Autores repetidos entre páginas são descartados pelo id; uma página sem autores novos
+    encerra a busca. Quem consome pode parar a iteração a qualquer momento.
+    Levanta RuntimeError se a primeira página não puder ser buscada.
+    """
+    url = search_authors_url(query)
+    seen = set()
+    for page_number in range(1, max_pages + 1):
+        result = await fetch_page(url)
+        if not result.success:
+            if page_number == 1:
+                raise RuntimeError("Falha ao realizar a busca no Google Scholar.")
+            # Páginas seguintes: encerra com os autores já gerados
+            print(f"Falha ao buscar a página {page_number} da busca de autores")
+            return
+        page = parse_search_page(result.html)
+        if page is None:
+            record_failure("parse_error")
+            return
+        new = [candidate for candidate in page.candidates if candidate.user_id not in seen]
+        print(f"Página {page_number} da busca: {len(new)} autores")
+        for candidate in new:
+            if stop is not None and stop(candidate):
+                return
+            seen.add(candidate.user_id)
+            yield candidate
+            if max_results is not None and len(seen) >= max_results:
+                return
+        if not new or not page.next_url:
+            return
+        url = page.next_url
+
+async def search_authors(query: str, max_results: Optional[int] = None,
+                         stop: Optional[Callable[[SearchCandidate], bool]] = None,
+                         max_pages: int = AUTHOR_SEARCH_MAX_PAGES) -> List[SearchCandidate]:
+    """Retorna os autores da busca de uma vez (ver iter_authors)."""
+    candidates = []
+    async with aclosing(iter_authors(query, max_results, stop, max_pages)) as stream:
+        async for candidate in stream:
+            candidates.append(candidate)
+    return candidates
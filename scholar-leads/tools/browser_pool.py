@@ -0,0 +1,202 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, List, Optional
+
+# crawl4ai (e o Playwright) são importados só quando um navegador é configurado ou iniciado
+if TYPE_CHECKING:
+    from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+
+from tools.metrics import BROWSER_POOL
+from tools.runtime import on_shutdown
+
+# Configuração do pool (pode ser ajustada por variáveis de ambiente)
+BROWSER_POOL_SIZE = int(os.getenv("SCHOLAR_BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.getenv("SCHOLAR_BROWSER_MAX_PAGES", "200"))
+
+def default_browser_config() -> "BrowserConfig":
+    """Configuração padrão do Chromium headless usada por todas as ferramentas."""
+    from crawl4ai import BrowserConfig
+
+    return BrowserConfig(
+        headless=True,
+        verbose=False,
+        extra_args=["--disable-gpu", "--disable-dev-shm-usage", "--no-sandbox"],
+    )
+
+class PooledBrowser:
+    """Navegador emprestado do pool. Conta as páginas carregadas para permitir a reciclagem."""
+
+    def __init__(self, crawler: "AsyncWebCrawler"):
+        self.crawler = crawler
+        self.pages_served = 0
+        self.created_at = time.monotonic()
+
+    async def arun(self, url: str, config: Optional["CrawlerRunConfig"] = None, **kwargs):
+        self.pages_served += 1
+        return await self.crawler.arun(url=url, config=config, **kwargs)
+
+    def is_healthy(self) -> bool:
+        """Verifica se o processo do navegador ainda está conectado."""
+        if not getattr(self.crawler, "ready", False):
+            return False
+        try:
+            browser = self.crawler.crawler_strategy.browser_manager.browser
+        except AttributeError:
+            return True
+        return browser is None or browser.is_connected()
+
+class BrowserPool:
+    """
+    Pool de navegadores headless mantidos aquecidos entre execuções.
+
+    As ferramentas pegam um navegador emprestado (checkout), usam e devolvem (checkin).
+    Navegadores que falham na verificação de saúde ou que atingiram o limite de
+    páginas são fechados e substituídos por novos.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_pages: int = BROWSER_MAX_PAGES,
+                 browser_config: Optional["BrowserConfig"] = None):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.browser_config = browser_config or default_browser_config()
+        self._idle: List[PooledBrowser] = []
+        self._in_use = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._closed = False
+
+    @property
+    def _cond(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def _launch(self) -> PooledBrowser:
+        from crawl4ai import AsyncWebCrawler
+
+        crawler = AsyncWebCrawler(config=self.browser_config)
+        await crawler.start()
+        print("🧭 Novo navegador iniciado no pool")
+        return PooledBrowser(crawler)
+
+    async def _discard(self, browser: PooledBrowser):
+        try:
+            await browser.crawler.close()
+        except Exception as e:
+            print(f"Erro ao fechar navegador do pool: {str(e)}")
+
+    async def start(self, warm: Optional[int] = None):
+        """Pré-aquece o pool iniciando até `warm` navegadores (padrão: tamanho do pool)."""
+        target = min(self.size, warm if warm is not None else self.size)
+        async with self._cond:
+            missing = target - len(self._idle) - self._in_use
+            # Reserva as vagas antes de iniciar os navegadores fora do lock
+            self._in_use += max(0, missing)
+        launched = await asyncio.gather(*[self._launch() for _ in range(max(0, missing))],
+                                        return_exceptions=True)
+        async with self._cond:
+            for browser in launched:
+                self._in_use -= 1
+                if isinstance(browser, PooledBrowser):
+                    self._idle.append(browser)
+                else:
+                    print(f"Erro ao pré-aquecer navegador: {str(browser)}")
+            self._cond.notify_all()
+
+    async def checkout(self) -> PooledBrowser:
+        """Pega um navegador saudável do pool, esperando se todos estiverem em uso."""
+        if self._closed:
+            raise RuntimeError("O pool de navegadores já foi fechado")
+        async with self._cond:
+            while not self._idle and self._in_use >= self.size:
+                await self._cond.wait()
+            browser = self._idle.pop() if self._idle else None
+            self._in_use += 1
+
+        try:
+            if browser is not None and not browser.is_healthy():
+                print("Navegador do pool não respondeu à verificação de saúde; substituindo")
+                await self._discard(browser)
+                browser = None
+            if browser is None:
+                browser = await self._launch()
+            return browser
+        except BaseException:
+            async with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    async def checkin(self, browser: PooledBrowser, healthy: bool = True):
+        """Devolve o navegador ao pool, reciclando-o se necessário."""
+        recycle = (
+            self._closed
+            or not healthy
+            or not browser.is_healthy()
+            or browser.pages_served >= self.max_pages
+        )
+        if recycle:
+            if browser.pages_served >= self.max_pages:
+                print(f"Reciclando navegador após {browser.pages_served} páginas")
+            await self._discard(browser)
+        async with self._cond:
+            self._in_use -= 1
+            if not recycle:
+                self._idle.append(browser)
+            self._cond.notify()
+
+    @asynccontextmanager
+    async def browser(self):
+        """Context manager de checkout/checkin: `async with pool.browser() as navegador:`."""
+        browser = await self.checkout()
+        healthy = True
+        try:
+            yield browser
+        except Exception:
+            healthy = browser.is_healthy()
+            raise
+        finally:
+            await self.checkin(browser, healthy=healthy)
+
+    def stats(self) -> dict:
+        """Retorna a ocupação atual do pool."""
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+        }
+
+    async def close(self):
+        """Fecha todos os navegadores ociosos; os emprestados são fechados ao serem devolvidos."""
+        self._closed = True
+        async with self._cond:
+            idle, self._idle = self._idle, []
+        await asyncio.gather(*[self._discard(b) for b in idle])
+
+_pool: Optional[BrowserPool] = None
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Retorna o pool de navegadores do processo.
+
+    O pool pertence ao loop compartilhado de tools.runtime; use-o apenas de corrotinas
+    executadas nesse loop.
+    """
+    global _pool
+    if _pool is None or _pool._closed:
+        _pool = BrowserPool()
+    return _pool
+
+def _pool_stat(key: str):
+    # Sem criar o pool só para as métricas: antes do primeiro uso, tudo é zero
+    return lambda: _pool.stats()[key] if _pool is not None else 0
+
+for _state in ("size", "idle", "in_use"):
+    BROWSER_POOL.labels(state=_state).set_function(_pool_stat(_state))
+
+@on_shutdown
+async def close_browser_pool():
+    """Fecha o pool de navegadores do processo, se existir."""
+    if _pool is not None and not _pool._closed:
+        await _pool.close()
@@ -0,0 +1,122 @@
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, Set, Tuple
+
+from tools.fetcher import fetch_page
+from tools.page_cache import scholar_user_id
+from tools.scholar_crawler_tool import extract_coauthors
+from tools.scholar_parser import SCHOLAR_URL, parse_profile
+
+# Limites padrão da expansão do grafo de coautores
+GRAPH_MAX_DEPTH = int(os.getenv("SCHOLAR_GRAPH_MAX_DEPTH", "2"))
+GRAPH_CONCURRENCY = int(os.getenv("SCHOLAR_GRAPH_CONCURRENCY", "4"))
+GRAPH_PAGE_BUDGET = int(os.getenv("SCHOLAR_GRAPH_PAGE_BUDGET", "200"))
+
+def profile_url_for(user_id: str) -> str:
+    return f"{SCHOLAR_URL}/citations?user={user_id}&hl=pt-BR"
+
+class _Budget:
+    """Orçamento de páginas compartilhado por todas as buscas de uma expansão."""
+
+    def __init__(self, pages: int):
+        self.remaining = pages
+        self.used = 0
+
+    def take(self, pages: int = 1) -> bool:
+        if self.remaining < pages:
+            return False
+        self.remaining -= pages
+        self.used += pages
+        return True
+
+async def _crawl_node(user_id: str, budget: _Budget, semaphore: asyncio.Semaphore):
+    """Busca o perfil de um nó e retorna (user id, dados do cabeçalho, coautores)."""
+    async with semaphore:
+        if not budget.take():
+            return user_id, None, []
+        result = await fetch_page(profile_url_for(user_id), expect="gsc_prf_in")
+        page = parse_profile(result.html) if result.success else None
+        if page is None:
+            print(f"Falha ao buscar perfil do grafo: {user_id}")
+            return user_id, None, []
+        header = {
+            "name": page.header.name.strip() if page.header.name != "Unknown" else None,
+            "institution": page.header.affiliation,
+        }
+        # A página "ver todos" consome uma página extra do orçamento
+        fetch_all = page.coauthors_url is not None and budget.take()
+        coauthors = await extract_coauthors(page, owner_id=user_id, fetch_all=fetch_all)
+        return user_id, header, coauthors
+
+async def crawl_coauthor_graph(seed_url: str, max_depth: int = GRAPH_MAX_DEPTH,
+                               max_concurrency: int = GRAPH_CONCURRENCY,
+                               page_budget: int = GRAPH_PAGE_BUDGET) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Expande o grafo de coautores em largura a partir de um perfil, até a profundidade `max_depth`.
+
+    Emite eventos conforme são descobertos:
+    - {"type": "node", "user_id", "name", "profile_url", "institution", "email_domain", "depth"}
+    - {"type": "node_info", "user_id", "name", "institution"} quando o perfil do nó é buscado
+    - {"type": "edge", "source", "target"}
+    - {"type": "done", "nodes", "edges", "pages", "truncated"} ao final
+
+    Cada perfil é buscado uma única vez (conjunto de visitados por user id), com no
+    máximo `max_concurrency` buscas simultâneas e até `page_budget` páginas no total.
+    """
+    seed_id = scholar_user_id(seed_url)
+    if not seed_id:
+        raise ValueError(f"URL de perfil inválida (sem user=): {seed_url}")
+
+    budget = _Budget(page_budget)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    visited: Set[str] = {seed_id}
+    edges: Set[Tuple[str, str]] = set()
+    truncated = False
+
+    yield {"type": "node", "user_id": seed_id, "name": None, "profile_url": profile_url_for(seed_id),
+           "institution": None, "email_domain": None, "depth": 0}
+
+    frontier = [seed_id]
+    for depth in range(max_depth):
+        if not frontier:
+            break
+        next_frontier = []
+        tasks = [asyncio.ensure_future(_crawl_node(user_id, budget, semaphore)) for user_id in frontier]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                source, header, coauthors = await finished
+                if header is None:
+                    truncated = truncated or budget.remaining <= 0
+                    continue
+                if header.get("name"):
+                    yield {"type": "node_info", "user_id": source, **header}
+                for coauthor in coauthors:
+                    target = scholar_user_id(str(coauthor.profile_url)) if coauthor.profile_url else None
+                    if not target:
+                        continue
+                    if target not in visited:
+                        visited.add(target)
+                        next_frontier.append(target)
+                        yield {
+                            "type": "node",
+                            "user_id": target,
+                            "name": coauthor.name,
+                            "profile_url": profile_url_for(target),
+                            "institution": coauthor.institution,
+                            "email_domain": coauthor.email_domain,
+                            "depth": depth + 1,
+                        }
+                    edge = tuple(sorted((source, target)))
+                    if edge not in edges:
+                        edges.add(edge)
+                        yield {"type": "edge", "source": source, "target": target}
+        finally:
+            for task in tasks:
+                task.cancel()
+        frontier = next_frontier
+        if budget.remaining <= 0:
+            truncated = truncated or bool(frontier)
+            break
+
+    yield {"type": "done", "nodes": len(visited), "edges": len(edges),
+           "pages": budget.used, "truncated": truncated}
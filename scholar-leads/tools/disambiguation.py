@@ -0,0 +1,169 @@
+import asyncio
+import difflib
+import math
+import os
+import re
+import unicodedata
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
+
+from tools.events import publish
+from tools.fetcher import fetch_page
+from tools.metrics import timed_stage
+from tools.page_cache import scholar_user_id
+from tools.scholar_parser import ProfileHeader, parse_html, parse_profile_header
+
+# Quantos candidatos da busca têm o cabeçalho buscado e quantos ao mesmo tempo
+DISAMBIGUATION_MAX_CANDIDATES = int(os.getenv("SCHOLAR_DISAMBIGUATION_MAX_CANDIDATES", "10"))
+DISAMBIGUATION_CONCURRENCY = int(os.getenv("SCHOLAR_DISAMBIGUATION_CONCURRENCY", "5"))
+
+# Peso de cada critério; os de pistas não informadas (email, instituição) ficam de fora da conta
+WEIGHT_NAME = 0.3
+WEIGHT_EMAIL = 0.4
+WEIGHT_INSTITUTION = 0.3
+# Desempate pelas citações: no máximo este valor, para perfis com 10^5 citações ou mais
+CITATIONS_BONUS = 0.05
+
+# Palavras que não entram nas siglas nem ajudam a identificar uma instituição
+CONNECTIVES = {"de", "da", "do", "das", "dos", "e", "a", "o", "em", "the", "of", "and", "at"}
+INSTITUTION_STOPWORDS = CONNECTIVES | {"universidade", "university", "universidad", "federal", "instituto", "institute"}
+
+@dataclass
+class CandidateScore:
+    """Um perfil candidato, com os dados do cabeçalho e a pontuação contra as pistas da busca."""
+    profile_url: str
+    user_id: Optional[str] = None
+    name: Optional[str] = None
+    affiliation: Optional[str] = None
+    email_domain: Optional[str] = None
+    interests: List[str] = field(default_factory=list)
+    total_citations: int = 0
+    score: float = 0.0
+    reasons: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def _fold(text: Optional[str]) -> str:
+    """Minúsculas, sem acentos e só com letras, números e pontos."""
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    plain = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"[^\w.]+", " ", plain).strip()
+
+def _tokens(text: Optional[str]) -> List[str]:
+    return [token for token in re.split(r"[\s.]+", _fold(text)) if token]
+
+def _domain(email: Optional[str]) -> str:
+    """Domínio de um email ou de um domínio informado diretamente (joao@ufjf.br ou ufjf.br)."""
+    return _fold(email).split("@")[-1].strip(". ")
+
+def name_similarity(researcher_name: str, candidate_name: Optional[str]) -> float:
+    """Parecença entre nomes (0 a 1): sobreposição de partes do nome e semelhança do texto."""
+    query, candidate = _tokens(researcher_name), _tokens(candidate_name)
+    if not query or not candidate:
+        return 0.0
+    overlap = len(set(query) & set(candidate)) / len(set(query))
+    ratio = difflib.SequenceMatcher(None, " ".join(query), " ".join(candidate)).ratio()
+    return max(overlap, ratio)
+
+def email_match(email: str, candidate_domain: Optional[str]) -> float:
+    """1 para o mesmo domínio (ou subdomínio), 0.8 para a mesma organização em outro domínio."""
+    hint, domain = _domain(email), _domain(candidate_domain)
+    if not hint or not domain:
+        return 0.0
+    if domain == hint or domain.endswith("." + hint) or hint.endswith("." + domain):
+        return 1.0
+    # ufjf.br e ice.ufjf.edu.br: mesma sigla antes do sufixo
+    hint_org = [part for part in hint.split(".") if part not in ("edu", "br", "com", "org", "ac", "gov")]
+    domain_parts = set(domain.split("."))
+    if hint_org and hint_org[-1] in domain_parts:
+        return 0.8
+    return 0.0
+
+def _acronym(text: Optional[str]) -> str:
+    """Sigla formada pelas iniciais (Universidade Federal de Juiz de Fora -> ufjf)."""
+    return "".join(token[0] for token in _tokens(text) if token not in CONNECTIVES)
+
+def institution_match(institution: str, header: ProfileHeader) -> float:
+    """
+    Fração das palavras relevantes da instituição que aparecem na afiliação ou no domínio de
+    email; 1 quando a sigla de um lado corresponde ao nome por extenso do outro.
+    """
+    available = set(_tokens(header.affiliation)) | set(_tokens(header.email_domain))
+    hint_acronym = _acronym(institution)
+    if len(hint_acronym) > 2 and hint_acronym in available:
+        return 1.0
+    # A afiliação costuma vir como "Cargo, Instituição": a sigla é calculada por trecho
+    hint_tokens = set(_tokens(institution))
+    for part in (header.affiliation or "").split(","):
+        part_acronym = _acronym(part)
+        if len(part_acronym) > 2 and part_acronym in hint_tokens:
+            return 1.0
+    wanted = [token for token in _tokens(institution) if token not in INSTITUTION_STOPWORDS and len(token) > 1]
+    if not wanted:
+        return 0.0
+    return sum(token in available for token in wanted) / len(wanted)
+
+def score_candidate(header: ProfileHeader, researcher_name: str, email: Optional[str] = None,
+                    institution: Optional[str] = None) -> Tuple[float, List[str]]:
+    """Pontuação (0 a 1) de um cabeçalho de perfil contra o nome e as pistas da busca, com os motivos."""
+    criteria = [(WEIGHT_NAME, name_similarity(researcher_name, header.name), "nome")]
+    if email:
+        criteria.append((WEIGHT_EMAIL, email_match(email, header.email_domain), "email"))
+    if institution:
+        criteria.append((WEIGHT_INSTITUTION, institution_match(institution, header), "instituição"))
+    total_weight = sum(weight for weight, _, _ in criteria)
+    score = sum(weight * value for weight, value, _ in criteria) / total_weight
+    score += CITATIONS_BONUS * min(1.0, math.log10(1 + header.total_citations) / 5)
+    reasons = [f"{label} {value:.0%}" for _, value, label in criteria]
+    return round(min(1.0, score), 4), reasons
+
+async def fetch_candidate(profile_url: str) -> Optional[ProfileHeader]:
+    """Busca só o cabeçalho de um perfil (nome, afiliação, email, interesses, citações)."""
+    result = await fetch_page(profile_url, expect="gsc_prf_in")
+    if not result.success:
+        return None
+    root = parse_html(result.html)
+    return parse_profile_header(root) if root is not None else None
+
+@timed_stage("disambiguation")
+async def rank_candidates(profile_urls: List[str], researcher_name: str, email: Optional[str] = None,
+                          institution: Optional[str] = None,
+                          max_candidates: int = DISAMBIGUATION_MAX_CANDIDATES) -> List[CandidateScore]:
+    """
+    Busca em paralelo o cabeçalho de cada perfil candidato e os ordena pela pontuação contra
+    o nome, o email e a instituição informados. Empates mantêm a ordem da busca do Scholar.
+    Com um único candidato não há nada a desempatar e nenhuma página é buscada.
+    """
+    candidates = profile_urls[:max(1, max_candidates)]
+    if len(candidates) <= 1:
+        return [CandidateScore(profile_url=url, user_id=scholar_user_id(url), score=1.0) for url in candidates]
+
+    semaphore = asyncio.Semaphore(max(1, DISAMBIGUATION_CONCURRENCY))
+
+    async def evaluate(url: str) -> CandidateScore:
+        candidate = CandidateScore(profile_url=url, user_id=scholar_user_id(url))
+        try:
+            async with semaphore:
+                header = await fetch_candidate(url)
+        except Exception as e:
+            print(f"Erro ao buscar candidato {url}: {str(e)}")
+            header = None
+        if header is None:
+            candidate.reasons = ["perfil não carregado"]
+            return candidate
+        candidate.name = header.name
+        candidate.affiliation = header.affiliation
+        candidate.email_domain = header.email_domain
+        candidate.interests = header.interests
+        candidate.total_citations = header.total_citations
+        candidate.score, candidate.reasons = score_candidate(header, researcher_name, email, institution)
+        return candidate
+
+    scored = await asyncio.gather(*[evaluate(url) for url in candidates])
+    ranking = sorted(scored, key=lambda candidate: candidate.score, reverse=True)
+    for candidate in ranking:
+        print(f"  {candidate.score:.2f}  {candidate.name or '?'} ({candidate.affiliation or 'sem afiliação'}, "
+              f"{candidate.email_domain or 'sem email'}) - {candidate.profile_url}")
+    publish("ranking", {"candidatos": [candidate.to_dict() for candidate in ranking]})
+    return ranking
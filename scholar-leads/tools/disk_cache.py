@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+# Acessos mais próximos que isso de o último registrado não atualizam last_access (segundos)
+ACCESS_RESOLUTION = 60
+# Acessos pendentes acumulados antes de serem gravados de uma vez
+ACCESS_FLUSH_SIZE = 256
+# A cada quantas gravações as entradas expiradas são removidas
+EXPIRED_SWEEP_EVERY = 500
+
+class DiskCache:
+    """
+    Cache persistente em SQLite com TTL por entrada e limite de tamanho.
+
+    Quando o total armazenado passa de `max_bytes`, as entradas acessadas há mais
+    tempo são removidas primeiro (LRU). Os contadores de acertos e falhas ficam
+    disponíveis em `stats()`.
+
+    O total em bytes é mantido em memória (sem somar a tabela a cada gravação), os
+    acessos são gravados em lote e só quando mudam o last_access em mais de
+    ACCESS_RESOLUTION segundos, e as expiradas são varridas a cada EXPIRED_SWEEP_EVERY
+    gravações. As operações são síncronas: em corrotinas, chame por asyncio.to_thread.
+    """
+
+    def __init__(self, path: str, max_bytes: int, default_ttl: float):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending_access: Dict[str, float] = {}
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires_at ON entries(expires_at)")
+        self._conn.commit()
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, last_access, size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._total -= row[3]
+                    self._pending_access.pop(key, None)
+                self.misses += 1
+                return None
+            if now - self._pending_access.get(key, row[2]) > ACCESS_RESOLUTION:
+                self._pending_access[key] = now
+                if len(self._pending_access) >= ACCESS_FLUSH_SIZE:
+                    self._flush_access()
+                    self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now + ttl, now),
+            )
+            self._pending_access.pop(key, None)
+            self._total += len(value) - (previous[0] if previous else 0)
+            self._writes += 1
+            if self._writes % EXPIRED_SWEEP_EVERY == 0:
+                self._remove_expired(now)
+            if self._total > self.max_bytes:
+                self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total -= row[0]
+            self._pending_access.pop(key, None)
+
+    def _flush_access(self):
+        """Grava os last_access acumulados (sem commit)."""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+
+    def _remove_expired(self, now: float):
+        removed = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries WHERE expires_at < ?", (now,)
+        ).fetchone()[0]
+        if removed:
+            self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+            self._total -= removed
+
+    def _evict(self, now: float):
+        """Remove as expiradas e, se ainda não couber no limite, as menos usadas."""
+        self._remove_expired(now)
+        if self._total <= self.max_bytes:
+            return
+        self._flush_access()
+        excess = self._total - self.max_bytes
+        removed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC"):
+            victims.append((key,))
+            removed += size
+            if removed >= excess:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._total -= removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = self._total
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+            self._conn.close()
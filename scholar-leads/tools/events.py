@@ -0,0 +1,30 @@
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+# Destino dos resultados parciais da análise em andamento (por exemplo, o stream SSE).
+# Fica em uma ContextVar para acompanhar a análise através de run_sync/run_async e
+# asyncio.to_thread, que copiam o contexto; sem assinante, publish não faz nada.
+_subscriber: contextvars.ContextVar[Optional[Callable[[str, Dict[str, Any]], None]]] = contextvars.ContextVar(
+    "scholar_event_subscriber", default=None
+)
+
+def publish(event: str, data: Dict[str, Any]):
+    """Publica um resultado parcial para o assinante da análise atual, se houver."""
+    subscriber = _subscriber.get()
+    if subscriber is None:
+        return
+    try:
+        subscriber(event, data)
+    except Exception as e:
+        # Um consumidor com problema não pode interromper a análise
+        print(f"Erro ao publicar evento '{event}': {str(e)}")
+
+@contextmanager
+def subscribe(callback: Callable[[str, Dict[str, Any]], None]):
+    """Direciona os eventos publicados dentro do bloco (e das tarefas iniciadas nele) para `callback`."""
+    token = _subscriber.set(callback)
+    try:
+        yield
+    finally:
+        _subscriber.reset(token)
@@ -0,0 +1,306 @@
+import asyncio
+import io
+import json
+import logging
+import os
+import re
+import threading
+import urllib.parse
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from tools.disk_cache import DiskCache
+from tools.fetcher import RATE_LIMIT_STATUS, get_http_engine
+from tools.metrics import CACHE_LOOKUPS, EXTERNAL_ABSTRACTS, stage_timer
+from tools.page_cache import BASE_DIR, CACHE_ENABLED, PAGE_TTLS, canonical_url, is_scholar_url
+from tools.scheduler import DeadlineExceeded, get_scheduler
+from tools.scholar_parser import MIN_EXTERNAL_ABSTRACT, absolute_url, parse_external_abstract
+
+# Buscas simultâneas por domínio de editora e tempo máximo de cada uma (segundos)
+EXTERNAL_DOMAIN_CONCURRENCY = int(os.getenv("SCHOLAR_EXTERNAL_DOMAIN_CONCURRENCY", "2"))
+EXTERNAL_TIMEOUT = float(os.getenv("SCHOLAR_EXTERNAL_TIMEOUT", "10"))
+# Prazo total para achar o resumo de um artigo fora do Scholar, somando todos os links tentados
+EXTERNAL_BUDGET = float(os.getenv("SCHOLAR_EXTERNAL_BUDGET", "20"))
+EXTERNAL_MAX_LINKS = int(os.getenv("SCHOLAR_EXTERNAL_MAX_LINKS", "3"))
+# Quanto baixar no máximo de uma página HTML e de um PDF
+EXTERNAL_HTML_MAX_BYTES = int(os.getenv("SCHOLAR_EXTERNAL_HTML_MAX_KB", "2048")) * 1024
+PDF_MAX_BYTES = int(os.getenv("SCHOLAR_PDF_MAX_KB", "4096")) * 1024
+# A cada quantos bytes recebidos do PDF a primeira página é lida de novo
+PDF_PARSE_STEP = 256 * 1024
+# Domínios que não deram nenhum resumo em tantas tentativas são pulados por um tempo
+NEGATIVE_MIN_ATTEMPTS = int(os.getenv("SCHOLAR_EXTERNAL_NEGATIVE_AFTER", "3"))
+NEGATIVE_TTL_DAYS = float(os.getenv("SCHOLAR_EXTERNAL_NEGATIVE_TTL_DAYS", "7"))
+EXTERNAL_CACHE_PATH = os.getenv("SCHOLAR_EXTERNAL_CACHE_PATH",
+                                os.path.join(BASE_DIR, "data", "cache", "external.sqlite3"))
+EXTERNAL_CACHE_MAX_MB = int(os.getenv("SCHOLAR_EXTERNAL_CACHE_MAX_MB", "64"))
+# Redirecionadores: quem dá ou não o resumo é o domínio de destino, então eles nunca são pulados
+REDIRECT_HOSTS = {"doi.org", "dx.doi.org"}
+
+# Seção de resumo no texto da primeira página de um PDF e o que costuma vir logo depois dela
+PDF_ABSTRACT_RE = re.compile(r'(?:^|\n)\s*(?:abstract|resumo|summary)\b\s*[:.—-]?\s*', re.IGNORECASE)
+PDF_SECTION_END_RE = re.compile(
+    r'\n\s*(?:keywords?|key words|palavras[- ]chave|index terms|(?:1|I)\.?\s+introdu|introdu[cç][aã]o\b|introduction\b)',
+    re.IGNORECASE,
+)
+PDF_ABSTRACT_MAX_CHARS = 3000
+# Objeto do catálogo (raiz) de um PDF, para fechar um arquivo incompleto com um trailer
+PDF_CATALOG_RE = re.compile(rb'(\d+)\s+(\d+)\s+obj\s*<<(?:(?!endobj).){0,400}?/Type\s*/Catalog', re.DOTALL)
+
+@dataclass
+class ExternalFetch:
+    """Resultado da leitura de um link externo."""
+    source: str  # html, pdf ou other (tipo de conteúdo sem resumo possível)
+    abstract: Optional[str] = None
+    final_url: Optional[str] = None
+
+class ExternalAbstractCache:
+    """
+    Resumos já procurados nas editoras (encontrados ou não), pela URL, e o histórico de
+    cada domínio, para pular os que nunca devolvem um resumo.
+    """
+
+    def __init__(self, path: str = EXTERNAL_CACHE_PATH, max_bytes: int = EXTERNAL_CACHE_MAX_MB * 1024 * 1024):
+        self._store = DiskCache(path, max_bytes=max_bytes, default_ttl=PAGE_TTLS["external"])
+        # record_domain lê e regrava o histórico; chamado por asyncio.to_thread, precisa ser atômico
+        self._domain_lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[dict]:
+        raw = self._store.get(f"url:{canonical_url(url)}")
+        CACHE_LOOKUPS.labels(cache="external", result="hit" if raw is not None else "miss").inc()
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, url: str, abstract: Optional[str]):
+        self._store.set(f"url:{canonical_url(url)}", json.dumps({"abstract": abstract}, ensure_ascii=False).encode("utf-8"))
+
+    def domain_blocked(self, host: str) -> bool:
+        raw = self._store.get(f"domain:{host}")
+        if raw is None:
+            return False
+        history = json.loads(raw)
+        return history["found"] == 0 and history["attempts"] >= NEGATIVE_MIN_ATTEMPTS
+
+    def record_domain(self, host: str, found: bool):
+        """Conta uma tentativa no domínio; o histórico expira após NEGATIVE_TTL_DAYS sem ser renovado."""
+        with self._domain_lock:
+            raw = self._store.get(f"domain:{host}")
+            history = json.loads(raw) if raw is not None else {"attempts": 0, "found": 0}
+            history["attempts"] += 1
+            history["found"] += int(found)
+            self._store.set(f"domain:{host}", json.dumps(history).encode("utf-8"), ttl=NEGATIVE_TTL_DAYS * 24 * 60 * 60)
+
+    def stats(self) -> dict:
+        return self._store.stats()
+
+_external_cache: Optional[ExternalAbstractCache] = None
+
+def get_external_cache() -> Optional[ExternalAbstractCache]:
+    """Retorna o cache de resumos externos do processo, ou None se os caches estiverem desativados."""
+    global _external_cache
+    if not CACHE_ENABLED:
+        return None
+    if _external_cache is None:
+        _external_cache = ExternalAbstractCache()
+    return _external_cache
+
+# Vagas por domínio, criadas no loop compartilhado de tools.runtime
+_domain_slots: Dict[str, asyncio.Semaphore] = {}
+
+def _host(url: Optional[str]) -> str:
+    host = (urllib.parse.urlsplit(url or "").hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+def _domain_slot(host: str) -> asyncio.Semaphore:
+    if host not in _domain_slots:
+        _domain_slots[host] = asyncio.Semaphore(max(1, EXTERNAL_DOMAIN_CONCURRENCY))
+    return _domain_slots[host]
+
+def abstract_from_pdf_text(text: str) -> Optional[str]:
+    """Resumo no texto da primeira página de um PDF: da seção Abstract/Resumo até Keywords ou Introdução."""
+    match = PDF_ABSTRACT_RE.search(text or "")
+    if not match:
+        return None
+    rest = text[match.end():]
+    end = PDF_SECTION_END_RE.search(rest)
+    body = rest[:end.start()] if end else rest[:PDF_ABSTRACT_MAX_CHARS]
+    body = re.sub(r'-\n(\w)', r'\1', body)  # palavras hifenizadas na quebra de linha
+    body = re.sub(r'\s+', ' ', body).strip()
+    return body if len(body) >= MIN_EXTERNAL_ABSTRACT else None
+
+def close_truncated_pdf(data: bytes) -> Optional[bytes]:
+    """
+    Fecha um PDF incompleto com um trailer que aponta para o catálogo e uma xref inválida:
+    sem a tabela do fim do arquivo, o pypdf (strict=False) reconstrói os objetos varrendo o
+    que já chegou. None se o catálogo ainda não chegou (ou está em um object stream).
+    """
+    match = PDF_CATALOG_RE.search(data)
+    if not match:
+        return None
+    return data + b"\ntrailer\n<< /Root %s %s R >>\nstartxref\n0\n%%%%EOF\n" % (match.group(1), match.group(2))
+
+def first_page_text(data: bytes, complete: bool = True) -> Optional[str]:
+    """Texto da primeira página de um PDF, completo ou só com a parte já recebida."""
+    from pypdf import PdfReader
+
+    if not complete:
+        data = close_truncated_pdf(data)
+        if data is None:
+            return None
+    # Arquivos truncados geram muitos avisos de reconstrução
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+    try:
+        reader = PdfReader(io.BytesIO(data), strict=False)
+        if len(reader.pages) == 0:
+            return None
+        return reader.pages[0].extract_text() or None
+    except Exception:
+        return None
+
+def _sniff(content_type: str, first_bytes: bytes) -> Optional[str]:
+    """Tipo do conteúdo (html ou pdf) pelos primeiros bytes e pelo cabeçalho; None para o resto (imagens, zip...)."""
+    content_type = content_type.lower()
+    head = first_bytes.lstrip()
+    # Links de PDF às vezes vêm como text/html ou application/octet-stream
+    if head.startswith(b"%PDF-") or "pdf" in content_type:
+        return "pdf"
+    if "html" in content_type or "xml" in content_type or content_type.startswith("text/") or head[:1] == b"<":
+        return "html"
+    return None
+
+async def _read_pdf(chunks, buffer: bytearray) -> Optional[str]:
+    """Recebe o PDF em partes até conseguir ler a primeira página (ou atingir PDF_MAX_BYTES)."""
+    next_parse = PDF_PARSE_STEP
+    finished = False
+    while True:
+        if len(buffer) >= next_parse or finished:
+            text = await asyncio.to_thread(first_page_text, bytes(buffer), finished)
+            if text:
+                # Primeira página lida: o resto do arquivo não é baixado
+                return abstract_from_pdf_text(text)
+            next_parse = len(buffer) + PDF_PARSE_STEP
+        if finished or len(buffer) >= PDF_MAX_BYTES:
+            return None
+        chunk = await anext(chunks, None)
+        if chunk is None:
+            finished = True
+        else:
+            buffer.extend(chunk)
+
+class ExternalStatusError(Exception):
+    """Resposta sem sucesso (4xx/5xx) de um link externo; não diz nada sobre o resumo."""
+
+    def __init__(self, url: str, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.url = url
+        self.status_code = status_code
+
+async def _read_external(url: str) -> ExternalFetch:
+    """
+    Abre o link em streaming e só baixa o corpo se o tipo (cabeçalho ou primeiros bytes)
+    for HTML ou PDF; do PDF, só até a primeira página. Levanta ExternalStatusError se a
+    resposta não for de sucesso.
+    """
+    async with get_http_engine().stream(url, timeout=EXTERNAL_TIMEOUT) as response:
+        final_url = str(response.url)
+        if not response.is_success:
+            raise ExternalStatusError(final_url, response.status_code)
+        chunks = response.aiter_bytes()
+        content_type = response.headers.get("content-type", "")
+        first = await anext(chunks, b"")
+        kind = _sniff(content_type, first)
+        if kind is None:
+            return ExternalFetch(source="other", final_url=final_url)
+        buffer = bytearray(first)
+        if kind == "pdf":
+            return ExternalFetch(source="pdf", abstract=await _read_pdf(chunks, buffer), final_url=final_url)
+        async for chunk in chunks:
+            buffer.extend(chunk)
+            if len(buffer) >= EXTERNAL_HTML_MAX_BYTES:
+                break
+        html = bytes(buffer).decode(response.encoding or "utf-8", errors="replace")
+        return ExternalFetch(source="html", abstract=parse_external_abstract(html, final_url), final_url=final_url)
+
+async def fetch_external_abstract(url: str) -> Optional[str]:
+    """
+    Resumo de um artigo a partir de um link externo (página da editora ou PDF).
+
+    Respeita o limite de buscas simultâneas por domínio e o limitador de taxa do agendador;
+    domínios que nunca deram resumo são pulados. Uma URL cuja página (HTML ou PDF) foi lida
+    não é procurada de novo, com ou sem resumo; erros e respostas 4xx/5xx não ficam no cache.
+    """
+    cache = get_external_cache()
+    cached = await asyncio.to_thread(cache.get, url) if cache is not None else None
+    if cached is not None:
+        return cached["abstract"]
+    host = _host(url)
+    if cache is not None and host not in REDIRECT_HOSTS and await asyncio.to_thread(cache.domain_blocked, host):
+        EXTERNAL_ABSTRACTS.labels(source="skipped", outcome="negative_cache").inc()
+        print(f"Domínio sem resumos nas últimas tentativas, pulando: {host}")
+        return None
+
+    # 429 e 5xx são passageiros: não dizem nada sobre o domínio ter ou não resumos
+    transient = False
+
+    async def attempt():
+        nonlocal transient
+        try:
+            fetched = await _read_external(url)
+        except ExternalStatusError as e:
+            print(f"Artigo original respondeu HTTP {e.status_code}: {url}")
+            transient = e.status_code in RATE_LIMIT_STATUS or e.status_code >= 500
+            # Com limite de taxa, o agendador reduz o ritmo do host
+            return None, "blocked" if e.status_code in RATE_LIMIT_STATUS else "fail"
+        except Exception as e:
+            print(f"Erro ao acessar artigo original {url}: {type(e).__name__}: {str(e)}")
+            return None, "fail"
+        return fetched, "ok"
+
+    with stage_timer("external_abstract"):
+        async with _domain_slot(host):
+            try:
+                fetched = await get_scheduler().run(url, attempt, EXTERNAL_BUDGET, attempts=1)
+            except DeadlineExceeded:
+                fetched = None
+
+    if fetched is None:
+        # Erros, timeouts e 4xx (mas não 429/5xx) contam contra o domínio; a URL pode ser
+        # tentada de novo depois
+        EXTERNAL_ABSTRACTS.labels(source="other", outcome="error").inc()
+        if cache is not None and host not in REDIRECT_HOSTS and not transient:
+            await asyncio.to_thread(cache.record_domain, host, False)
+        return None
+    EXTERNAL_ABSTRACTS.labels(source=fetched.source, outcome="found" if fetched.abstract else "not_found").inc()
+    if cache is not None:
+        if fetched.source in ("html", "pdf"):
+            await asyncio.to_thread(cache.set, url, fetched.abstract)
+        final_host = _host(fetched.final_url) or host
+        if final_host not in REDIRECT_HOSTS:
+            await asyncio.to_thread(cache.record_domain, final_host, fetched.abstract is not None)
+    return fetched.abstract
+
+def external_links(page) -> List[str]:
+    """Links externos de uma página de artigo (CitationPage) que podem levar ao resumo, PDFs primeiro."""
+    links = []
+    for href in [*page.pdf_links, page.full_text_link, page.title_link]:
+        url = absolute_url(href)
+        if url and url.startswith("http") and not is_scholar_url(url) and url not in links:
+            links.append(url)
+    return links[:max(0, EXTERNAL_MAX_LINKS)]
+
+async def external_abstract(links: List[str]) -> Optional[str]:
+    """
+    Tenta os links em ordem até achar um resumo, dentro de EXTERNAL_BUDGET segundos no
+    total, para que editoras lentas não dominem o tempo do crawling do perfil.
+    """
+    async def first_found():
+        for url in links:
+            abstract = await fetch_external_abstract(url)
+            if abstract:
+                return abstract
+        return None
+
+    try:
+        return await asyncio.wait_for(first_found(), timeout=EXTERNAL_BUDGET)
+    except asyncio.TimeoutError:
+        EXTERNAL_ABSTRACTS.labels(source="other", outcome="budget").inc()
+        print(f"Prazo de {EXTERNAL_BUDGET:.0f}s esgotado buscando o resumo fora do Scholar")
+        return None
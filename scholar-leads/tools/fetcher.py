@@ -0,0 +1,253 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from tools.browser_pool import get_browser_pool
+from tools.metrics import CACHE_LOOKUPS, PAGE_FETCHES, record_failure
+from tools.page_cache import get_page_cache, page_type
+from tools.scheduler import FETCH_DEADLINE, DeadlineExceeded, get_scheduler
+from tools.runtime import on_shutdown
+
+# Motor padrão de busca de páginas: "http" (cliente HTTP com fallback para o navegador)
+# ou "browser" (sempre Playwright via crawl4ai)
+FETCH_ENGINE = os.getenv("SCHOLAR_FETCH_ENGINE", "http").lower()
+HTTP_TIMEOUT = float(os.getenv("SCHOLAR_HTTP_TIMEOUT", "20"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("SCHOLAR_HTTP_MAX_CONNECTIONS", "20"))
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+}
+
+# Trechos que indicam que a resposta não é a página real (CAPTCHA, consentimento, JS obrigatório)
+BLOCK_MARKERS = [
+    "gs_captcha",
+    "g-recaptcha",
+    "recaptcha/api",
+    "unusual traffic",
+    "tráfego incomum",
+    "consent.google.com",
+    "please enable javascript",
+    "ative o javascript",
+]
+BLOCK_STATUS = {403, 429, 503}
+# Respostas que indicam limite de taxa do Scholar: o agendador reduz o ritmo e tenta de novo
+RATE_LIMIT_STATUS = {429, 503}
+RATE_LIMIT_MARKERS = ["gs_captcha", "g-recaptcha", "recaptcha/api", "unusual traffic", "tráfego incomum"]
+
+@dataclass
+class FetchResult:
+    """Resultado de uma busca de página, compatível com os campos usados do CrawlResult."""
+    url: str
+    html: str = ""
+    success: bool = False
+    status_code: Optional[int] = None
+    content_type: Optional[str] = None
+    engine: str = "http"
+    error: Optional[str] = None
+
+def needs_browser(result: FetchResult, expect: Optional[str] = None) -> Optional[str]:
+    """
+    Retorna o motivo pelo qual a resposta HTTP precisa ser refeita no navegador,
+    ou None quando a página pode ser usada como está.
+    """
+    if result.status_code in BLOCK_STATUS:
+        return f"status {result.status_code}"
+    if not result.success:
+        return None
+    if result.content_type and "html" not in result.content_type:
+        return None
+    lowered = result.html.lower()
+    for marker in BLOCK_MARKERS:
+        if marker in lowered:
+            return f"marcador '{marker}'"
+    if expect and expect not in result.html:
+        return f"conteúdo esperado '{expect}' ausente"
+    return None
+
+def is_rate_limited(result: FetchResult) -> bool:
+    """A resposta é um bloqueio por excesso de requisições (429, CAPTCHA, "tráfego incomum")?"""
+    if result.status_code in RATE_LIMIT_STATUS or "/sorry/" in (result.url or ""):
+        return True
+    lowered = result.html.lower() if result.html else ""
+    return any(marker in lowered for marker in RATE_LIMIT_MARKERS)
+
+def classify(result: FetchResult, expect: Optional[str] = None) -> str:
+    """Desfecho de uma tentativa para o agendador: ok, blocked, retry ou fail."""
+    if is_rate_limited(result):
+        return "blocked"
+    if result.status_code is None and result.error:
+        return "retry"  # erro de rede ou timeout
+    if result.status_code is not None and result.status_code >= 500:
+        return "retry"
+    if not result.success or needs_browser(result, expect) is not None:
+        return "fail"
+    return "ok"
+
+class HttpFetchEngine:
+    """Cliente HTTP assíncrono com pool de conexões e keep-alive."""
+
+    name = "http"
+
+    def __init__(self, timeout: float = HTTP_TIMEOUT, max_connections: int = HTTP_MAX_CONNECTIONS):
+        self._client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    async def fetch(self, url: str, timeout: Optional[float] = None) -> FetchResult:
+        try:
+            kwargs = {"timeout": timeout} if timeout else {}
+            response = await self._client.get(url, **kwargs)
+        except httpx.HTTPError as e:
+            return FetchResult(url=url, engine=self.name, error=f"{type(e).__name__}: {str(e)}")
+
+        content_type = response.headers.get("content-type", "")
+        is_text = "html" in content_type or "xml" in content_type or "text" in content_type
+        return FetchResult(
+            url=str(response.url),
+            html=response.text if is_text else "",
+            success=response.is_success,
+            status_code=response.status_code,
+            content_type=content_type,
+            engine=self.name,
+        )
+
+    def stream(self, url: str, timeout: Optional[float] = None):
+        """
+        Requisição em streaming (`async with engine.stream(url) as response`), para decidir
+        pelos cabeçalhos e pelos primeiros bytes se vale baixar o corpo.
+        """
+        kwargs = {"timeout": timeout} if timeout else {}
+        return self._client.stream("GET", url, **kwargs)
+
+    async def close(self):
+        await self._client.aclose()
+
+class BrowserFetchEngine:
+    """Busca a página com o Playwright usando um navegador do pool compartilhado."""
+
+    name = "browser"
+
+    async def fetch(self, url: str, timeout: Optional[float] = None) -> FetchResult:
+        # crawl4ai (e o Playwright) só são carregados quando o navegador é usado
+        from crawl4ai import CrawlerRunConfig, CacheMode
+
+        config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
+        if timeout:
+            config.page_timeout = int(timeout * 1000)
+        try:
+            async with get_browser_pool().browser() as browser:
+                result = await browser.arun(url=url, config=config)
+        except Exception as e:
+            return FetchResult(url=url, engine=self.name, error=f"{type(e).__name__}: {str(e)}")
+        return FetchResult(
+            url=url,
+            html=result.html or "",
+            success=result.success,
+            status_code=getattr(result, "status_code", None),
+            engine=self.name,
+            error=getattr(result, "error_message", None),
+        )
+
+_http_engine: Optional[HttpFetchEngine] = None
+_browser_engine = BrowserFetchEngine()
+
+def get_http_engine() -> HttpFetchEngine:
+    """Retorna o cliente HTTP do processo (preso ao loop compartilhado de tools.runtime)."""
+    global _http_engine
+    if _http_engine is None:
+        _http_engine = HttpFetchEngine()
+    return _http_engine
+
+@on_shutdown
+async def close_http_engine():
+    global _http_engine
+    if _http_engine is not None:
+        await _http_engine.close()
+        _http_engine = None
+
+async def fetch_page(url: str, expect: Optional[str] = None, timeout: Optional[float] = None,
+                     engine: Optional[str] = None, use_cache: bool = True,
+                     deadline: Optional[float] = None) -> FetchResult:
+    """
+    Busca uma página, consultando antes o cache em disco.
+
+    Com o motor HTTP, a resposta é verificada e, se parecer uma página de CAPTCHA,
+    consentimento ou que depende de JavaScript (ou não contiver o trecho `expect`),
+    a busca é refeita no navegador. Apenas páginas válidas são gravadas no cache.
+
+    Toda busca fora do cache passa pelo agendador de tools.scheduler (limite de taxa por
+    host, pausa após bloqueios e novas tentativas até `deadline` segundos). O cache é
+    consultado e gravado fora do loop (asyncio.to_thread), já que o SQLite bloqueia.
+    """
+    cache = get_page_cache() if use_cache else None
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, url)
+        CACHE_LOOKUPS.labels(cache="pages", result="hit" if cached is not None else "miss").inc()
+        if cached is not None:
+            PAGE_FETCHES.labels(engine="cache", page_type=page_type(url), outcome="success").inc()
+            return FetchResult(url=cached["url"], html=cached["html"], success=True,
+                               status_code=cached.get("status_code"),
+                               content_type=cached.get("content_type"), engine="cache")
+
+    result = await _fetch_uncached(url, expect, timeout, engine, deadline)
+    PAGE_FETCHES.labels(engine=result.engine, page_type=page_type(url),
+                        outcome="success" if result.success else "failure").inc()
+
+    if cache is not None and result.success and result.html and needs_browser(result, expect) is None:
+        await asyncio.to_thread(cache.set, url, {
+            "url": result.url,
+            "html": result.html,
+            "status_code": result.status_code,
+            "content_type": result.content_type,
+        })
+    return result
+
+async def _fetch_uncached(url: str, expect: Optional[str], timeout: Optional[float],
+                          engine: Optional[str], deadline: Optional[float] = None) -> FetchResult:
+    engine = (engine or FETCH_ENGINE).lower()
+    scheduler = get_scheduler()
+    # O prazo vale para a busca inteira, incluindo o fallback para o navegador
+    end = time.monotonic() + (deadline if deadline is not None else FETCH_DEADLINE)
+
+    def attempt(fetch_engine):
+        async def run():
+            result = await fetch_engine.fetch(url, timeout=timeout)
+            return result, classify(result, expect)
+        return run
+
+    try:
+        if engine == "http":
+            # Bloqueios no HTTP não são repetidos aqui: o navegador é a próxima tentativa
+            result = await scheduler.run(url, attempt(get_http_engine()), end - time.monotonic(),
+                                         retry_blocked=False)
+            reason = needs_browser(result, expect)
+            if reason is None:
+                if result.error:
+                    record_failure("http_error")
+                    print(f"Erro HTTP ao buscar {url}: {result.error}")
+                return result
+            record_failure("blocked")
+            print(f"Resposta HTTP exige navegador ({reason}); usando Playwright para: {url}")
+        result = await scheduler.run(url, attempt(_browser_engine), end - time.monotonic())
+    except DeadlineExceeded as e:
+        record_failure("deadline")
+        print(f"Prazo esgotado ao buscar {url}: {str(e)}")
+        return FetchResult(url=url, engine=engine, error=str(e))
+    if not result.success:
+        record_failure("browser_error")
+    return result
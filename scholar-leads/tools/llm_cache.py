@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import re
+from typing import List, Optional, Tuple
+
+from tools.disk_cache import DiskCache
+from tools.metrics import CACHE_LOOKUPS
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LLM_CACHE_ENABLED = os.getenv("SCHOLAR_LLM_CACHE_ENABLED", "1") not in ("0", "false", "False")
+LLM_CACHE_PATH = os.getenv("SCHOLAR_LLM_CACHE_PATH", os.path.join(BASE_DIR, "data", "cache", "llm.sqlite3"))
+LLM_CACHE_MAX_MB = int(os.getenv("SCHOLAR_LLM_CACHE_MAX_MB", "64"))
+LLM_CACHE_TTL_DAYS = float(os.getenv("SCHOLAR_LLM_CACHE_TTL_DAYS", "90"))
+
+def normalize_text(text: str) -> str:
+    """Espaços e quebras de linha não mudam o que o modelo recebe de fato."""
+    return re.sub(r'\s+', ' ', text or "").strip()
+
+def llm_cache_key(model: str, prompt_version: str, messages: List[Tuple[str, str]]) -> str:
+    """
+    Hash das entradas realmente enviadas ao modelo: mensagens normalizadas (que já incluem
+    o template e os títulos/resumos), versão do prompt e nome do modelo.
+    """
+    payload = json.dumps({
+        "model": model,
+        "prompt_version": prompt_version,
+        "messages": [[role, normalize_text(content)] for role, content in messages],
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """Respostas do LLM em disco, endereçadas pelo conteúdo da requisição (llm_cache_key)."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_MB * 1024 * 1024,
+                 ttl: float = LLM_CACHE_TTL_DAYS * 24 * 60 * 60):
+        self._store = DiskCache(path, max_bytes=max_bytes, default_ttl=ttl)
+
+    def get(self, key: str) -> Optional[dict]:
+        raw = self._store.get(key)
+        CACHE_LOOKUPS.labels(cache="llm", result="hit" if raw is not None else "miss").inc()
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, response: dict):
+        self._store.set(key, json.dumps(response, ensure_ascii=False).encode("utf-8"))
+
+    def stats(self) -> dict:
+        return self._store.stats()
+
+_llm_cache: Optional[LLMCache] = None
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Retorna o cache de respostas do LLM do processo, ou None se estiver desativado."""
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMCache()
+    return _llm_cache
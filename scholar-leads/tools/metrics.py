@@ -0,0 +1,159 @@
+import functools
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Faixas de latência (segundos): de páginas em cache (ms) até análises completas da crew (minutos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+STAGE_DURATION = Histogram(
+    "scholar_stage_duration_seconds",
+    "Duração de cada etapa das ferramentas (search, disambiguation, profile, abstract, external_abstract, "
+    "full_link) e da preparação da crew (crew_setup); profile inclui os resumos",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+LLM_CALL_DURATION = Histogram(
+    "scholar_llm_call_duration_seconds",
+    "Duração de cada chamada ao LLM",
+    ["call", "model"], buckets=LATENCY_BUCKETS,
+)
+ANALYSIS_STAGE_DURATION = Histogram(
+    "scholar_analysis_stage_duration_seconds",
+    "Duração de cada etapa de crew.executar (busca, perfil, artigos)",
+    ["modo", "etapa"], buckets=LATENCY_BUCKETS,
+)
+ANALYSIS_DURATION = Histogram(
+    "scholar_analysis_duration_seconds",
+    "Duração total de crew.executar",
+    ["modo"], buckets=LATENCY_BUCKETS,
+)
+ANALYSES = Counter("scholar_analyses_total", "Análises executadas, por resultado", ["modo", "status"])
+ANALYSES_IN_PROGRESS = Gauge("scholar_analyses_in_progress", "Análises em execução", ["modo"])
+
+PAGE_FETCHES = Counter(
+    "scholar_page_fetches_total",
+    "Páginas buscadas, por motor (http, browser, cache), tipo de página e resultado",
+    ["engine", "page_type", "outcome"],
+)
+CACHE_LOOKUPS = Counter("scholar_cache_lookups_total", "Consultas aos caches em disco", ["cache", "result"])
+CLASSIFIER_DECISIONS = Counter(
+    "scholar_classifier_decisions_total",
+    "Decisões do classificador local (qualitativo e nao_qualitativo dispensam o LLM; ambiguo vai para ele)",
+    ["decision"],
+)
+EXTERNAL_ABSTRACTS = Counter(
+    "scholar_external_abstracts_total",
+    "Buscas de resumo nas páginas das editoras, por tipo de conteúdo (html, pdf, other, skipped) e resultado",
+    ["source", "outcome"],
+)
+REFRESH_ITEMS = Counter(
+    "scholar_refresh_items_total",
+    "Atualizações incrementais: artigos, coautores, lista completa e veredito reaproveitados ou buscados",
+    ["item", "action"],
+)
+FAILURES = Counter(
+    "scholar_failures_total",
+    "Falhas por tipo (http_error, blocked, browser_error, deadline, parse_error, llm_error, analysis_error)",
+    ["type"],
+)
+
+SCHEDULER_WAIT = Histogram(
+    "scholar_scheduler_wait_seconds",
+    "Tempo de espera por uma vaga no limitador de requisições, por prioridade",
+    ["priority"], buckets=LATENCY_BUCKETS,
+)
+SCHEDULER_RATE = Gauge("scholar_scheduler_rate", "Taxa atual permitida pelo limitador (req/s), por host", ["host"])
+SCHEDULER_BLOCKS = Counter("scholar_scheduler_blocks_total", "Bloqueios detectados (CAPTCHA, 429...), por host", ["host"])
+SCHEDULER_RETRIES = Counter("scholar_scheduler_retries_total", "Novas tentativas de busca", ["host", "reason"])
+
+JOBS = Gauge("scholar_jobs", "Jobs de análise na fila e em execução", ["state"])
+BROWSER_POOL = Gauge("scholar_browser_pool_browsers", "Navegadores do pool (size, idle, in_use)", ["state"])
+
+@contextmanager
+def stage_timer(stage: str):
+    """Mede a duração de uma etapa das ferramentas; funciona também em corrotinas (`with` em volta dos awaits)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(stage=stage).observe(time.perf_counter() - start)
+
+def timed_stage(stage: str):
+    """Decorador de corrotina equivalente a `with stage_timer(stage)` em volta do corpo."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def llm_call_timer(call: str, model: str):
+    """Mede uma chamada ao LLM e conta as falhas."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        FAILURES.labels(type="llm_error").inc()
+        raise
+    finally:
+        LLM_CALL_DURATION.labels(call=call, model=model).observe(time.perf_counter() - start)
+
+@contextmanager
+def analysis_tracker(modo: str):
+    """Conta as análises em andamento e registra a duração e o resultado de crew.executar."""
+    start = time.perf_counter()
+    status = "error"
+    ANALYSES_IN_PROGRESS.labels(modo=modo).inc()
+    try:
+        yield
+        status = "success"
+    except Exception:
+        FAILURES.labels(type="analysis_error").inc()
+        raise
+    finally:
+        ANALYSES_IN_PROGRESS.labels(modo=modo).dec()
+        ANALYSIS_DURATION.labels(modo=modo).observe(time.perf_counter() - start)
+        ANALYSES.labels(modo=modo, status=status).inc()
+
+def record_failure(failure_type: str):
+    FAILURES.labels(type=failure_type).inc()
+
+def stage_progress(modo: str, progress_callback: Optional[Callable[[str, str], None]] = None):
+    """
+    Envolve o progress_callback de crew.executar, registrando a duração de cada etapa
+    entre "running" e "done" antes de repassar o evento.
+    """
+    started = {}
+
+    def progress(etapa: str, status: str):
+        now = time.perf_counter()
+        if status == "running":
+            started[etapa] = now
+        elif etapa in started:
+            ANALYSIS_STAGE_DURATION.labels(modo=modo, etapa=etapa).observe(now - started.pop(etapa))
+        if progress_callback is not None:
+            progress_callback(etapa, status)
+
+    return progress
+
+def _llm_success(kwargs, completion_response, start_time, end_time):
+    LLM_CALL_DURATION.labels(call="agente", model=kwargs.get("model", "")).observe(
+        (end_time - start_time).total_seconds()
+    )
+
+def _llm_failure(kwargs, completion_response, start_time, end_time):
+    FAILURES.labels(type="llm_error").inc()
+    _llm_success(kwargs, completion_response, start_time, end_time)
+
+def instrument_litellm():
+    """Registra callbacks no litellm (usado pelos agentes da crew) para medir cada chamada ao LLM."""
+    import litellm
+
+    if _llm_success not in litellm.success_callback:
+        litellm.success_callback.append(_llm_success)
+    if _llm_failure not in litellm.failure_callback:
+        litellm.failure_callback.append(_llm_failure)
@@ -0,0 +1,102 @@
+import json
+import os
+import urllib.parse
+from typing import Optional
+
+from tools.disk_cache import DiskCache
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CACHE_ENABLED = os.getenv("SCHOLAR_CACHE_ENABLED", "1") not in ("0", "false", "False")
+CACHE_PATH = os.getenv("SCHOLAR_CACHE_PATH", os.path.join(BASE_DIR, "data", "cache", "pages.sqlite3"))
+CACHE_MAX_MB = int(os.getenv("SCHOLAR_CACHE_MAX_MB", "512"))
+
+# Tempo de vida (em segundos) por tipo de página
+HOUR = 60 * 60
+DAY = 24 * HOUR
+PAGE_TTLS = {
+    "search": 6 * HOUR,       # resultados de busca mudam com frequência
+    "profile": 1 * DAY,       # citações e lista de artigos do perfil
+    "coauthors": 7 * DAY,     # lista completa de coautores
+    "article": 30 * DAY,      # página view_citation de um artigo
+    "external": 30 * DAY,     # páginas de editoras (doi.org, IEEE, Springer, ACM...)
+}
+
+# Parâmetros do Scholar que de fato mudam o conteúdo da página; os demais (hl, oi, ...) são ruído
+SCHOLAR_PARAMS = {
+    "user", "citation_for_view", "view_op", "mauthors",
+    "after_author", "astart", "cstart", "pagesize", "sortby",
+}
+
+def is_scholar_url(url: str) -> bool:
+    host = urllib.parse.urlsplit(url).hostname or ""
+    return host.startswith("scholar.google.")
+
+def canonical_url(url: str) -> str:
+    """
+    Normaliza a URL para servir de chave de cache.
+
+    Para o Google Scholar mantém apenas os parâmetros relevantes (user=, citation_for_view=, ...)
+    em ordem fixa, ignorando hl e outros; para outros sites remove fragmentos e parâmetros utm_*.
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    query = urllib.parse.parse_qsl(parts.query, keep_blank_values=False)
+    if host.startswith("scholar.google."):
+        host = "scholar.google.com"
+        query = [(k, v) for k, v in query if k in SCHOLAR_PARAMS]
+    else:
+        query = [(k, v) for k, v in query if not k.startswith("utm_")]
+    query.sort()
+    path = parts.path or "/"
+    return urllib.parse.urlunsplit(("https", host, path, urllib.parse.urlencode(query), ""))
+
+def scholar_user_id(url: str) -> Optional[str]:
+    """Extrai o id do pesquisador (parâmetro user=) de uma URL do Scholar."""
+    params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url.strip()).query))
+    return params.get("user")
+
+def page_type(url: str) -> str:
+    """Classifica a URL em um dos tipos de PAGE_TTLS."""
+    if not is_scholar_url(url):
+        return "external"
+    params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query))
+    view_op = params.get("view_op", "")
+    if view_op == "search_authors":
+        return "search"
+    if view_op == "list_colleagues":
+        return "coauthors"
+    if view_op == "view_citation" or "citation_for_view" in params:
+        return "article"
+    return "profile"
+
+class PageCache:
+    """Cache de páginas HTML em disco, com chave na URL canônica e TTL por tipo de página."""
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_MB * 1024 * 1024):
+        self._store = DiskCache(path, max_bytes=max_bytes, default_ttl=PAGE_TTLS["profile"])
+
+    def get(self, url: str) -> Optional[dict]:
+        raw = self._store.get(canonical_url(url))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, url: str, entry: dict):
+        payload = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        self._store.set(canonical_url(url), payload, ttl=PAGE_TTLS[page_type(url)])
+
+    def invalidate(self, url: str):
+        self._store.delete(canonical_url(url))
+
+    def stats(self) -> dict:
+        return self._store.stats()
+
+_page_cache: Optional[PageCache] = None
+
+def get_page_cache() -> Optional[PageCache]:
+    """Retorna o cache de páginas do processo, ou None se estiver desativado."""
+    global _page_cache
+    if not CACHE_ENABLED:
+        return None
+    if _page_cache is None:
+        _page_cache = PageCache()
+    return _page_cache
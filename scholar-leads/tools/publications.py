@@ -0,0 +1,99 @@
+import asyncio
+import os
+import urllib.parse
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional
+
+from models import Publication
+from tools.fetcher import fetch_page
+from tools.scholar_parser import parse_publications_page
+
+# O Scholar aceita no máximo 100 linhas por página da tabela de artigos
+PUBLICATIONS_PAGESIZE = 100
+# Quantas páginas buscar em paralelo depois que a primeira mostrar que há mais
+PUBLICATIONS_WINDOW = int(os.getenv("SCHOLAR_PUBLICATIONS_WINDOW", "4"))
+PUBLICATIONS_MAX_PAGES = int(os.getenv("SCHOLAR_PUBLICATIONS_MAX_PAGES", "50"))
+# Artigos mais recentes conferidos antes de reaproveitar a lista completa na atualização incremental
+RECENT_PUBLICATIONS_PROBE = int(os.getenv("SCHOLAR_RECENT_PUBLICATIONS_PROBE", "20"))
+
+def publications_page_url(profile_url: str, cstart: int, pagesize: int = PUBLICATIONS_PAGESIZE,
+                          sortby: Optional[str] = None) -> str:
+    """Monta a URL de uma página da tabela de artigos do perfil (cstart/pagesize e, se dado, sortby)."""
+    parts = urllib.parse.urlsplit(profile_url)
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query) if k not in ("cstart", "pagesize", "sortby")]
+    query += [("cstart", str(cstart)), ("pagesize", str(pagesize))]
+    if sortby:
+        query.append(("sortby", sortby))
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+def parse_publication_rows(html: str) -> List[Publication]:
+    """Extrai título, URL, ano e número de citações de cada linha da tabela de artigos."""
+    return [
+        Publication(title=row.title, url=row.url or None, year=row.year, citations=row.citations)
+        for row in parse_publications_page(html)
+    ]
+
+async def _fetch_publications_page(profile_url: str, cstart: int, pagesize: int) -> Optional[List[Publication]]:
+    result = await fetch_page(publications_page_url(profile_url, cstart, pagesize), expect="gsc_a_b")
+    if not result.success:
+        print(f"Falha ao buscar artigos a partir de {cstart}")
+        return None
+    return parse_publication_rows(result.html)
+
+async def recent_publications(profile_url: str, count: int = RECENT_PUBLICATIONS_PROBE) -> Optional[List[Publication]]:
+    """
+    Os `count` artigos mais recentes do perfil (tabela ordenada por data, sortby=pubdate), ou
+    None se a página falhar. Artigos novos ainda sem citações não aparecem na primeira página
+    ordenada por citações, mas aparecem aqui.
+    """
+    result = await fetch_page(publications_page_url(profile_url, 0, count, sortby="pubdate"), expect="gsc_a_b")
+    if not result.success:
+        print("Falha ao buscar os artigos mais recentes do perfil")
+        return None
+    return parse_publication_rows(result.html)
+
+async def iter_publications(profile_url: str, pagesize: int = PUBLICATIONS_PAGESIZE,
+                            window: int = PUBLICATIONS_WINDOW,
+                            max_pages: int = PUBLICATIONS_MAX_PAGES) -> AsyncIterator[Publication]:
+    """
+    Gera todos os artigos do perfil, na ordem da tabela, paginando com cstart/pagesize.
+
+    A primeira página é buscada sozinha; se vier cheia, as próximas são buscadas em
+    janelas de `window` páginas em paralelo até uma página vir incompleta. Quem consome
+    pode parar a iteração a qualquer momento; buscas pendentes são canceladas.
+    """
+    first = await _fetch_publications_page(profile_url, 0, pagesize)
+    if not first:
+        return
+    for publication in first:
+        yield publication
+    if len(first) < pagesize:
+        return
+
+    page = 1
+    while page < max_pages:
+        starts = [(page + i) * pagesize for i in range(min(window, max_pages - page))]
+        tasks = [asyncio.ensure_future(_fetch_publications_page(profile_url, start, pagesize)) for start in starts]
+        try:
+            for task in tasks:
+                rows = await task
+                if not rows:
+                    return
+                for publication in rows:
+                    yield publication
+                if len(rows) < pagesize:
+                    return
+        finally:
+            for task in tasks:
+                task.cancel()
+        page += len(starts)
+
+async def fetch_all_publications(profile_url: str, limit: Optional[int] = None) -> List[Publication]:
+    """Retorna a lista completa de artigos do perfil (ou os primeiros `limit`)."""
+    publications = []
+    async with aclosing(iter_publications(profile_url)) as stream:
+        async for publication in stream:
+            publications.append(publication)
+            if limit and len(publications) >= limit:
+                break
+    return publications
@@ -0,0 +1,310 @@
+import asyncio
+import contextvars
+import json
+import os
+import re
+import unicodedata
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.metrics import CLASSIFIER_DECISIONS
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLASSIFIER_ENABLED = os.getenv("SCHOLAR_CLASSIFIER_ENABLED", "1") not in ("0", "false", "False")
+# Pesos ajustados com benchmarks/classifier_agreement.py --salvar; sem o arquivo, vale o léxico
+CLASSIFIER_MODEL_PATH = os.getenv(
+    "SCHOLAR_CLASSIFIER_MODEL_PATH", os.path.join(BASE_DIR, "config", "qualitative_classifier.json")
+)
+# Abaixo de LOW o pesquisador é classificado localmente como não qualitativo, acima de HIGH
+# como qualitativo; entre os dois o caso é ambíguo e vai para o LLM
+CLASSIFIER_LOW = float(os.getenv("SCHOLAR_CLASSIFIER_LOW", "0.1"))
+CLASSIFIER_HIGH = float(os.getenv("SCHOLAR_CLASSIFIER_HIGH", "0.9"))
+# Em um lote, perfis cujo crawling termina dentro desta janela (segundos) são classificados juntos
+CLASSIFIER_BATCH_WINDOW = float(os.getenv("SCHOLAR_CLASSIFIER_BATCH_WINDOW", "2.0"))
+
+# Léxico (termo, expressão sobre o texto normalizado a partir do início de uma palavra, peso
+# inicial). Os termos são radicais, então "qualitativ" cobre qualitativa, qualitativo e qualitative.
+LEXICON = [
+    # Métodos qualitativos
+    ("qualitativ", r"qualitativ", 2.0),
+    ("entrevista", r"(?:entrevista|interview)", 1.0),
+    ("semiestruturada", r"(?:semi-?estruturad|semi ?estruturad|semi-?structured)", 1.2),
+    ("entrevista em profundidade", r"(?:entrevistas? em profundidade|in-?depth interview)", 1.2),
+    ("grupo focal", r"(?:grupos? foca(?:l|is)|focus groups?)", 1.8),
+    ("etnografia", r"(?:etnograf|ethnograph)", 2.0),
+    ("autoetnografia", r"(?:autoetnograf|autoethnograph)", 2.0),
+    ("observação participante", r"(?:observacao participante|participant observation)", 1.8),
+    ("análise de conteúdo", r"(?:analise de conteudo|content analysis)", 1.4),
+    ("análise temática", r"(?:analise tematica|thematic analysis)", 1.8),
+    ("análise do discurso", r"(?:analise (?:critica )?d[oe] discurso|discourse analysis)", 1.3),
+    ("fenomenologia", r"(?:fenomenolog|phenomenolog)", 1.5),
+    ("teoria fundamentada", r"(?:teoria fundamentada|grounded theory)", 2.0),
+    ("narrativa", r"narrativ", 0.8),
+    ("história de vida", r"(?:historias? de vida|life histor)", 1.5),
+    ("história oral", r"(?:historia oral|oral histor)", 1.5),
+    ("estudo de caso", r"(?:estudo de caso|case stud)", 0.6),
+    ("hermenêutica", r"hermeneutic", 1.0),
+    ("cartografia", r"cartograf", 0.8),
+    ("pesquisa-ação", r"(?:pesquisa-? ?acao|action research)", 1.2),
+    ("bardin", r"bardin\b", 1.5),
+    ("software qualitativo", r"(?:nvivo|atlas\.?ti|maxqda|iramuteq)\b", 2.0),
+    ("representações sociais", r"(?:representac(?:ao|oes) socia(?:l|is)|social representation)", 1.0),
+    ("interpretativa", r"(?:interpretativ|interpretive)", 0.8),
+    ("subjetividade", r"(?:subjetividade|subjectivit)", 0.6),
+    ("diário de campo", r"(?:diarios? de campo|field ?notes)", 1.2),
+    ("métodos mistos", r"(?:metodos mistos|mixed[- ]methods?)", 0.3),
+    # Métodos quantitativos e áreas sem pesquisa qualitativa
+    ("quantitativ", r"quantitativ", -1.0),
+    ("regressão", r"(?:regressao|regression)", -1.2),
+    ("estatística", r"(?:estatistic|statistic)", -0.8),
+    ("experimento", r"(?:experimento|experimenta(?:l|is)|experiment)", -0.8),
+    ("ensaio clínico", r"(?:ensaios? clinicos?|clinical trials?|randomi[sz]ed|randomizad)", -1.5),
+    ("meta-análise", r"(?:meta-?analis|meta-?analys)", -1.2),
+    ("aprendizado de máquina", r"(?:aprendizado de maquina|machine learning|deep learning)", -1.5),
+    ("redes neurais", r"(?:redes? neura(?:l|is)|neural networks?|convolutional)", -1.5),
+    ("algoritmo", r"(?:algoritm|algorithm)", -1.2),
+    ("simulação", r"(?:simulac|simulation)", -1.0),
+    ("otimização", r"(?:otimizac|optimi[sz]ation)", -1.2),
+    ("modelo matemático", r"(?:modelos? matematicos?|mathematical model)", -1.2),
+    ("equações estruturais", r"(?:equacoes estruturais|structural equation)", -1.0),
+    ("prevalência", r"(?:prevalencia|prevalence)", -0.6),
+    ("coorte", r"(?:coorte|cohort)", -0.8),
+    ("espectroscopia", r"(?:espectroscop|spectroscop)", -1.5),
+    ("sensor", r"sensor", -1.0),
+]
+TERMS = [term for term, _, _ in LEXICON]
+PRIOR_WEIGHTS = np.array([weight for _, _, weight in LEXICON])
+# Sem nenhum termo do léxico, o score fica entre os limiares e a decisão fica com o LLM
+PRIOR_BIAS = -0.5
+
+# Uma única passada pelo texto: cada termo vira um grupo nomeado da alternância, e o início de
+# palavra fica fora dela para que as posições no meio das palavras sejam descartadas de uma vez
+_LEXICON_RE = re.compile(
+    r"\b(?:" + "|".join(f"(?P<t{i}>{pattern})" for i, (_, pattern, _) in enumerate(LEXICON)) + ")"
+)
+
+def normalize(text: str) -> str:
+    """Minúsculas e sem acentos, para o léxico valer em português e inglês."""
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def researcher_text(perfil: dict) -> str:
+    """Títulos e resumos dos artigos do perfil, mais os títulos da lista completa, se houver."""
+    partes = []
+    for artigo in perfil.get("articles") or []:
+        partes.append(artigo.get("title") or "")
+        partes.append(artigo.get("abstract") or "")
+    for publicacao in perfil.get("publications") or []:
+        partes.append(publicacao.get("title") or "")
+    return "\n".join(partes)
+
+def term_counts(texts: Sequence[str]) -> np.ndarray:
+    """Matriz (textos × termos) com as ocorrências de cada termo do léxico."""
+    counts = np.zeros((len(texts), len(LEXICON)))
+    for row, text in enumerate(texts):
+        hits = [int(match.lastgroup[1:]) for match in _LEXICON_RE.finditer(normalize(text))]
+        if hits:
+            np.add.at(counts[row], hits, 1)
+    return counts
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+@dataclass
+class ClassifierDecision:
+    score: float
+    # "qualitativo", "nao_qualitativo" ou "ambiguo"
+    decision: str
+    terms: Dict[str, int]
+
+    @property
+    def confident(self) -> bool:
+        return self.decision != "ambiguo"
+
+class QualitativeClassifier:
+    """
+    Modelo linear sobre TF-IDF dos termos do léxico: score = sigmoid(log1p(contagens) · idf · w + b),
+    calculado de uma vez para um lote de pesquisadores (ver ClassifierBatcher).
+    """
+
+    def __init__(self, weights: Optional[np.ndarray] = None, bias: float = PRIOR_BIAS,
+                 idf: Optional[np.ndarray] = None, low: float = CLASSIFIER_LOW, high: float = CLASSIFIER_HIGH):
+        self.weights = PRIOR_WEIGHTS.copy() if weights is None else np.asarray(weights, dtype=float)
+        self.bias = float(bias)
+        self.idf = np.ones(len(LEXICON)) if idf is None else np.asarray(idf, dtype=float)
+        self.low = low
+        self.high = high
+
+    @staticmethod
+    def _tf(counts: np.ndarray) -> np.ndarray:
+        return np.log1p(counts)
+
+    def features(self, counts: np.ndarray) -> np.ndarray:
+        return self._tf(counts) * self.idf
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        """Probabilidade de cada texto ser de um pesquisador qualitativo."""
+        return _sigmoid(self.features(term_counts(texts)) @ self.weights + self.bias)
+
+    def fit(self, texts: Sequence[str], labels: Sequence[bool], l2: float = 0.5,
+            iterations: int = 2000, learning_rate: float = 0.5) -> "QualitativeClassifier":
+        """
+        Ajusta idf, pesos e viés por regressão logística (gradiente descendente), com
+        regularização puxando os pesos para os do léxico: com poucos exemplos, termos
+        raros não perdem o sinal nem mudam de lado.
+        """
+        counts = term_counts(texts)
+        y = np.asarray(labels, dtype=float)
+        document_frequency = (counts > 0).sum(axis=0)
+        self.idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+        x = self.features(counts)
+        n = len(y)
+        for _ in range(iterations):
+            error = _sigmoid(x @ self.weights + self.bias) - y
+            self.weights -= learning_rate * (x.T @ error / n + l2 * (self.weights - PRIOR_WEIGHTS))
+            self.bias -= learning_rate * error.mean()
+        return self
+
+    def classify(self, perfis: Sequence[dict]) -> List[ClassifierDecision]:
+        """Classifica um lote de perfis (mesmo formato do crawler) em uma única conta matricial."""
+        counts = term_counts([researcher_text(perfil) for perfil in perfis])
+        scores = _sigmoid(self.features(counts) @ self.weights + self.bias)
+        decisions = []
+        for row, score in zip(counts, scores):
+            if score >= self.high:
+                decision = "qualitativo"
+            elif score <= self.low:
+                decision = "nao_qualitativo"
+            else:
+                decision = "ambiguo"
+            CLASSIFIER_DECISIONS.labels(decision=decision).inc()
+            terms = {TERMS[i]: int(row[i]) for i in np.flatnonzero(row)}
+            decisions.append(ClassifierDecision(round(float(score), 4), decision, terms))
+        return decisions
+
+    def to_dict(self) -> dict:
+        return {
+            "terms": TERMS,
+            "weights": [round(float(w), 6) for w in self.weights],
+            "idf": [round(float(v), 6) for v in self.idf],
+            "bias": round(self.bias, 6),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, **kwargs) -> "QualitativeClassifier":
+        # Termos que entraram no léxico depois do ajuste ficam com o peso inicial
+        weights = dict(zip(data["terms"], data["weights"]))
+        idf = dict(zip(data["terms"], data["idf"]))
+        return cls(
+            weights=[weights.get(term, prior) for term, prior in zip(TERMS, PRIOR_WEIGHTS)],
+            bias=data.get("bias", PRIOR_BIAS),
+            idf=[idf.get(term, 1.0) for term in TERMS],
+            **kwargs,
+        )
+
+    def save(self, path: str = CLASSIFIER_MODEL_PATH):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+def local_verdict(decision: ClassifierDecision) -> dict:
+    """Veredito no formato de pipeline.parse_verdict para os casos decididos sem o LLM."""
+    qualitativo = decision.decision == "qualitativo"
+    positivos = [term for term in decision.terms if PRIOR_WEIGHTS[TERMS.index(term)] > 0]
+    negativos = [term for term in decision.terms if PRIOR_WEIGHTS[TERMS.index(term)] < 0]
+    indicadores = []
+    if positivos:
+        indicadores.append(f"indicadores qualitativos: {', '.join(positivos)}")
+    if negativos:
+        indicadores.append(f"indicadores quantitativos/técnicos: {', '.join(negativos)}")
+    detalhes = "; ".join(indicadores) or "nenhum indicador metodológico encontrado"
+    return {
+        "qualitative_research_analysis": {
+            "contains_qualitative_research": bool(positivos),
+            "is_qualitative_researcher": qualitativo,
+            "detailed_analysis": (
+                f"Classificação automática pelos títulos e resumos (score {decision.score:.2f}); {detalhes}."
+            ),
+        },
+        "veredict": (
+            "Pesquisador com produção claramente voltada à pesquisa qualitativa."
+            if qualitativo else
+            "Produção sem indícios de pesquisa qualitativa; predominam métodos quantitativos ou técnicos."
+        ),
+    }
+
+_classifier: Optional[QualitativeClassifier] = None
+
+def get_classifier() -> Optional[QualitativeClassifier]:
+    """Retorna o classificador do processo, ou None se estiver desativado."""
+    global _classifier
+    if not CLASSIFIER_ENABLED:
+        return None
+    if _classifier is None:
+        if os.path.exists(CLASSIFIER_MODEL_PATH):
+            with open(CLASSIFIER_MODEL_PATH, "r", encoding="utf-8") as f:
+                _classifier = QualitativeClassifier.from_dict(json.load(f))
+        else:
+            _classifier = QualitativeClassifier()
+    return _classifier
+
+class ClassifierBatcher:
+    """
+    Junta os perfis de um lote de análises que terminam o crawling perto um do outro e os
+    classifica em uma única chamada a classify(): o primeiro perfil abre uma janela de
+    `window` segundos e todos os que chegarem até o fim dela vão juntos. Usado só dentro do
+    loop em que as análises rodam.
+    """
+
+    def __init__(self, classifier: QualitativeClassifier, window: float = CLASSIFIER_BATCH_WINDOW):
+        self.classifier = classifier
+        self.window = window
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._flush: Optional[asyncio.Task] = None
+
+    async def classify(self, perfil: dict) -> ClassifierDecision:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((perfil, future))
+        if self._flush is None:
+            self._flush = asyncio.ensure_future(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        pending, self._pending, self._flush = self._pending, [], None
+        try:
+            decisions = self.classifier.classify([perfil for perfil, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        print(f"Classificador: {len(pending)} perfis do lote classificados juntos")
+        for (_, future), decision in zip(pending, decisions):
+            if not future.done():
+                future.set_result(decision)
+
+_batcher: contextvars.ContextVar[Optional[ClassifierBatcher]] = contextvars.ContextVar(
+    "scholar_classifier_batcher", default=None
+)
+
+@contextmanager
+def classifier_batch(batcher: Optional[ClassifierBatcher]):
+    """Faz os vereditos do bloco (acompanha run_async e to_thread) usarem `batcher`."""
+    token = _batcher.set(batcher)
+    try:
+        yield
+    finally:
+        _batcher.reset(token)
+
+async def classify_profile(perfil: dict) -> Optional[ClassifierDecision]:
+    """Decisão do classificador para um perfil, junto com o lote em andamento se houver um; None se desativado."""
+    batcher = _batcher.get()
+    if batcher is not None:
+        return await batcher.classify(perfil)
+    classifier = get_classifier()
+    return classifier.classify([perfil])[0] if classifier is not None else None
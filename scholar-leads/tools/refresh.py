@@ -0,0 +1,119 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from tools.metrics import REFRESH_ITEMS
+from tools.page_cache import scholar_user_id
+
+# Campos do resultado que vêm do veredito qualitativo (ver parse_verdict e local_verdict)
+VERDICT_KEYS = ("qualitative_research_analysis", "veredict", "classifier")
+# Como cada ação aparece no resumo impresso
+ACTION_LABELS = {"reused": "reaproveitados", "fetched": "buscados"}
+
+@dataclass
+class RefreshReport:
+    """
+    O que uma atualização incremental reaproveitou do último resultado salvo e o que buscou
+    de novo. Artigos são contados um a um; coautores, lista completa e veredito são
+    reaproveitados ou refeitos por inteiro.
+
+    Os coautores são reaproveitados pela barra lateral do perfil (coauthors_basis="sidebar"):
+    se todos os que ela mostra já estavam na lista anterior, a página "ver todos" não é
+    buscada, então coautores novos que só aparecem nela passam despercebidos até a barra mudar.
+    """
+    previous_citations: Optional[int] = None
+    current_citations: Optional[int] = None
+    articles_reused: List[str] = field(default_factory=list)
+    articles_fetched: List[str] = field(default_factory=list)
+    coauthors: str = "fetched"
+    coauthors_basis: Optional[str] = None
+    publications: Optional[str] = None
+    verdict: Optional[str] = None  # reused ou rerun, preenchido pelo pipeline
+
+    def record(self):
+        """Soma nas métricas os itens do crawling reaproveitados e buscados (o veredito é somado pelo pipeline)."""
+        REFRESH_ITEMS.labels(item="article", action="reused").inc(len(self.articles_reused))
+        REFRESH_ITEMS.labels(item="article", action="fetched").inc(len(self.articles_fetched))
+        REFRESH_ITEMS.labels(item="coauthors", action=self.coauthors).inc()
+        if self.publications is not None:
+            REFRESH_ITEMS.labels(item="publications", action=self.publications).inc()
+
+    def summary(self) -> str:
+        parts = [
+            f"resumos {len(self.articles_reused)} reaproveitados / {len(self.articles_fetched)} buscados",
+            f"coautores {_label(self.coauthors)}" + (" (pela barra lateral)" if self.coauthors_basis == "sidebar" else ""),
+        ]
+        if self.publications is not None:
+            parts.append(f"lista completa {'reaproveitada' if self.publications == 'reused' else 'buscada'}")
+        if self.verdict is not None:
+            parts.append(f"veredito {'reaproveitado' if self.verdict == 'reused' else 'refeito'}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def _label(action: str) -> str:
+    return ACTION_LABELS.get(action, action)
+
+def reusable_articles(previous: dict) -> Dict[str, dict]:
+    """
+    Artigos do resultado anterior que podem ser reaproveitados, pela URL: os que já têm o
+    resumo e cuja página já foi lida em busca do link do texto completo (chave artigo_completo).
+    """
+    return {
+        str(article["url"]): article
+        for article in previous.get("articles") or []
+        if article.get("url") and article.get("abstract") and "artigo_completo" in article
+    }
+
+def coauthor_ids(coauthors) -> set:
+    """Ids do Scholar (user=) dos coautores, a partir dos modelos ou do JSON salvo."""
+    ids = set()
+    for coauthor in coauthors or []:
+        url = coauthor.get("profile_url") if isinstance(coauthor, dict) else coauthor.profile_url
+        user_id = scholar_user_id(str(url)) if url else None
+        if user_id:
+            ids.add(user_id)
+    return ids
+
+def _publication_key(publication) -> str:
+    if isinstance(publication, dict):
+        return str(publication.get("url") or publication.get("title"))
+    return str(publication.url or publication.title)
+
+def publications_unchanged(previous: dict, total_citations: int, rows) -> bool:
+    """
+    A lista completa salva ainda vale se as citações não mudaram e todos os artigos de `rows`
+    (os mais recentes do perfil, ver publications.recent_publications) já estão nela, pela URL
+    ou, sem link, pelo título. Um único artigo desconhecido conta como mudança.
+    """
+    publications = previous.get("publications") or []
+    if not publications or previous.get("total_citations") != total_citations:
+        return False
+    known = {_publication_key(p) for p in publications}
+    return all(_publication_key(row) in known for row in rows)
+
+def verdict_inputs(perfil: dict) -> Tuple:
+    """
+    O que o veredito qualitativo recebe do perfil (ver build_verdict_messages): área,
+    artigos com seus resumos e lista completa.
+    """
+    return (
+        perfil.get("research_area"),
+        tuple(
+            (str(article.get("url") or article.get("title")), article.get("abstract") or None)
+            for article in perfil.get("articles") or []
+        ),
+        tuple(_publication_key(p) for p in perfil.get("publications") or []),
+    )
+
+def previous_verdict(previous: Optional[dict], perfil: dict) -> Optional[dict]:
+    """
+    O veredito do resultado anterior, se os artigos analisados não mudaram desde então.
+    Os resumos também são comparados: um artigo que antes ficou sem resumo é buscado de
+    novo (ver reusable_articles) e, se agora tiver um, o veredito é refeito.
+    """
+    if not previous or "qualitative_research_analysis" not in previous:
+        return None
+    if verdict_inputs(previous) != verdict_inputs(perfil):
+        return None
+    return {key: previous[key] for key in VERDICT_KEYS if key in previous}
@@ -0,0 +1,136 @@
+import asyncio
+import atexit
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, List, Optional
+
+# Loop de eventos compartilhado pelas ferramentas.
+# Recursos de longa duração (navegadores, conexões) ficam presos ao loop em que
+# foram criados, então todas as corrotinas das ferramentas rodam neste mesmo loop
+# em vez de criar (e destruir) um loop novo com asyncio.run a cada chamada.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+_shutdown_hooks: List[Callable[[], Awaitable[Any]]] = []
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Retorna o loop compartilhado, iniciando-o em uma thread de fundo se necessário."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(
+                target=_loop.run_forever,
+                name="scholar-runtime-loop",
+                daemon=True
+            )
+            _thread.start()
+        return _loop
+
+def adopt_loop(loop: Optional[asyncio.AbstractEventLoop] = None) -> bool:
+    """
+    Usa `loop` (padrão: o loop em execução, por exemplo o do servidor) como loop compartilhado.
+
+    As análises aguardadas nesse loop rodam nele mesmo, sem thread de fundo nem troca de
+    loop; código síncrono em outras threads (as ferramentas da crew) continua usando run_sync.
+    Só é possível antes de o loop de fundo ser criado: retorna False se ele já existir.
+    Quem adota o loop chama shutdown() antes de encerrá-lo.
+    """
+    global _loop, _thread
+    loop = loop or asyncio.get_running_loop()
+    with _lock:
+        if _loop is loop:
+            return True
+        if _loop is not None and not _loop.is_closed():
+            return False
+        _loop = loop
+        _thread = None
+        return True
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Executa uma corrotina no loop compartilhado e bloqueia até o resultado.
+
+    Deve ser chamada de código síncrono (por exemplo, o _run das ferramentas do CrewAI).
+    """
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync não pode ser chamada de dentro do loop compartilhado; use await")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+async def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Aguarda uma corrotina executada no loop compartilhado a partir de outro loop
+    (por exemplo, o loop do FastAPI), sem bloqueá-lo.
+    """
+    loop = get_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+async def stream_async(agen: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """
+    Itera, a partir de outro loop, um gerador assíncrono executado no loop compartilhado.
+    Os itens são repassados assim que produzidos; se o consumidor parar, o gerador é cancelado.
+    """
+    loop = get_loop()
+    caller = asyncio.get_running_loop()
+    if caller is loop:
+        async for item in agen:
+            yield item
+        return
+
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for item in agen:
+                caller.call_soon_threadsafe(queue.put_nowait, (item, None))
+        except BaseException as e:
+            caller.call_soon_threadsafe(queue.put_nowait, (done, e))
+            raise
+        else:
+            caller.call_soon_threadsafe(queue.put_nowait, (done, None))
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is done:
+                if error is not None and not isinstance(error, asyncio.CancelledError):
+                    raise error
+                return
+            yield item
+    finally:
+        future.cancel()
+
+def on_shutdown(hook: Callable[[], Awaitable[Any]]):
+    """Registra uma corrotina de limpeza (fechar navegadores, conexões) executada ao sair."""
+    _shutdown_hooks.append(hook)
+    return hook
+
+async def shutdown():
+    """Executa as rotinas de limpeza no loop compartilhado (para loops adotados com adopt_loop)."""
+    await run_async(_run_shutdown_hooks())
+
+async def _run_shutdown_hooks():
+    for hook in reversed(_shutdown_hooks):
+        try:
+            await hook()
+        except Exception as e:
+            print(f"Erro ao encerrar recurso compartilhado: {str(e)}")
+
+def _shutdown_at_exit():
+    if _loop is None or _loop.is_closed() or not _loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_run_shutdown_hooks(), _loop).result(timeout=10)
+    except Exception:
+        pass
+
+atexit.register(_shutdown_at_exit)
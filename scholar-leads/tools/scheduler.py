@@ -0,0 +1,220 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import time
+import urllib.parse
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from tools.metrics import SCHEDULER_BLOCKS, SCHEDULER_RATE, SCHEDULER_RETRIES, SCHEDULER_WAIT
+from tools.scholar_parser import SCHOLAR_URL
+
+# Taxa sustentada (requisições/s) e rajada permitidas no Scholar, compartilhadas pelo processo
+SCHOLAR_RATE_LIMIT = float(os.getenv("SCHOLAR_RATE_LIMIT", "1"))
+SCHOLAR_RATE_BURST = int(os.getenv("SCHOLAR_RATE_BURST", "5"))
+# Demais sites (editoras, repositórios), por host
+OTHER_RATE_LIMIT = float(os.getenv("SCHOLAR_OTHER_RATE_LIMIT", "4"))
+OTHER_RATE_BURST = int(os.getenv("SCHOLAR_OTHER_RATE_BURST", "4"))
+# Taxa mínima após bloqueios, como fração da taxa configurada
+MIN_RATE_FACTOR = 0.05
+# Pausa após um bloqueio: dobra a cada bloqueio seguido, até o máximo
+BLOCK_COOLDOWN = float(os.getenv("SCHOLAR_BLOCK_COOLDOWN", "10"))
+BLOCK_COOLDOWN_MAX = float(os.getenv("SCHOLAR_BLOCK_COOLDOWN_MAX", "300"))
+# Retentativas de uma busca e prazo total (fila + tentativas), em segundos
+FETCH_ATTEMPTS = int(os.getenv("SCHOLAR_FETCH_ATTEMPTS", "3"))
+FETCH_DEADLINE = float(os.getenv("SCHOLAR_FETCH_DEADLINE", "120"))
+RETRY_BASE_DELAY = 1.0
+
+# Prioridades: trabalho interativo (/analyze, stream) passa na frente de lotes e jobs
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("scholar_request_priority", default=INTERACTIVE)
+
+@contextmanager
+def request_priority(priority: int):
+    """Define a prioridade das buscas feitas dentro do bloco (acompanha run_sync/run_async e to_thread)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+class DeadlineExceeded(Exception):
+    """O prazo da busca terminou antes de conseguir uma vaga no limitador."""
+
+class HostLimiter:
+    """
+    Token bucket de um host, com fila de espera por prioridade e redução adaptativa da taxa.
+
+    Bloqueios (CAPTCHA, 429, "tráfego incomum") cortam a taxa pela metade e pausam o host
+    por um tempo crescente; cada resposta normal devolve aos poucos a taxa configurada.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.paused_until = 0.0
+        self.consecutive_blocks = 0
+        self.blocks = 0
+        self._updated = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        SCHEDULER_RATE.labels(host=name).set(rate)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _delay(self) -> float:
+        """Tempo até a próxima vaga (0 se já houver uma)."""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self, priority: int, timeout: Optional[float]):
+        """Espera a vez na fila (por prioridade, depois por ordem de chegada) e consome uma vaga."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"sem vaga para {self.name} dentro do prazo")
+        finally:
+            SCHEDULER_WAIT.labels(priority=PRIORITY_NAMES.get(priority, str(priority))).observe(
+                time.monotonic() - start
+            )
+
+    async def _dispatch(self):
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                # Desistiu (prazo ou cancelamento)
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(self._waiters)
+            self.tokens -= 1
+            future.set_result(None)
+
+    def record_success(self):
+        self.consecutive_blocks = 0
+        if self.rate < self.max_rate:
+            # Aumento aditivo: ~20 respostas normais para voltar à taxa configurada
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+            SCHEDULER_RATE.labels(host=self.name).set(self.rate)
+
+    def record_block(self):
+        self.blocks += 1
+        self.consecutive_blocks += 1
+        self.rate = max(self.max_rate * MIN_RATE_FACTOR, self.rate / 2)
+        cooldown = min(BLOCK_COOLDOWN_MAX, BLOCK_COOLDOWN * 2 ** (self.consecutive_blocks - 1))
+        self.paused_until = max(self.paused_until, time.monotonic() + cooldown * random.uniform(0.8, 1.2))
+        self.tokens = 0.0
+        SCHEDULER_RATE.labels(host=self.name).set(self.rate)
+        SCHEDULER_BLOCKS.labels(host=self.name).inc()
+        print(f"⚠️ Bloqueio detectado em {self.name}: taxa reduzida para {self.rate:.2f} req/s, "
+              f"pausa de {cooldown:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "tokens": round(min(self.burst, self.tokens), 2),
+            "waiting": sum(1 for _, _, future in self._waiters if not future.done()),
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 1),
+            "blocks": self.blocks,
+        }
+
+# Resultado de uma tentativa: "ok", "blocked" (reduz a taxa e tenta de novo),
+# "retry" (erro transitório) ou "fail" (não adianta tentar de novo)
+Outcome = str
+
+class RequestScheduler:
+    """
+    Agenda todas as buscas de página do processo: limitador por host, retentativas com
+    jitter dentro de um prazo e prioridade entre trabalho interativo e em lote.
+
+    Pertence ao loop compartilhado de tools.runtime, como o pool de navegadores.
+    """
+
+    def __init__(self):
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._scholar_host = urllib.parse.urlsplit(SCHOLAR_URL).hostname or ""
+
+    def limiter_for(self, url: str) -> HostLimiter:
+        host = (urllib.parse.urlsplit(url).hostname or "").lower()
+        if host.startswith("scholar.google.") or host == self._scholar_host:
+            key, rate, burst = "scholar", SCHOLAR_RATE_LIMIT, SCHOLAR_RATE_BURST
+        else:
+            key, rate, burst = host, OTHER_RATE_LIMIT, OTHER_RATE_BURST
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._limiters[key] = HostLimiter(key, rate, burst)
+        return limiter
+
+    async def run(self, url: str, attempt: Callable[[], Awaitable[Tuple[Any, Outcome]]],
+                  deadline: Optional[float] = None, attempts: int = FETCH_ATTEMPTS,
+                  retry_blocked: bool = True) -> Any:
+        """
+        Executa `attempt` respeitando o limitador do host de `url`.
+
+        `attempt` faz uma tentativa e retorna (resultado, desfecho). Bloqueios (se
+        retry_blocked) e erros transitórios são repetidos com espera exponencial com jitter
+        enquanto houver prazo (`deadline` segundos a partir de agora, incluindo a espera na
+        fila); o último resultado é retornado. Levanta DeadlineExceeded se não conseguir
+        nem uma vaga.
+        """
+        limiter = self.limiter_for(url)
+        priority = _priority.get()
+        end = time.monotonic() + (deadline if deadline is not None else FETCH_DEADLINE)
+        result = None
+        for number in range(max(1, attempts)):
+            await limiter.acquire(priority, timeout=max(0.0, end - time.monotonic()))
+            result, outcome = await attempt()
+            if outcome == "ok":
+                limiter.record_success()
+                return result
+            if outcome == "blocked":
+                limiter.record_block()
+                if not retry_blocked:
+                    return result
+            elif outcome != "retry":
+                return result
+            delay = RETRY_BASE_DELAY * 2 ** number * random.uniform(0.5, 1.5)
+            if number + 1 >= attempts or time.monotonic() + delay >= end:
+                break
+            SCHEDULER_RETRIES.labels(host=limiter.name, reason=outcome).inc()
+            print(f"Nova tentativa para {url} em {delay:.1f}s ({outcome})")
+            await asyncio.sleep(delay)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+_scheduler: Optional[RequestScheduler] = None
+
+def get_scheduler() -> RequestScheduler:
+    """Retorna o agendador de requisições do processo."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RequestScheduler()
+    return _scheduler
@@ -1,12 +1,25 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Optional, Type
 from pydantic import BaseModel, Field
 import asyncio
 import json
+import os
 import re
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
-from bs4 import BeautifulSoup
 from models import ScholarProfile, Article, Coauthor
+from tools.events import publish
+from tools.external_abstracts import external_abstract, external_links
+from tools.fetcher import fetch_page
+from tools.metrics import record_failure, timed_stage
+from tools.page_cache import scholar_user_id
+from tools.publications import fetch_all_publications, recent_publications
+from tools.refresh import RefreshReport, coauthor_ids, publications_unchanged, reusable_articles
+from tools.runtime import run_async, run_sync
+from tools.scholar_parser import (
+    SCHOLAR_URL, absolute_url, long_value, parse_citation_page, parse_coauthors_page, parse_profile
+)
+
+# Número máximo de páginas de artigos buscadas ao mesmo tempo para um mesmo perfil
+ABSTRACT_CONCURRENCY = int(os.getenv("SCHOLAR_ABSTRACT_CONCURRENCY", "5"))
 
 class ScholarProfileInput(BaseModel):
     """Input schema para a ferramenta ScholarCrawler."""
@@ -21,13 +34,15 @@ class ScholarCrawlerTool(BaseTool):
     args_schema: Type[BaseModel] = ScholarProfileInput
     
     def _run(self, profile_url: str) -> str:
-        result = asyncio.run(crawl_scholar_profile(profile_url))
-        return result
+        return run_sync(self._arun(profile_url))
+
+    async def _arun(self, profile_url: str) -> str:
+        return await run_async(crawl_scholar_profile(profile_url))
 
-async def extract_coauthor_info(crawler, coauthor_element):
-    """Extrai informações detalhadas de um coautor acessando seu perfil individual."""
+async def extract_coauthor_info(coauthor_entry):
+    """Extrai nome, perfil, instituição e domínio de email de um coautor (CoauthorEntry do parser)."""
     # Obter o texto completo
-    full_text = coauthor_element.text.strip()
+    full_text = coauthor_entry.text
     
     # Inicializar valores padrão
     name = full_text
@@ -35,20 +50,13 @@ async def extract_coauthor_info(crawler, coauthor_element):
     institution = None
     email_domain = None
     
-    # Tentar extrair a URL do perfil
-    # Primeiro, verificar se o próprio elemento tem um atributo href
-    href = coauthor_element.get('href')
-    
-    # Se não tiver, procurar por um elemento <a> dentro dele
-    if not href and hasattr(coauthor_element, 'find'):
-        a_element = coauthor_element.find('a')
-        if a_element and a_element.get('href'):
-            href = a_element.get('href')
+    # URL do perfil: link do próprio elemento ou do primeiro <a> dentro dele
+    href = coauthor_entry.href
     
     if href:
         # Certifique-se de que href contém "user="
         if 'user=' in href:
-            profile_url = f"https://scholar.google.com{href}"
+            profile_url = f"{SCHOLAR_URL}{href}"
             print(f"URL do perfil encontrada: {profile_url}")
         else:
             print(f"Link encontrado mas não é perfil de usuário: {href}")
@@ -84,181 +92,248 @@ async def extract_coauthor_info(crawler, coauthor_element):
         email_domain=email_domain
     )
 
-async def extract_article_abstract(crawler, article_url):
-    """Extrai o resumo de um artigo acessando sua página de detalhes."""
+async def abstract_from_citation_page(article_url, page):
+    """Extrai o resumo de uma página de detalhes do artigo já parseada (CitationPage)."""
+    page_title = page.page_title or 'Artigo'
+    abstract = None
+    
+    # Método 1: Extrair do campo de descrição específico do Google Scholar
+    # Este é o seletor mais preciso, focado na estrutura do Google Scholar
+    if page.description:
+        print(f"Resumo extraído do campo de descrição para: {page_title}")
+        return page.description
+    
+    # Método 2: Buscar qualquer valor em gsc_oci_value que tenha conteúdo extenso
+    abstract = long_value(page)
+    if abstract:
+        print(f"Resumo extraído de gsc_oci_value para: {page_title}")
+        return abstract
+    
+    # Método 3: Buscar em "Resumo" ou "Abstract" em qualquer parte da página
+    found = page.keyword_abstract()
+    if found:
+        keyword, abstract = found
+        print(f"Resumo extraído após '{keyword}' para: {page_title}")
+        return abstract
+    
+    # Método 4: página da editora ou PDF (tools/external_abstracts.py), com limite por domínio
+    # e um prazo total por artigo
+    abstract = await external_abstract(external_links(page))
+    if abstract:
+        print(f"Resumo extraído da fonte original para: {page_title}")
+        return abstract
+    
+    print(f"Resumo não encontrado na página do artigo: {article_url}")
+    return abstract
+
+@timed_stage("abstract")
+async def extract_article_details(article_url):
+    """
+    Acessa a página de detalhes do artigo uma única vez e extrai o resumo e o link para o
+    texto completo (div.gsc_oci_title_ggi). Retorna (resumo, link), com None no que faltar.
+    """
     print(f"Extraindo resumo do artigo: {article_url}")
     
     try:
-        crawl_config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
-        result = await crawler.arun(url=article_url, config=crawl_config, session_id="article_abstract")
+        result = await fetch_page(article_url, expect="gsc_oci_title")
         
         if result.success:
-            soup = BeautifulSoup(result.html, 'html.parser')
-            abstract = None
-            
-            # Método 1: Extrair do campo de descrição específico do Google Scholar
-            # Este é o seletor mais preciso, focado na estrutura do Google Scholar
-            descr_label = soup.find('div', string='Descrição') or soup.find('div', string='Description')
-            if descr_label and descr_label.parent:
-                # O resumo geralmente está no próximo elemento após o label
-                next_sibling = descr_label.find_next_sibling('div', {'class': 'gsc_oci_value'})
-                if next_sibling:
-                    abstract = next_sibling.text.strip()
-                    print(f"Resumo extraído do campo de descrição para: {soup.title.text if soup.title else 'Artigo'}")
-                    return abstract
-            
-            # Método 2: Extração por ID específico
-            abstract_elem = soup.find(id='gsc_oci_desc')
-            if abstract_elem and abstract_elem.text.strip():
-                abstract = abstract_elem.text.strip()
-                print(f"Resumo extraído por ID para: {soup.title.text if soup.title else 'Artigo'}")
-                return abstract
-            
-            # Método 3: Buscar qualquer valor em gsc_oci_value que tenha conteúdo extenso
-            values = soup.select('.gsc_oci_value')
-            for value in values:
-                text = value.text.strip()
-                # Verificar se o texto parece um resumo (pelo menos 100 caracteres)
-                if len(text) > 100 and not text.count("\n") > 5:  # Evitar listas de referências
-                    abstract = text
-                    print(f"Resumo extraído de gsc_oci_value para: {soup.title.text if soup.title else 'Artigo'}")
-                    return abstract
-            
-            # Método 4: Buscar em "Resumo" ou "Abstract" em qualquer parte da página
-            for string in ['Resumo', 'Abstract', 'Resumé', 'Summary', 'Descrição', 'Description']:
-                elem = soup.find(string=lambda text: text and string in text)
-                if elem and elem.parent:
-                    next_text = elem.parent.find_next('p') or elem.parent.find_next('div')
-                    if next_text and len(next_text.text.strip()) > 50:
-                        abstract = next_text.text.strip()
-                        print(f"Resumo extraído após '{string}' para: {soup.title.text if soup.title else 'Artigo'}")
-                        return abstract
-            
-            # Método 5: Buscar o link para o PDF ou página do artigo
-            pdf_links = soup.select('a[href*=".pdf"]') or soup.select('a.gsc_oci_title_link')
-            for link in pdf_links:
-                href = link.get('href')
-                if href and (href.endswith('.pdf') or 'doi.org' in href or any(domain in href for domain in ['ieee.org', 'springer.com', 'acm.org'])):
-                    print(f"Link para artigo original encontrado: {href}")
-                    try:
-                        ext_config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS, timeout=15000)
-                        ext_result = await crawler.arun(url=href, config=ext_config, session_id="original_article")
-                        if ext_result.success:
-                            ext_soup = BeautifulSoup(ext_result.html, 'html.parser')
-                            # Procurar abstract na página original
-                            for selector in ['abstract', 'paper-abstract', 'abstractSection', '#abstract', '.abstract']:
-                                abstract_section = ext_soup.select_one(selector)
-                                if abstract_section:
-                                    abstract = abstract_section.text.strip()
-                                    print(f"Resumo extraído da fonte original para: {soup.title.text if soup.title else 'Artigo'}")
-                                    return abstract
-                    except Exception as e:
-                        print(f"Erro ao acessar artigo original: {str(e)}")
-            
-            print(f"Resumo não encontrado na página do artigo: {article_url}")
-            return abstract
+            page = parse_citation_page(result.html)
+            if page is None:
+                record_failure("parse_error")
+                print(f"Página do artigo vazia: {article_url}")
+                return None, None
+            full_text_link = absolute_url(page.full_text_link)
+            return await abstract_from_citation_page(article_url, page), full_text_link
         else:
             print(f"Falha ao acessar a página do artigo")
-            return None
+            return None, None
     except Exception as e:
         print(f"Erro ao extrair resumo: {str(e)}")
-        return None
+        return None, None
 
-async def crawl_scholar_profile(profile_url: str) -> str:
-    print("\n*** Crawleando perfil do Google Scholar ***")
-    
-    # Configurar o crawler
-    browser_config = BrowserConfig(
-        headless=True,
-        verbose=False,
-        extra_args=["--disable-gpu", "--disable-dev-shm-usage", "--no-sandbox"],
-    )
-    crawl_config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
+async def extract_articles_details(article_urls, max_concurrency=ABSTRACT_CONCURRENCY):
+    """
+    Extrai resumo e link do texto completo de vários artigos em paralelo, limitado a
+    `max_concurrency` páginas. Os pares (resumo, link) são retornados na mesma ordem das URLs.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def extract(index, url):
+        if not url:
+            return None, None
+        async with semaphore:
+            abstract, full_text_link = await extract_article_details(url)
+        publish("resumo", {"indice": index, "url": url, "abstract": abstract})
+        if full_text_link:
+            publish("link_completo", {"url": url, "artigo_completo": full_text_link})
+        return abstract, full_text_link
+
+    return await asyncio.gather(*[extract(index, url) for index, url in enumerate(article_urls)])
 
-    crawler = AsyncWebCrawler(config=browser_config)
+async def extract_coauthors(profile_page, owner_id=None, fetch_all=True):
+    """
+    Extrai os coautores da barra lateral do perfil (ProfilePage já parseada) e, se fetch_all
+    for True, da página completa de coautores. Coautores repetidos são descartados pelo id
+    do Scholar (user=).
+    """
+    coauthors = []
+    seen_ids = {owner_id} if owner_id else set()
 
-    await crawler.start()
+    def add(coauthor):
+        user_id = scholar_user_id(str(coauthor.profile_url)) if coauthor.profile_url else None
+        if user_id:
+            if user_id in seen_ids:
+                return False
+            seen_ids.add(user_id)
+        coauthors.append(coauthor)
+        return True
 
+    coauthor_entries = profile_page.coauthors
+    print(f"Encontrados {len(coauthor_entries)} coautores na página principal")
+    
+    # Processar cada coautor
+    for entry in coauthor_entries:
+        coauthor = await extract_coauthor_info(entry)
+        if add(coauthor):
+            print(f"Coautor adicionado: {coauthor.name}")
+    sidebar_count = len(coauthors)
+    publish("coautores", {"origem": "perfil", "coautores": [c.model_dump(mode="json") for c in coauthors]})
+    
+    # Verificar se há um link para "ver todos os coautores"
+    all_coauthors_url = profile_page.coauthors_url if fetch_all else None
+    if all_coauthors_url:
+        print(f"Buscando página completa de coautores: {all_coauthors_url}")
+        
+        result_all = await fetch_page(all_coauthors_url)
+        if result_all.success:
+            # Os links dos coautores estão em elementos <a> dentro de blocos específicos
+            coauthor_links = parse_coauthors_page(result_all.html)
+            
+            print(f"Encontrados {len(coauthor_links)} links de coautores na página completa")
+            
+            for link in coauthor_links:
+                # Coautores já processados são ignorados pelo id
+                if link.href and scholar_user_id(link.href) not in seen_ids:
+                    coauthor = await extract_coauthor_info(link)
+                    if add(coauthor):
+                        print(f"Coautor adicional: {coauthor.name}")
+            extra = coauthors[sidebar_count:]
+            if extra:
+                publish("coautores", {"origem": "todos", "coautores": [c.model_dump(mode="json") for c in extra]})
+    return coauthors
+
+@timed_stage("profile")
+async def crawl_scholar_profile(profile_url: str, all_publications: bool = False,
+                                previous: Optional[dict] = None) -> str:
+    """
+    Extrai os dados do perfil. Com all_publications=True, também busca a tabela
+    completa de artigos (paginada) e a inclui em `publications`.
+
+    Com `previous` (o último resultado salvo deste perfil), a atualização é incremental:
+    só a página do perfil é buscada de novo e, comparando o cabeçalho com o resultado
+    anterior, resumos de artigos já vistos, coautores e lista completa são reaproveitados
+    quando não mudaram. O que foi reaproveitado ou buscado vai em `refresh`.
+    """
+    print("\n*** Crawleando perfil do Google Scholar ***")
+    report = RefreshReport() if previous is not None else None
+    
     try:
-        session_id = "scholar_session"
-        result = await crawler.arun(url=profile_url, config=crawl_config, session_id=session_id)
+        result = await fetch_page(profile_url, expect="gsc_prf_in")
         
         if result.success:
-            # Usar BeautifulSoup para parsear o HTML
-            soup = BeautifulSoup(result.html, 'html.parser')
+            # Parse único do HTML: cabeçalho, artigos e coautores saem da mesma árvore
+            page = parse_profile(result.html)
+            if page is None:
+                record_failure("parse_error")
+                return json.dumps({"error": "Failed to crawl the profile"})
 
             # Extrair nome do pesquisador
-            name = soup.select_one('#gsc_prf_in')
-            name = name.text if name else "Unknown"
+            name = page.header.name
             print(f"Nome do pesquisador: {name}")
             
             # Extrair área principal (primeiro interesse de pesquisa listado)
-            research_interests = soup.select_one('#gsc_prf_int')
-            research_area = research_interests.text.split(',')[0] if research_interests else "Not found"
+            research_area = page.header.research_area
             print(f"Área de pesquisa: {research_area}")
             
             # Extrair número total de citações
-            total_citations = soup.select_one('#gsc_rsb_st td.gsc_rsb_std')
-            total_citations = int(total_citations.text) if total_citations else 0
+            total_citations = page.header.total_citations
             print(f"Total de citações: {total_citations}")
 
             # Extrair artigos (limitado a 5)
-            article_elements = soup.select('#gsc_a_b .gsc_a_t a')[:5]
-            print(f"Encontrados {len(article_elements)} artigos")
-            
-            # Para cada artigo, extrair informações básicas e resumo
+            article_info = [(row.title, row.url) for row in page.articles[:5]]
+            print(f"Encontrados {len(article_info)} artigos")
+
+            # Cabeçalho e lista de artigos já podem ser exibidos enquanto os resumos são buscados
+            publish("perfil", {
+                "name": name,
+                "profile_url": profile_url,
+                "research_area": research_area,
+                "total_citations": total_citations,
+                "articles": [{"title": title, "url": url} for title, url in article_info],
+            })
+
+            # Extrair os resumos (e, na mesma página, os links do texto completo) em paralelo,
+            # preservando a ordem dos artigos. Na atualização incremental, só os artigos novos
+            known = reusable_articles(previous) if previous is not None else {}
+            details = await extract_articles_details([None if url in known else url for _, url in article_info])
+            for index, (_, url) in enumerate(article_info):
+                if url in known:
+                    details[index] = (known[url]["abstract"], known[url].get("artigo_completo"))
+                    report.articles_reused.append(url)
+                elif report is not None and url:
+                    report.articles_fetched.append(url)
+
             articles = []
-            for article in article_elements:
-                title = article.text
-                url = f"https://scholar.google.com{article['href']}" if article.get('href') else ""
-                
-                # Extrair o resumo do artigo
-                abstract = None
+            for (title, url), (abstract, full_text_link) in zip(article_info, details):
                 if url:
-                    abstract = await extract_article_abstract(crawler, url)
                     if abstract:
                         print(f"Resumo extraído com sucesso para: {title}")
                     else:
                         print(f"Não foi possível extrair resumo para: {title}")
                 
-                # Criar objeto Article, garantindo que abstract seja None quando não encontrado
+                # Criar objeto Article, garantindo que abstract seja None quando não encontrado.
+                # artigo_completo sempre vai no JSON (null quando a página não tem o link), para o
+                # analisador de artigos saber que esta página já foi vista
                 articles.append(Article(
                     title=title, 
                     url=url, 
-                    abstract=abstract
+                    abstract=abstract,
+                    artigo_completo=full_text_link
                 ))
             
-            # Extrair coautores 
-            coauthors = []
-            coauthor_elements = soup.select('.gsc_rsb_aa')
-            print(f"Encontrados {len(coauthor_elements)} coautores na página principal")
-            
-            # Processar cada coautor
-            for elem in coauthor_elements:
-                coauthor = await extract_coauthor_info(crawler, elem)
-                coauthors.append(coauthor)
-                print(f"Coautor adicionado: {coauthor.name}")
-            
-            # Verificar se há um link para "ver todos os coautores"
-            view_all_link = soup.select_one('a.gsc_rsb_lbl')
-            if view_all_link and any(term in view_all_link.text.lower() for term in ['coauthor', 'coautor', 'co-author']):
-                all_coauthors_url = f"https://scholar.google.com{view_all_link['href']}"
-                print(f"Buscando página completa de coautores: {all_coauthors_url}")
-                
-                result_all = await crawler.arun(url=all_coauthors_url, config=crawl_config, session_id="all_coauthors")
-                if result_all.success:
-                    soup_all = BeautifulSoup(result_all.html, 'html.parser')
-                    # Os links dos coautores estão em elementos <a> dentro de blocos específicos
-                    coauthor_links = soup_all.select('a[href*="user="]')
-                    
-                    print(f"Encontrados {len(coauthor_links)} links de coautores na página completa")
-                    
-                    for link in coauthor_links:
-                        # Verificar se este coautor já foi processado
-                        if link.get('href') and not any(href.endswith(link['href']) for href in [c.profile_url for c in coauthors if c.profile_url]):
-                            coauthor = await extract_coauthor_info(crawler, link)
-                            coauthors.append(coauthor)
-                            print(f"Coautor adicional: {coauthor.name}")
+            # Extrair coautores (barra lateral e, se houver, a página "ver todos"). Na atualização
+            # incremental, se a barra lateral não está vazia e todos os seus coautores já estavam no
+            # resultado anterior, a lista salva é mantida e a página "ver todos" não é buscada
+            # (coautores só da página "ver todos" não são conferidos; ver RefreshReport)
+            previous_coauthors = (previous or {}).get("coauthors") or []
+            sidebar_ids = {scholar_user_id(entry.href) for entry in page.coauthors if entry.href}
+            sidebar_ids.discard(None)
+            if previous_coauthors and sidebar_ids and sidebar_ids <= coauthor_ids(previous_coauthors):
+                coauthors = [Coauthor(**coauthor) for coauthor in previous_coauthors]
+                report.coauthors = "reused"
+                report.coauthors_basis = "sidebar"
+                publish("coautores", {"origem": "anterior", "coautores": [c.model_dump(mode="json") for c in coauthors]})
+            else:
+                coauthors = await extract_coauthors(page, owner_id=scholar_user_id(profile_url))
+
+            # Buscar a lista completa de artigos, se solicitado. Na atualização incremental, a
+            # anterior é reaproveitada se as citações não mudaram e os artigos mais recentes
+            # (que, sem citações, não aparecem na página do perfil) já estão nela
+            publications = []
+            if all_publications:
+                recent = None
+                if previous is not None and publications_unchanged(previous, total_citations, []):
+                    recent = await recent_publications(profile_url)
+                if recent is not None and publications_unchanged(previous, total_citations,
+                                                                  [*page.articles, *recent]):
+                    publications = previous["publications"]
+                    report.publications = "reused"
+                else:
+                    publications = await fetch_all_publications(profile_url)
+                    if report is not None:
+                        report.publications = "fetched"
+                print(f"Total de artigos no perfil: {len(publications)}")
 
             # Criar o modelo estruturado
             scholar_data = ScholarProfile(
@@ -267,16 +342,22 @@ async def crawl_scholar_profile(profile_url: str) -> str:
                 research_area=research_area,
                 total_citations=total_citations,
                 articles=articles,
-                coauthors=coauthors
+                coauthors=coauthors,
+                publications=publications
             )
             
-            return scholar_data.model_dump_json()
+            if report is None:
+                return scholar_data.model_dump_json()
+            report.previous_citations = previous.get("total_citations")
+            report.current_citations = total_citations
+            report.record()
+            print(f"♻️ Atualização incremental: {report.summary()}")
+            data = scholar_data.model_dump(mode="json")
+            data["refresh"] = report.to_dict()
+            return json.dumps(data, ensure_ascii=False)
         else:
             return json.dumps({"error": "Failed to crawl the profile"})
 
     except Exception as e:
         print(f"Erro ao processar o perfil: {str(e)}")
-        return json.dumps({"error": f"Erro ao processar o perfil: {str(e)}"})
-
-    finally:
-        await crawler.close()
\ No newline at end of file
+        return json.dumps({"error": f"Erro ao processar o perfil: {str(e)}"})
\ No newline at end of file
@@ -0,0 +1,393 @@
+import json
+import os
+import re
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+# Endereço base do Scholar (pode apontar para um servidor local, como no benchmark offline)
+SCHOLAR_URL = os.getenv("SCHOLAR_BASE_URL", "https://scholar.google.com").rstrip("/")
+
+# Seletores pré-compilados (compilados uma vez por processo)
+def _css(selector: str) -> CSSSelector:
+    return CSSSelector(selector, translator="html")
+
+SEL_TITLE = _css("title")
+SEL_PRF_NAME = _css("#gsc_prf_in")
+SEL_PRF_INFO = _css(".gsc_prf_il")
+SEL_PRF_EMAIL = _css("#gsc_prf_ivh")
+SEL_PRF_INTERESTS = _css("#gsc_prf_int")
+SEL_PRF_INTEREST_LINKS = _css("#gsc_prf_int a")
+SEL_CITATIONS = _css("#gsc_rsb_st td.gsc_rsb_std")
+SEL_ARTICLE_ROWS = _css("#gsc_a_b tr.gsc_a_tr")
+SEL_ARTICLE_LINKS = _css("#gsc_a_b .gsc_a_t a")
+SEL_ROW_TITLE = _css("a.gsc_a_at")
+SEL_ROW_CITATIONS = _css(".gsc_a_c a, .gsc_a_ac")
+SEL_ROW_YEAR = _css(".gsc_a_y span, .gsc_a_h")
+SEL_COAUTHORS = _css(".gsc_rsb_aa")
+SEL_VIEW_ALL = _css("a.gsc_rsb_lbl")
+SEL_USER_LINKS = _css('a[href*="user="]')
+SEL_SEARCH_LINKS = _css('div.gsc_1usr a[href*="user="]')
+SEL_SEARCH_ENTRIES = _css("div.gsc_1usr")
+SEL_AI_NAME = _css("h3.gs_ai_name a")
+SEL_AI_AFF = _css("div.gs_ai_aff")
+SEL_AI_EML = _css("div.gs_ai_eml")
+SEL_AI_CBY = _css("div.gs_ai_cby")
+SEL_AI_INTERESTS = _css("a.gs_ai_one_int")
+SEL_SEARCH_NEXT = _css("button.gs_btnPR")
+SEL_OCI_ROWS = _css("#gsc_oci_table .gs_scl")
+SEL_OCI_FIELD = _css(".gsc_oci_field")
+SEL_OCI_VALUE = _css(".gsc_oci_value")
+SEL_OCI_DESC = _css("#gsc_oci_desc")
+SEL_OCI_FULL_TEXT = _css("div.gsc_oci_title_ggi a")
+SEL_OCI_TITLE_LINK = _css("a.gsc_oci_title_link")
+SEL_OCI_TITLE = _css("#gsc_oci_title")
+SEL_PDF_LINKS = _css('a[href*=".pdf"]')
+# Seletores genéricos do resumo na página original do artigo, na ordem da versão com
+# BeautifulSoup (os três primeiros são nomes de elemento, como eram no select_one)
+EXTERNAL_ABSTRACT_SELECTORS = [
+    _css("abstract"), _css("paper-abstract"), _css("abstractSection"), _css("#abstract"), _css(".abstract")
+]
+
+# Resumo na página original do artigo: primeiro os seletores da editora (pelo domínio final,
+# depois de redirecionamentos como o do doi.org), depois os metadados e os seletores genéricos
+PUBLISHER_ABSTRACT_SELECTORS = {
+    "link.springer.com": [_css("#Abs1-content"), _css("section[data-title='Abstract'] .c-article-section__content")],
+    "nature.com": [_css("#Abs1-content")],
+    "dl.acm.org": [_css("section#abstract div[role='paragraph']"), _css("div.abstractSection")],
+    "sciencedirect.com": [_css("div.abstract.author"), _css("#abstracts .abstract")],
+    "onlinelibrary.wiley.com": [_css("section.article-section__abstract .article-section__content")],
+    "tandfonline.com": [_css("div.abstractSection")],
+    "journals.sagepub.com": [_css("section#abstract div[role='paragraph']"), _css("div.abstractSection")],
+    "mdpi.com": [_css("section.html-abstract div.html-p"), _css("div.art-abstract")],
+    "scielo.br": [_css("article div.abstract"), _css("div.trans-abstract")],
+    "arxiv.org": [_css("blockquote.abstract")],
+}
+META_ABSTRACT_SELECTORS = [
+    _css('meta[name="citation_abstract"]'),
+    _css('meta[name="dc.description"], meta[name="DC.Description"], meta[name="DC.description"]'),
+    _css('meta[property="og:description"]'),
+    _css('meta[name="description"]'),
+]
+# O IEEE Xplore monta a página por JavaScript; o resumo vem no JSON de xplGlobal.document.metadata
+IEEE_ABSTRACT_RE = re.compile(r'"abstract":"((?:[^"\\]|\\.)*)"')
+ABSTRACT_LABEL_RE = re.compile(r'^(?:abstract|resumo|summary)\s*[:.—-]?\s*', re.IGNORECASE)
+# Metadados mais curtos que isso costumam ser a descrição do site, não o resumo
+MIN_EXTERNAL_ABSTRACT = 100
+
+# Rótulos do campo de resumo na página view_citation
+DESCRIPTION_LABELS = ("Descrição", "Description")
+# Palavras-chave da busca de último recurso por um resumo no texto da página
+ABSTRACT_KEYWORDS = ["Resumo", "Abstract", "Resumé", "Summary", "Descrição", "Description"]
+XPATH_KEYWORD = {
+    keyword: etree.XPath(f"//text()[contains(., '{keyword}')]")
+    for keyword in ABSTRACT_KEYWORDS
+}
+# Primeiro <p> (ou, na falta dele, <div>) depois do texto encontrado, em ordem de documento
+XPATH_NEXT_P = etree.XPath("(descendant::p | following::p)[1]")
+XPATH_NEXT_DIV = etree.XPath("(descendant::div | following::div)[1]")
+EMAIL_DOMAIN_RE = re.compile(r'(?:confirmado|verificado|[Vv]erified email) (?:em|at) ([\w.-]+\.\w+)')
+USER_ID_RE = re.compile(r'[?&]user=([\w-]+)')
+# O botão "Próxima" da busca de autores navega por onclick="window.location='...'", com \x3d e \x26 escapados
+NEXT_LOCATION_RE = re.compile(r"window\.location='([^']+)'")
+JS_ESCAPE_RE = re.compile(r'\\x([0-9a-fA-F]{2})')
+
+@dataclass
+class ProfileHeader:
+    name: str = "Unknown"
+    affiliation: Optional[str] = None
+    email_domain: Optional[str] = None
+    interests: List[str] = field(default_factory=list)
+    research_area: str = "Not found"
+    total_citations: int = 0
+
+@dataclass
+class ArticleRow:
+    title: str
+    url: str
+    year: Optional[int] = None
+    citations: int = 0
+
+@dataclass
+class CoauthorEntry:
+    """Texto e link de um coautor, como aparecem no perfil ou na página de coautores."""
+    text: str
+    href: Optional[str] = None
+
+@dataclass
+class SearchCandidate:
+    """Um autor da busca de autores, com os dados que a própria página de resultados mostra."""
+    user_id: str
+    profile_url: str
+    name: str = "Unknown"
+    affiliation: Optional[str] = None
+    email_domain: Optional[str] = None
+    total_citations: int = 0
+    interests: List[str] = field(default_factory=list)
+
+@dataclass
+class SearchPage:
+    candidates: List[SearchCandidate]
+    next_url: Optional[str] = None  # página seguinte (after_author/astart), se houver
+
+@dataclass
+class ProfilePage:
+    header: ProfileHeader
+    articles: List[ArticleRow]
+    coauthors: List[CoauthorEntry]
+    coauthors_url: Optional[str] = None
+
+@dataclass
+class CitationPage:
+    title: Optional[str] = None
+    fields: Dict[str, str] = field(default_factory=dict)
+    description: Optional[str] = None
+    full_text_link: Optional[str] = None
+    title_link: Optional[str] = None
+    pdf_links: List[str] = field(default_factory=list)
+    values: List[str] = field(default_factory=list)
+    page_title: Optional[str] = None
+    _root: Optional[object] = field(default=None, repr=False)
+
+    def keyword_abstract(self) -> Optional[tuple]:
+        """
+        Último recurso: procura um texto com 'Resumo', 'Abstract' etc. e devolve o primeiro
+        bloco (p/div) seguinte com mais de 50 caracteres, como (palavra-chave, texto).
+        """
+        if self._root is None:
+            return None
+        for keyword in ABSTRACT_KEYWORDS:
+            for text_node in XPATH_KEYWORD[keyword](self._root):
+                parent = text_node.getparent()
+                if parent is None:
+                    continue
+                blocks = XPATH_NEXT_P(parent) or XPATH_NEXT_DIV(parent)
+                if blocks and len(_text(blocks[0])) > 50:
+                    return keyword, _text(blocks[0])
+                break
+        return None
+
+def parse_html(html: str):
+    """Faz o parse do documento com o parser C do lxml; retorna None se estiver vazio."""
+    if not html or not html.strip():
+        return None
+    try:
+        return lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+
+def _text(element) -> str:
+    return element.text_content().strip() if element is not None else ""
+
+def _first(selector: CSSSelector, root):
+    found = selector(root)
+    return found[0] if found else None
+
+def absolute_url(href: Optional[str]) -> Optional[str]:
+    if not href:
+        return None
+    return href if href.startswith("http") else f"{SCHOLAR_URL}{href}"
+
+def _int(text: str, default: int = 0) -> int:
+    digits = re.sub(r'\D', '', text or "")
+    return int(digits) if digits else default
+
+def parse_profile_header(root) -> ProfileHeader:
+    header = ProfileHeader()
+    name = _first(SEL_PRF_NAME, root)
+    if name is not None:
+        header.name = name.text_content()
+    info = SEL_PRF_INFO(root)
+    if info:
+        header.affiliation = _text(info[0]) or None
+    email = _first(SEL_PRF_EMAIL, root)
+    if email is not None:
+        match = EMAIL_DOMAIN_RE.search(_text(email))
+        header.email_domain = match.group(1) if match else None
+    header.interests = [_text(a) for a in SEL_PRF_INTEREST_LINKS(root)]
+    interests = _first(SEL_PRF_INTERESTS, root)
+    if interests is not None:
+        # Mesmo comportamento de antes: texto do bloco dividido por vírgula
+        header.research_area = interests.text_content().split(',')[0]
+    citations = _first(SEL_CITATIONS, root)
+    if citations is not None:
+        header.total_citations = _int(citations.text_content())
+    return header
+
+def parse_article_rows(root) -> List[ArticleRow]:
+    """Linhas da tabela de artigos (título, URL, ano, citações)."""
+    rows = []
+    for row in SEL_ARTICLE_ROWS(root):
+        link = _first(SEL_ROW_TITLE, row)
+        if link is None:
+            continue
+        year_text = _text(_first(SEL_ROW_YEAR, row))
+        rows.append(ArticleRow(
+            title=link.text_content().strip(),
+            url=absolute_url(link.get("href")) or "",
+            year=int(year_text) if re.fullmatch(r'\d{4}', year_text) else None,
+            citations=_int(_text(_first(SEL_ROW_CITATIONS, row)))
+        ))
+    if not rows:
+        # Tabelas sem a marcação de linha: usa os links de título diretamente
+        for link in SEL_ARTICLE_LINKS(root):
+            rows.append(ArticleRow(title=link.text_content(), url=absolute_url(link.get("href")) or ""))
+    return rows
+
+def parse_publications_page(html: str) -> List[ArticleRow]:
+    """Linhas de uma página da tabela de artigos (cstart/pagesize)."""
+    root = parse_html(html)
+    return parse_article_rows(root) if root is not None else []
+
+def parse_profile(html: str) -> Optional[ProfilePage]:
+    """Cabeçalho, artigos, coautores da barra lateral e link 'ver todos' do perfil."""
+    root = parse_html(html)
+    if root is None:
+        return None
+    coauthors = []
+    for element in SEL_COAUTHORS(root):
+        link = _first(SEL_USER_LINKS, element)
+        coauthors.append(CoauthorEntry(text=_text(element), href=link.get("href") if link is not None else None))
+    coauthors_url = None
+    view_all = _first(SEL_VIEW_ALL, root)
+    if view_all is not None and view_all.get("href") and any(
+            term in view_all.text_content().lower() for term in ['coauthor', 'coautor', 'co-author']):
+        coauthors_url = absolute_url(view_all.get("href"))
+    return ProfilePage(
+        header=parse_profile_header(root),
+        articles=parse_article_rows(root),
+        coauthors=coauthors,
+        coauthors_url=coauthors_url
+    )
+
+def parse_coauthors_page(html: str) -> List[CoauthorEntry]:
+    """Links de perfis na página completa de coautores."""
+    root = parse_html(html)
+    if root is None:
+        return []
+    return [CoauthorEntry(text=_text(link), href=link.get("href")) for link in SEL_USER_LINKS(root)]
+
+def parse_search_results(html: str) -> List[str]:
+    """URLs dos perfis encontrados na busca de autores."""
+    root = parse_html(html)
+    if root is None:
+        return []
+    return [absolute_url(link.get("href")) for link in SEL_SEARCH_LINKS(root) if link.get("href")]
+
+def _search_candidate(entry) -> Optional[SearchCandidate]:
+    link = _first(SEL_AI_NAME, entry)
+    if link is None:
+        link = _first(SEL_USER_LINKS, entry)
+    href = link.get("href") if link is not None else None
+    match = USER_ID_RE.search(href or "")
+    if not match:
+        return None
+    email = EMAIL_DOMAIN_RE.search(_text(_first(SEL_AI_EML, entry)))
+    return SearchCandidate(
+        user_id=match.group(1),
+        profile_url=absolute_url(href),
+        name=_text(link) or "Unknown",
+        affiliation=_text(_first(SEL_AI_AFF, entry)) or None,
+        email_domain=email.group(1) if email else None,
+        total_citations=_int(_text(_first(SEL_AI_CBY, entry))),
+        interests=[_text(a) for a in SEL_AI_INTERESTS(entry)],
+    )
+
+def parse_search_page(html: str) -> Optional[SearchPage]:
+    """Autores de uma página da busca de autores e a URL da página seguinte."""
+    root = parse_html(html)
+    if root is None:
+        return None
+    candidates = [candidate for candidate in map(_search_candidate, SEL_SEARCH_ENTRIES(root)) if candidate]
+    next_url = None
+    button = _first(SEL_SEARCH_NEXT, root)
+    if button is not None and button.get("disabled") is None:
+        match = NEXT_LOCATION_RE.search(button.get("onclick") or "")
+        if match:
+            next_url = absolute_url(JS_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)), match.group(1)))
+    return SearchPage(candidates=candidates, next_url=next_url)
+
+def parse_citation_page(html: str) -> Optional[CitationPage]:
+    """Campos da página view_citation de um artigo, incluindo resumo e link do texto completo."""
+    root = parse_html(html)
+    if root is None:
+        return None
+    page = CitationPage(_root=root)
+    page.page_title = _text(_first(SEL_TITLE, root)) or None
+    page.title = _text(_first(SEL_OCI_TITLE, root)) or None
+    for row in SEL_OCI_ROWS(root):
+        label = _first(SEL_OCI_FIELD, row)
+        value = _first(SEL_OCI_VALUE, row)
+        if label is not None and value is not None:
+            page.fields[_text(label)] = _text(value)
+    for label in DESCRIPTION_LABELS:
+        if page.fields.get(label):
+            page.description = page.fields[label]
+            break
+    if page.description is None:
+        desc = _first(SEL_OCI_DESC, root)
+        if desc is not None and _text(desc):
+            page.description = _text(desc)
+    page.values = [_text(value) for value in SEL_OCI_VALUE(root)]
+    full_text = _first(SEL_OCI_FULL_TEXT, root)
+    if full_text is not None and full_text.get("href"):
+        page.full_text_link = full_text.get("href")
+    title_link = _first(SEL_OCI_TITLE_LINK, root)
+    if title_link is not None:
+        page.title_link = title_link.get("href")
+    # Candidatos ao artigo original: links para PDF ou, na falta deles, o link do título
+    page.pdf_links = [a.get("href") for a in SEL_PDF_LINKS(root) if a.get("href")]
+    if not page.pdf_links and page.title_link:
+        page.pdf_links = [page.title_link]
+    return page
+
+def long_value(page: CitationPage) -> Optional[str]:
+    """Primeiro valor da tabela com mais de 100 caracteres que não pareça lista de referências."""
+    for value in page.values:
+        if len(value) > 100 and not value.count("\n") > 5:
+            return value
+    return None
+
+def _publisher_selectors(host: str) -> List[CSSSelector]:
+    for domain, selectors in PUBLISHER_ABSTRACT_SELECTORS.items():
+        if host == domain or host.endswith("." + domain):
+            return selectors
+    return []
+
+def _clean_abstract(text: str) -> str:
+    return ABSTRACT_LABEL_RE.sub("", re.sub(r'\s+', ' ', text).strip())
+
+def parse_external_abstract(html: str, url: Optional[str] = None) -> Optional[str]:
+    """
+    Procura o resumo na página original do artigo (editora). Com a URL final da página,
+    os seletores específicos da editora são tentados antes dos metadados e dos genéricos.
+    """
+    host = (urllib.parse.urlsplit(url).hostname or "").lower() if url else ""
+    if host.endswith("ieeexplore.ieee.org"):
+        match = IEEE_ABSTRACT_RE.search(html or "")
+        if match:
+            try:
+                return _clean_abstract(json.loads(f'"{match.group(1)}"'))
+            except json.JSONDecodeError:
+                pass
+    root = parse_html(html)
+    if root is None:
+        return None
+    for selector in _publisher_selectors(host):
+        found = _first(selector, root)
+        if found is not None and _text(found):
+            return _clean_abstract(_text(found))
+    for selector in META_ABSTRACT_SELECTORS:
+        found = _first(selector, root)
+        content = _clean_abstract(found.get("content") or "") if found is not None else ""
+        if len(content) >= MIN_EXTERNAL_ABSTRACT:
+            return content
+    for selector in EXTERNAL_ABSTRACT_SELECTORS:
+        found = _first(selector, root)
+        if found is not None and _text(found):
+            return _clean_abstract(_text(found))
+    return None
@@ -1,10 +1,11 @@
 from crewai.tools import BaseTool
 from typing import Type, Optional
 from pydantic import BaseModel, Field
-import asyncio
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
-from bs4 import BeautifulSoup
-import urllib.parse
+from tools.author_search import search_authors
+from tools.disambiguation import rank_candidates
+from tools.events import publish
+from tools.metrics import timed_stage
+from tools.runtime import run_async, run_sync
 
 class ScholarSearchInput(BaseModel):
     """Input schema para a ferramenta ScholarSearch."""
@@ -20,11 +21,24 @@ class ScholarSearchTool(BaseTool):
     args_schema: Type[BaseModel] = ScholarSearchInput
     
     def _run(self, researcher_name: str, email: Optional[str] = None, institution: Optional[str] = None) -> str:
+        return run_sync(self._arun(researcher_name, email, institution))
+
+    async def _arun(self, researcher_name: str, email: Optional[str] = None, institution: Optional[str] = None) -> str:
         if not researcher_name:
             raise ValueError("Nome do pesquisador não fornecido")
-        result = asyncio.run(search_scholar_profile(researcher_name, email, institution))
-        return result
+        result = await run_async(search_scholar_profile(researcher_name, email, institution))
+        profiles = [line.strip() for line in result.splitlines() if line.strip().startswith("http")]
+        if len(profiles) <= 1:
+            return result
+        # Vários perfis: o agente recebe a lista já ordenada pela compatibilidade com as pistas
+        ranking = await run_async(rank_candidates(profiles, researcher_name, email, institution))
+        return "\n".join(
+            f"{c.profile_url} | score {c.score:.2f} | {c.name or '?'} | {c.affiliation or 'sem afiliação'} | "
+            f"{c.email_domain or 'sem email'} | {c.total_citations} citações"
+            for c in ranking
+        )
 
+@timed_stage("search")
 async def search_scholar_profile(researcher_name: str, email: Optional[str] = None, institution: Optional[str] = None):
     print(f"\n*** Buscando perfil para: {researcher_name} ***")
     if email:
@@ -32,58 +46,29 @@ async def search_scholar_profile(researcher_name: str, email: Optional[str] = No
     if institution:
         print(f"Instituição: {institution}")
 
-    # Configurar o crawler
-    browser_config = BrowserConfig(
-        headless=True,
-        verbose=False,
-        extra_args=["--disable-gpu", "--disable-dev-shm-usage", "--no-sandbox"],
-    )
-    crawl_config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
-
     # Construir a query de busca concatenando as informações disponíveis
     search_query = researcher_name
     if institution:
         search_query += f" {institution}"
     if email:
         search_query += f" {email}"
-    
-    # Criar URL de busca para primeira página
-    encoded_query = urllib.parse.quote(search_query)
-    search_url = f"https://scholar.google.com/citations?view_op=search_authors&mauthors={encoded_query}&hl=pt-BR"
-
-    crawler = AsyncWebCrawler(config=browser_config)
-    await crawler.start()
 
     try:
-        # Buscar na primeira página
+        # Para um pesquisador específico, a primeira página da busca basta
         print(f"Buscando perfis com a query: {search_query}")
-        session_id = "scholar_search"
-        result = await crawler.arun(url=search_url, config=crawl_config, session_id=session_id)
+        candidates = await search_authors(search_query, max_pages=1)
+        profiles = [candidate.profile_url for candidate in candidates]
+        
+        print(f"Encontrados {len(profiles)} perfis na busca")
         
-        if result.success:
-            soup = BeautifulSoup(result.html, 'html.parser')
-            profile_links = soup.select('div.gsc_1usr a[href*="user="]')
-            
-            profiles = []
-            for link in profile_links:
-                if link.get('href'):
-                    profile_url = "https://scholar.google.com" + link['href']
-                    profiles.append(profile_url)
-            
-            print(f"Encontrados {len(profiles)} perfis na busca")
-            
-            # Verificar se encontramos algum perfil
-            if profiles:
-                # Retorna todos os perfis encontrados, um por linha
-                return "\n".join(profiles)
-            else:
-                return "Nenhum perfil encontrado para o pesquisador."
+        # Verificar se encontramos algum perfil
+        if profiles:
+            publish("candidatos", {"perfis": profiles})
+            # Retorna todos os perfis encontrados, um por linha
+            return "\n".join(profiles)
         else:
-            return "Falha ao realizar a busca no Google Scholar."
+            return "Nenhum perfil encontrado para o pesquisador."
     
     except Exception as e:
         print(f"Erro durante a busca: {str(e)}")
-        return f"Erro ao buscar perfis: {str(e)}"
-    
-    finally:
-        await crawler.close() 
\ No newline at end of file
+        return f"Erro ao buscar perfis: {str(e)}" 
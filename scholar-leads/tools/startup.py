@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos medidos por padrão: o que a API carrega para começar a responder e o que a
+# primeira análise carrega sob demanda
+DEFAULT_MODULES = ["app", "crew"]
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """
+    Importa `module` em um processo novo com `python -X importtime` e retorna
+    (módulo, próprio_us, cumulativo_us) de cada import, na ordem em que terminaram.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{completed.stderr.strip().splitlines()[-1]}")
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # cabeçalho
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+def by_package(times: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """Soma o tempo próprio dos imports por pacote de primeiro nível (crewai, langchain_core...)."""
+    totals: Dict[str, int] = {}
+    for name, self_us, _ in times:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return totals
+
+def startup_report(modules: List[str] = DEFAULT_MODULES, top: int = 15):
+    """Imprime o tempo de import de cada módulo e os pacotes que mais pesam nele."""
+    for module in modules:
+        try:
+            times = import_times(module)
+        except RuntimeError as e:
+            print(f"\n{e}")
+            continue
+        total = next((cumulative for name, _, cumulative in times if name == module), 0)
+        print(f"\n⏱️ import {module}: {total / 1000:.0f} ms")
+        ranking = sorted(by_package(times).items(), key=lambda item: item[1], reverse=True)
+        for package, self_us in ranking[:top]:
+            print(f"  {self_us / 1000:8.1f} ms  {package}")
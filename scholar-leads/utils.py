@@ -1,7 +1,4 @@
-import os
 import re
-import json
-from datetime import datetime
 
 def normalize_name(name: str) -> str:
     """
@@ -22,28 +19,18 @@ def normalize_name(name: str) -> str:
     
     return normalized
 
-def save_result(researcher_name: str, data: dict):
+def save_result(researcher_name: str, data: dict, institution: str = None, email: str = None):
     """
-    Salva o resultado em um arquivo JSON
+    Salva o resultado no banco SQLite de resultados (ver store.py)
     
     Args:
         researcher_name: Nome do pesquisador
-        data: Dados a serem salvos em formato JSON
+        data: Dados do resultado em formato JSON
+        institution: Instituição informada na busca (opcional, indexada)
+        email: Email ou domínio informado na busca (opcional, indexado)
         
     Returns:
-        str: Caminho do arquivo salvo
+        dict: Ids do registro salvo ({"result_id", "user_id"})
     """
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(base_dir, 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"{normalize_name(researcher_name)}_{timestamp}.json"
-    filepath = os.path.join(data_dir, filename)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    return filepath
-
-# verificar output e campos do json
+    from store import get_store
+    return get_store().save(researcher_name, data, institution=institution, email=email)